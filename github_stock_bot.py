@@ -26,13 +26,14 @@ from src.utils.gdrive_uploader import upload_to_gdrive  # noqa: E402
 from src.notify.telegram import send_telegram_msg  # noqa: E402
 
 # 导入报告生成模块
-from src.report import process_multiple_stocks, create_zip_archive  # noqa: E402
+from src.report import process_multiple_stocks, create_zip_archive, warm_up  # noqa: E402
 
 # 导入配置管理模块
 from src.config import Config  # noqa: E402
 
 # 导入日志模块
 from src.utils.logger import get_logger  # noqa: E402
+from src.utils.metrics import get_metrics  # noqa: E402
 
 # 初始化配置和日志
 config = Config()
@@ -41,6 +42,13 @@ logger = get_logger(__name__)
 # ==================== 主程序 ====================
 
 
+def log_run_metrics():
+    """输出本次运行的缓存命中、K线获取路径与数据源延迟指标"""
+    report = get_metrics().format_report()
+    if report:
+        logger.info(f"📈 运行指标:\n{report}")
+
+
 def main(sector_input=None):
     """主程序
 
@@ -223,12 +231,22 @@ def main(sector_input=None):
 
 
 if __name__ == "__main__":
+    # 无论正常结束、提前返回还是异常退出，都输出本次运行的指标
+    import atexit
+
+    atexit.register(log_run_metrics)
+
     if len(sys.argv) > 1:
         import argparse
 
         parser = argparse.ArgumentParser()
         default_stocks = " ".join(config.stocks)
-        parser.add_argument("--mode", choices=["manual", "telegram"], default="manual")
+        parser.add_argument(
+            "--mode",
+            choices=["manual", "telegram", "warmup"],
+            default="manual",
+            help="warmup: 盘前预热缓存与数据库，不生成报告",
+        )
         parser.add_argument("--stocks", type=str, default=default_stocks)
         parser.add_argument("--sector", type=str, default=None, help="行业代码（如BK1031）或行业名称（如光伏设备）")
         parser.add_argument("--config", type=str, default=None, help="配置文件路径（可选）")
@@ -240,6 +258,9 @@ if __name__ == "__main__":
 
         if args.mode == "telegram":
             logger.warning("⚠️ Telegram模式需要配置环境变量")
+        elif args.mode == "warmup":
+            target_stocks = parse_stock_list(args.stocks)
+            warm_up(target_stocks, sectors=[args.sector] if args.sector else None)
         else:
             if args.stocks != default_stocks:
                 target_stocks = parse_stock_list(args.stocks)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线冷数据归档工具
+将早于保留期限的K线从本地数据库移入 Parquet 归档（database.archive 配置），读取时自动合并
+
+用法:
+    python scripts/archive_klines.py [--horizon-days 365] [--vacuum]
+"""
+import argparse
+import os
+import sys
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import Config
+from src.database import get_stock_db
+
+
+def main():
+    archive_cfg = Config().get("database.archive", {}) or {}
+    parser = argparse.ArgumentParser(description="将早于保留期限的K线移入 Parquet 归档")
+    parser.add_argument(
+        "--horizon-days",
+        type=float,
+        default=archive_cfg.get("horizon_days", 365),
+        help="保留期限（天），默认取 database.archive.horizon_days",
+    )
+    parser.add_argument("--vacuum", action="store_true", help="归档后整理数据库文件，回收空间")
+    args = parser.parse_args()
+
+    db = get_stock_db()
+    if db is None:
+        print("❌ 数据库功能未启用（database.enabled 为 false）")
+        return
+    if db.archive is None:
+        print("❌ 冷数据归档未启用（database.archive.enabled 为 false）或未安装 pyarrow")
+        return
+
+    try:
+        summary = db.archive_old_klines(args.horizon_days, vacuum=args.vacuum)
+        print(
+            f"✅ 已归档 {summary['rows']:,} 条K线（{summary['stocks']} 只股票/周期），"
+            f"改写 {summary['files']} 个分区文件"
+        )
+        stats = db.get_stats()
+        print(
+            f"📦 归档共 {stats.get('archived_kline_records', 0):,} 条，{stats.get('archive_size_mb', 0):.2f} MB；"
+            f"数据库 {stats.get('db_size_mb', 0):.2f} MB"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
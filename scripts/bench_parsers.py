@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线解析性能基准
+对比逐条 float() 构造字典的旧解析方式与 src.data.parsers 的列式解析
+
+用法: python scripts/bench_parsers.py [--bars 5000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd  # noqa: E402
+
+from src.data.parsers import parse_delimited_klines, parse_sina_kline  # noqa: E402
+
+
+def make_sina_minute(n):
+    """构造 n 条新浪分钟线响应"""
+    start = pd.Timestamp("2024-01-02 09:31")
+    items = []
+    for i in range(n):
+        ts = start + pd.Timedelta(minutes=i)
+        p = 30 + random.random()
+        items.append(
+            {
+                "d": ts.strftime("%Y-%m-%d"),
+                "t": ts.strftime("%H:%M"),
+                "o": f"{p:.2f}",
+                "h": f"{p + 0.05:.2f}",
+                "l": f"{p - 0.05:.2f}",
+                "c": f"{p + 0.01:.2f}",
+                "v": str(random.randint(1000, 90000)),
+            }
+        )
+    return items
+
+
+def make_eastmoney(n):
+    """构造 n 条东方财富 klines"""
+    start = pd.Timestamp("2024-01-02 09:31")
+    lines = []
+    for i in range(n):
+        ts = start + pd.Timedelta(minutes=i)
+        p = 300 + random.random()
+        lines.append(
+            f"{ts:%Y-%m-%d %H:%M},{p:.2f},{p + 1:.2f},{p + 2:.2f},{p - 1:.2f},{random.randint(1000, 9000)},1.0,0.5"
+        )
+    return lines
+
+
+def legacy_sina_minute(items):
+    """旧实现：逐条构造字典"""
+    klines = []
+    for item in items:
+        try:
+            klines.append(
+                {
+                    "Date": f"{item['d']} {item['t']}:00",
+                    "Open": float(item["o"]),
+                    "High": float(item["h"]),
+                    "Low": float(item["l"]),
+                    "Close": float(item["c"]),
+                    "Volume": float(item.get("v", 0)),
+                }
+            )
+        except Exception:
+            continue
+    df = pd.DataFrame(klines)
+    df["Date"] = pd.to_datetime(df["Date"])
+    df.set_index("Date", inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+def legacy_eastmoney(lines):
+    """旧实现：逐行 split"""
+    result = []
+    for line in lines:
+        parts = line.split(",")
+        if len(parts) >= 6:
+            try:
+                result.append(
+                    {
+                        "Date": parts[0],
+                        "Open": float(parts[1]),
+                        "Close": float(parts[2]),
+                        "High": float(parts[3]),
+                        "Low": float(parts[4]),
+                        "Volume": float(parts[5]),
+                    }
+                )
+            except Exception:
+                continue
+    df = pd.DataFrame(result)
+    df["Date"] = pd.to_datetime(df["Date"])
+    df.set_index("Date", inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="K线解析性能基准")
+    parser.add_argument("--bars", type=int, default=5000, help="每次解析的K线条数")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    args = parser.parse_args()
+
+    random.seed(0)
+    sina = make_sina_minute(args.bars)
+    em = make_eastmoney(args.bars)
+
+    cases = [
+        ("新浪分钟线", lambda: legacy_sina_minute(sina), lambda: parse_sina_kline(sina, minute=True)),
+        ("东方财富", lambda: legacy_eastmoney(em), lambda: parse_delimited_klines(em)),
+    ]
+
+    print(f"K线解析基准：{args.bars} 条 × {args.repeat} 次")
+    print(f"{'数据源':<10}{'旧实现(ms)':>12}{'列式(ms)':>12}{'加速':>8}")
+    for name, legacy, vectorized in cases:
+        assert len(legacy()) == len(vectorized())
+        t_old = min(timeit.repeat(legacy, number=1, repeat=args.repeat)) * 1000
+        t_new = min(timeit.repeat(vectorized, number=1, repeat=args.repeat)) * 1000
+        print(f"{name:<10}{t_old:>12.2f}{t_new:>12.2f}{t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
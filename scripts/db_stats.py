@@ -50,6 +50,12 @@ def main():
         
         if 'db_size_mb' in stats:
             print(f"\n💾 数据库大小: {stats['db_size_mb']:.2f} MB")
+        print(f"🗂️  表结构版本: {stats.get('schema_version', 0)}")
+        if 'archived_kline_records' in stats:
+            print(f"📦 归档: {stats['archived_kline_records']:,} 条（{stats.get('archived_stocks', 0)} 只股票），"
+                  f"{stats['archive_files']} 个分区文件，{stats['archive_size_mb']:.2f} MB")
+        if 'last_write_at' in stats:
+            print(f"📝 写入批次: {stats.get('write_batches', 0):,} 次，最近写入 {stats['last_write_at']}")
         
         # 查询元数据表
         try:
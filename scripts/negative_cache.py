@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+负缓存管理工具
+查看与清除 "数据源对某代码无数据/请求失败" 的短期记录
+
+用法:
+    python scripts/negative_cache.py list [--symbol sh600000] [--scale 240] [--source sina]
+    python scripts/negative_cache.py clear [--symbol sh600000] [--scale 240] [--source sina]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# 添加项目根目录到路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.utils.negative_cache import get_negative_cache
+
+
+def _format_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看与清除负缓存")
+    parser.add_argument("action", choices=["list", "clear"], help="list 列出记录，clear 清除记录")
+    parser.add_argument("--symbol", default="*", help="股票代码（支持通配符，默认全部）")
+    parser.add_argument("--scale", default="*", help="K线周期（分钟，默认全部）")
+    parser.add_argument("--source", default="*", help="数据源名称（默认全部）")
+    args = parser.parse_args()
+
+    negative = get_negative_cache()
+    if negative is None:
+        print("❌ 负缓存未启用（cache.enabled 或 negative_cache.enabled 为 false）")
+        return
+
+    if args.action == "clear":
+        count = negative.clear(args.symbol, args.scale, args.source)
+        print(f"✅ 已清除 {count} 条负缓存记录")
+        return
+
+    entries = negative.entries(args.symbol, args.scale, args.source)
+    if not entries:
+        print("没有负缓存记录")
+        return
+    print(f"{'代码':<12} {'周期':>6} {'数据源':<18} {'原因':<8} {'记录时间':<20} {'过期时间':<20} 说明")
+    for entry in entries:
+        print(
+            f"{entry['symbol']:<12} {entry['scale']:>6} {entry['source']:<18} {entry['reason'] or '-':<8} "
+            f"{_format_time(entry['recorded_at']):<20} {_format_time(entry['expires_at']):<20} {entry['detail']}"
+        )
+    print(f"\n共 {len(entries)} 条")
+
+
+if __name__ == "__main__":
+    main()
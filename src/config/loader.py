@@ -71,7 +71,6 @@ class Config:
             "report": {"output_dir": "reports", "include_charts": True, "chart_dpi": 150},
             "data": {"kline": {"default_datalen": 150, "default_scale": 240}},
             "database": {"enabled": True, "path": "data/stock_data.db"},
-            "delays": {"hk_stock": 3, "sector": 3, "normal": 1},
         }
 
     def _apply_env_overrides(self):
@@ -153,12 +152,6 @@ class Config:
         config = self.load()
         return config.get("data", {})
 
-    @property
-    def delays(self) -> Dict[str, int]:
-        """获取延迟配置"""
-        config = self.load()
-        return config.get("delays", {"hk_stock": 3, "sector": 3, "normal": 1})
-
     @property
     def chart_config(self) -> Dict[str, Any]:
         """获取图表配置"""
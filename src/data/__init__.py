@@ -5,7 +5,9 @@
 
 from .fetchers import (
     get_name,
+    get_names,
     fetch_kline_data,
+    fetch_kline_many,
     get_market_indices_data,
     get_sector_indices_data,
     load_sector_index_map,
@@ -17,7 +19,9 @@ from .fetchers import (
 
 __all__ = [
     "get_name",
+    "get_names",
     "fetch_kline_data",
+    "fetch_kline_many",
     "get_market_indices_data",
     "get_sector_indices_data",
     "load_sector_index_map",
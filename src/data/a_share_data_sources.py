@@ -5,12 +5,16 @@ A股多数据源模块
 
 import re
 import json
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta
 
 import pandas as pd
 import requests
 
+from src.data.parsers import EASTMONEY_FIELDS, TENCENT_FIELDS, parse_delimited_klines, parse_kline_rows
+from src.utils.http_client import http_get
+from src.utils.source_stats import SourceCandidate, fetch_ranked
+
 
 class AShareDataSources:
     """A股数据源管理器 - 自动降级"""
@@ -76,17 +80,11 @@ class AShareDataSources:
                 "_": str(int(datetime.now().timestamp() * 1000)),
             }
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://quote.eastmoney.com/",
-            }
-
             print(f"  📡 从东方财富获取数据: {symbol} scale={scale}")
 
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = http_get(url, params=params, profile="eastmoney", timeout=15)
 
-            if response.status_code != 200:
-                return None
+            response.raise_for_status()
 
             # 解析JSONP响应
             text = response.text
@@ -109,38 +107,18 @@ class AShareDataSources:
             if not klines:
                 return None
 
-            # 解析数据
-            result = []
-            for line in klines:
-                parts = line.split(",")
-                if len(parts) >= 6:
-                    try:
-                        result.append(
-                            {
-                                "Date": parts[0],
-                                "Open": float(parts[1]),
-                                "Close": float(parts[2]),
-                                "High": float(parts[3]),
-                                "Low": float(parts[4]),
-                                "Volume": float(parts[5]),
-                            }
-                        )
-                    except Exception:
-                        continue
-
-            if not result:
+            df = parse_delimited_klines(klines, EASTMONEY_FIELDS)
+            if df is None:
                 return None
 
-            df = pd.DataFrame(result)
-            df["Date"] = pd.to_datetime(df["Date"])
-            df.set_index("Date", inplace=True)
-            df.sort_index(inplace=True)
-
             print(f"    ✓ 获取到 {len(df)} 条数据")
             return df
 
         except Exception as e:
             print(f"  ❌ 东方财富获取失败: {e}")
+            # 网络/HTTP 错误向上抛出，由熔断器计为数据源失败；其余情况视为无数据
+            if isinstance(e, requests.RequestException):
+                raise
             return None
 
     @staticmethod
@@ -178,17 +156,11 @@ class AShareDataSources:
                 "r": str(int(datetime.now().timestamp() * 1000)),
             }
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "http://stock.finance.qq.com/",
-            }
-
             print(f"  📡 从腾讯财经获取数据: {symbol} scale={scale}")
 
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = http_get(url, params=params, profile="tencent", timeout=15)
 
-            if response.status_code != 200:
-                return None
+            response.raise_for_status()
 
             try:
                 data = response.json()
@@ -203,30 +175,9 @@ class AShareDataSources:
             if not klines:
                 return None
 
-            result = []
-            for item in klines:
-                if len(item) >= 6:
-                    try:
-                        result.append(
-                            {
-                                "Date": item[0],
-                                "Open": float(item[1]),
-                                "Close": float(item[2]),
-                                "High": float(item[3]),
-                                "Low": float(item[4]),
-                                "Volume": float(item[5]),
-                            }
-                        )
-                    except Exception:
-                        continue
-
-            if not result:
+            df = parse_kline_rows(klines, TENCENT_FIELDS)
+            if df is None:
                 return None
-
-            df = pd.DataFrame(result)
-            df["Date"] = pd.to_datetime(df["Date"])
-            df.set_index("Date", inplace=True)
-            df.sort_index(inplace=True)
             df = df.tail(datalen)  # 只保留最近的数据
 
             print(f"    ✓ 获取到 {len(df)} 条数据")
@@ -234,6 +185,9 @@ class AShareDataSources:
 
         except Exception as e:
             print(f"  ❌ 腾讯财经获取失败: {e}")
+            # 网络/HTTP 错误向上抛出，由熔断器计为数据源失败；其余情况视为无数据
+            if isinstance(e, requests.RequestException):
+                raise
             return None
 
     @staticmethod
@@ -337,15 +291,27 @@ class AShareDataSources:
             print(f"  ❌ AKShare获取失败: {e}")
             return None
 
+    @staticmethod
+    def candidates(symbol: str, scale: int = 240, datalen: int = 100) -> List[SourceCandidate]:
+        """返回可用数据源列表（默认优先级：东方财富 → 腾讯财经（仅日线）→ AKShare）
+
+        Returns:
+            List[(数据源名称, 无参获取函数)]
+        """
+        sources: List[SourceCandidate] = [
+            ("eastmoney", lambda: AShareDataSources.fetch_from_eastmoney(symbol, scale, datalen)),
+        ]
+        if scale == 240:
+            sources.append(("tencent", lambda: AShareDataSources.fetch_from_tencent(symbol, scale, datalen)))
+        sources.append(("akshare", lambda: AShareDataSources.fetch_from_akshare(symbol, scale, datalen)))
+        return sources
+
     @staticmethod
     def get_kline_with_fallback(symbol: str, scale: int = 240, datalen: int = 100) -> Optional[pd.DataFrame]:
         """获取K线数据 - 自动降级
 
-        数据源优先级：
-        1. 新浪财经（由调用方先尝试）
-        2. 东方财富
-        3. 腾讯财经（仅日线）
-        4. AKShare（如果已安装）
+        数据源（新浪财经由调用方先尝试）：东方财富、腾讯财经（仅日线）、AKShare（如果已安装）。
+        尝试顺序由各数据源近期延迟与成功率决定，慢数据源超过其 p90 延迟时对冲请求下一个。
 
         Args:
             symbol: 股票代码
@@ -355,22 +321,5 @@ class AShareDataSources:
         Returns:
             pd.DataFrame: K线数据
         """
-        # 注意：新浪财经由调用方先尝试，这里只处理降级
-
-        # 尝试东方财富
-        df = AShareDataSources.fetch_from_eastmoney(symbol, scale, datalen)
-        if df is not None and not df.empty:
-            return df
-
-        # 尝试腾讯财经（仅日线）
-        if scale == 240:
-            df = AShareDataSources.fetch_from_tencent(symbol, scale, datalen)
-            if df is not None and not df.empty:
-                return df
-
-        # 尝试AKShare
-        df = AShareDataSources.fetch_from_akshare(symbol, scale, datalen)
-        if df is not None and not df.empty:
-            return df
-
-        return None
+        _, df = fetch_ranked(AShareDataSources.candidates(symbol, scale, datalen), negative_key=(symbol, scale))
+        return df
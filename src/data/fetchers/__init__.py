@@ -3,7 +3,15 @@
 统一导出所有数据获取函数
 """
 
-from .a_share_fetcher import get_name, fetch_kline_data_from_sina, fetch_kline_data_fallback, fetch_kline_data
+from .a_share_fetcher import (
+    get_name,
+    get_names,
+    get_quotes,
+    fetch_kline_data_from_sina,
+    fetch_kline_data_fallback,
+    fetch_kline_data,
+)
+from .async_fetcher import fetch_kline_many, fetch_kline_many_async
 from .hk_stock_fetcher import fetch_kline_data_from_hk_sources, fetch_alternative_1min_data
 from .sector_fetcher import load_sector_index_map, get_sector_index_name, get_sector_indices_data
 from .market_indices_fetcher import get_market_indices_data
@@ -20,9 +28,14 @@ from .data_utils import (
 __all__ = [
     # A股数据获取
     "get_name",
+    "get_names",
+    "get_quotes",
     "fetch_kline_data_from_sina",
     "fetch_kline_data_fallback",
     "fetch_kline_data",
+    # 异步批量获取
+    "fetch_kline_many",
+    "fetch_kline_many_async",
     # 港股数据获取
     "fetch_kline_data_from_hk_sources",
     "fetch_alternative_1min_data",
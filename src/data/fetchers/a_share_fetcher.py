@@ -5,19 +5,193 @@ A股数据获取模块
 
 import re
 import json
-from typing import Optional
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
-import requests
 
 from src.utils.logger import get_logger
-from src.utils.exceptions import DataFetchError
+from src.utils.exceptions import DataFetchError, NoDataError
+from src.utils.http_client import http_get
+from src.data.parsers import parse_sina_kline
+from src.utils.single_flight import single_flight
+from src.utils.metrics import get_metrics
+from src.utils.negative_cache import EMPTY, FAILED, get_negative_cache
+from src.utils.source_stats import fetch_ranked
 
 logger = get_logger(__name__)
 
 
+# 新浪实时行情单次请求的最大代码数
+_SINA_QUOTE_CHUNK = 80
+_SINA_QUOTE_PATTERN = re.compile(r'hq_str_(\w+)="([^"]*)"')
+
+# 进程内名称缓存：symbol -> name
+_name_memo: Dict[str, str] = {}
+_name_memo_lock = threading.Lock()
+
+
+def _to_sina_quote_code(symbol: str) -> Optional[str]:
+    """将 sh600460 / HK.00700 转为新浪行情代码（sh600460 / hk00700）"""
+    if symbol.startswith(("sh", "sz")):
+        return symbol
+    if symbol.startswith("HK."):
+        code = symbol[3:]
+        return f"hk{code.zfill(5)}" if code.isdigit() else None
+    return None
+
+
+def _parse_sina_quote(symbol: str, fields: List[str]) -> Optional[Dict[str, Any]]:
+    """解析新浪行情字段（A股与港股字段顺序不同）"""
+
+    def _num(idx: int) -> Optional[float]:
+        try:
+            return float(fields[idx])
+        except (IndexError, ValueError):
+            return None
+
+    if symbol.startswith("HK."):
+        # 格式：英文名,中文名,开盘,昨收,最高,最低,现价,涨跌,涨跌幅,买一,卖一,成交额,成交量,...,日期,时间
+        if len(fields) < 13 or not fields[1]:
+            return None
+        return {
+            "name": fields[1],
+            "open": _num(2),
+            "prev_close": _num(3),
+            "high": _num(4),
+            "low": _num(5),
+            "price": _num(6),
+            "amount": _num(11),
+            "volume": _num(12),
+            "date": fields[17] if len(fields) > 17 else None,
+            "time": fields[18] if len(fields) > 18 else None,
+        }
+
+    # 格式：名称,开盘,昨收,现价,最高,最低,买一,卖一,成交量,成交额,...,日期,时间
+    if len(fields) < 10 or not fields[0]:
+        return None
+    return {
+        "name": fields[0],
+        "open": _num(1),
+        "prev_close": _num(2),
+        "price": _num(3),
+        "high": _num(4),
+        "low": _num(5),
+        "volume": _num(8),
+        "amount": _num(9),
+        "date": fields[30] if len(fields) > 30 else None,
+        "time": fields[31] if len(fields) > 31 else None,
+    }
+
+
+def get_quotes(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """批量获取实时行情（新浪 hq.sinajs.cn 逗号分隔的多代码接口）
+
+    Args:
+        symbols: 股票代码列表，A股如 sh600460，港股如 HK.00700
+
+    Returns:
+        Dict[symbol, quote]: quote 含 name/open/prev_close/price/high/low/volume/amount/date/time，
+        未返回有效数据的代码不在结果中
+    """
+    sina_to_symbol = {}
+    for symbol in dict.fromkeys(symbols):
+        sina_code = _to_sina_quote_code(symbol)
+        if sina_code:
+            sina_to_symbol[sina_code] = symbol
+
+    quotes: Dict[str, Dict[str, Any]] = {}
+    sina_codes = list(sina_to_symbol)
+    for i in range(0, len(sina_codes), _SINA_QUOTE_CHUNK):
+        chunk = sina_codes[i : i + _SINA_QUOTE_CHUNK]
+        try:
+            response = http_get(f"http://hq.sinajs.cn/list={','.join(chunk)}", profile="sina_quote", timeout=10)
+            if response.status_code != 200:
+                logger.warning("新浪批量行情 HTTP 错误: %s", response.status_code)
+                continue
+            response.encoding = "gbk"
+            for sina_code, data_str in _SINA_QUOTE_PATTERN.findall(response.text):
+                symbol = sina_to_symbol.get(sina_code)
+                if symbol is None or not data_str:
+                    continue
+                quote = _parse_sina_quote(symbol, data_str.split(","))
+                if quote:
+                    quotes[symbol] = quote
+        except Exception as e:
+            logger.warning("新浪批量行情获取失败 (%s 个代码): %s", len(chunk), e)
+
+    logger.debug("批量行情: 请求 %s 个，返回 %s 个", len(sina_codes), len(quotes))
+    return quotes
+
+
+def _get_db():
+    """返回本地数据库（未启用时为 None）"""
+    try:
+        from src.database import get_stock_db
+
+        return get_stock_db()
+    except Exception:
+        return None
+
+
+def get_names(symbols: Iterable[str]) -> Dict[str, str]:
+    """批量获取股票名称
+
+    查找顺序：进程内缓存 → 本地数据库 meta_info.stock_name → 新浪批量行情 → 单只接口兜底。
+    新获取的名称写回数据库，重复运行无需再请求名称。
+
+    Args:
+        symbols: 股票代码列表
+
+    Returns:
+        Dict[symbol, name]: 无法获取名称的代码返回其自身
+    """
+    symbols = [s for s in dict.fromkeys(symbols) if s]
+    with _name_memo_lock:
+        names = {s: _name_memo[s] for s in symbols if s in _name_memo}
+
+    missing = [s for s in symbols if s not in names]
+    db = _get_db() if missing else None
+    if db is not None:
+        try:
+            names.update(db.get_stock_names(missing))
+        except Exception as e:
+            logger.debug("从数据库读取名称失败: %s", e)
+        missing = [s for s in symbols if s not in names]
+
+    fetched: Dict[str, str] = {}
+    if missing:
+        fetched.update({s: q["name"] for s, q in get_quotes(missing).items()})
+        for symbol in missing:
+            if symbol not in fetched:
+                name = _fetch_name_single(symbol)
+                if name and name != symbol:
+                    fetched[symbol] = name
+        names.update(fetched)
+
+    if fetched and db is not None:
+        try:
+            db.save_stock_names(fetched)
+        except Exception as e:
+            logger.debug("名称写入数据库失败: %s", e)
+
+    with _name_memo_lock:
+        _name_memo.update(names)
+
+    return {s: names.get(s, s) for s in symbols}
+
+
 def get_name(symbol: str) -> str:
-    """获取股票名称 - 支持A股和港股"""
+    """获取股票名称 - 支持A股和港股（优先使用缓存与数据库，见 get_names）"""
+    if not symbol:
+        return symbol
+    return get_names([symbol]).get(symbol, symbol)
+
+
+def _fetch_name_single(symbol: str) -> str:
+    """逐只请求股票名称 - 支持A股和港股"""
     try:
         # 港股使用免费数据源（AKShare/yfinance）
         if symbol.startswith("HK."):
@@ -37,17 +211,7 @@ def get_name(symbol: str) -> str:
         if symbol.startswith("sh") or symbol.startswith("sz"):
             # 新浪财经实时数据接口
             url = f"http://hq.sinajs.cn/list={symbol}"
-            headers = {
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                ),
-                "Referer": "https://finance.sina.com.cn",
-                "Accept": "*/*",
-                "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            }
-
-            response = requests.get(url, headers=headers, timeout=10)
+            response = http_get(url, profile="sina_quote", timeout=10)
             response.encoding = "gbk"
 
             if response.status_code == 200:
@@ -69,12 +233,7 @@ def get_name(symbol: str) -> str:
             url = (
                 f"https://push2.eastmoney.com/api/qt/stock/get?" f"secid={market_prefix}{clean_code}&fields=f12,f13,f14"
             )
-            headers = {
-                "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) " "AppleWebKit/537.36"),
-                "Referer": "https://quote.eastmoney.com/",
-            }
-
-            response = requests.get(url, headers=headers, timeout=5)
+            response = http_get(url, profile="eastmoney", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("data"):
@@ -101,7 +260,7 @@ def fetch_kline_data_from_sina(symbol: str, scale: int = 240, datalen: int = 100
         # 提取纯数字代码
         clean_code = re.sub(r"[a-zA-Z]", "", symbol)
         if not clean_code:
-            raise DataFetchError(f"无效的股票代码: {symbol}")
+            raise NoDataError(f"无效的股票代码: {symbol}")
 
         # 新浪财经历史数据接口
         # 日线数据
@@ -118,19 +277,9 @@ def fetch_kline_data_from_sina(symbol: str, scale: int = 240, datalen: int = 100
             url = "https://quotes.sina.cn/cn/api/openapi.php/" "StockV2Service.getMinLine"
             params = {"symbol": symbol.upper(), "scale": scale, "datalen": datalen}
 
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            ),
-            "Referer": "https://finance.sina.com.cn",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        }
-
         logger.debug("从新浪财经获取数据: %s scale=%s", symbol, scale)
 
-        response = requests.get(url, headers=headers, params=params, timeout=15)
+        response = http_get(url, params=params, profile="sina", timeout=15)
 
         if response.status_code != 200:
             raise DataFetchError(f"新浪财经 HTTP 错误: {response.status_code}")
@@ -152,51 +301,12 @@ def fetch_kline_data_from_sina(symbol: str, scale: int = 240, datalen: int = 100
             else:
                 raise DataFetchError("新浪财经响应不是有效 JSON") from parse_err
 
-        # 解析新浪财经返回的数据结构
-        klines = []
+        # 解析新浪财经返回的数据结构（日线与分钟线字段名不同）
+        items = data.get("result", {}).get("data") if isinstance(data, dict) else None
+        df = parse_sina_kline(items or [], minute=scale != 240)
+        if df is None:
+            raise NoDataError(f"新浪财经未返回有效 K 线数据: {symbol}")
 
-        if scale == 240:
-            # 日线数据格式
-            if "result" in data and "data" in data["result"]:
-                for item in data["result"]["data"]:
-                    try:
-                        klines.append(
-                            {
-                                "Date": item["day"],
-                                "Open": float(item["open"]),
-                                "High": float(item["high"]),
-                                "Low": float(item["low"]),
-                                "Close": float(item["close"]),
-                                "Volume": float(item.get("volume", 0)),
-                            }
-                        )
-                    except Exception:
-                        continue
-        else:
-            # 分钟数据格式
-            if "result" in data and "data" in data["result"]:
-                for item in data["result"]["data"]:
-                    try:
-                        klines.append(
-                            {
-                                "Date": f"{item['d']} {item['t']}:00",
-                                "Open": float(item["o"]),
-                                "High": float(item["h"]),
-                                "Low": float(item["l"]),
-                                "Close": float(item["c"]),
-                                "Volume": float(item.get("v", 0)),
-                            }
-                        )
-                    except Exception:
-                        continue
-
-        if not klines:
-            raise DataFetchError(f"新浪财经未返回有效 K 线数据: {symbol}")
-
-        df = pd.DataFrame(klines)
-        df["Date"] = pd.to_datetime(df["Date"])
-        df.set_index("Date", inplace=True)
-        df.sort_index(inplace=True)
         logger.debug("新浪财经获取到 %s 条数据: %s", len(df), symbol)
         return df
 
@@ -214,156 +324,255 @@ def fetch_kline_data_fallback(symbol: str, scale: int = 240, datalen: int = 100)
             f"CN_MarketData.getKLineData?symbol={symbol}&scale={scale}"
             f"&ma=no&datalen={datalen}"
         )
-        headers = {"User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) " "AppleWebKit/537.36")}
-        response = requests.get(url, headers=headers, timeout=20)
+        response = http_get(url, profile="sina_fallback", timeout=20)
         if response.status_code != 200:
             raise DataFetchError(f"新浪备用接口 HTTP 错误: {response.status_code}")
 
         data = response.json()
         if not data:
-            raise DataFetchError("新浪备用接口未返回数据")
-
-        df = pd.DataFrame(data)
-        df.rename(
-            columns={
-                "day": "Date",
-                "open": "Open",
-                "high": "High",
-                "low": "Low",
-                "close": "Close",
-                "volume": "Volume",
-            },
-            inplace=True,
-        )
-
-        cols = ["Open", "High", "Low", "Close", "Volume"]
-        for col in cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        df["Date"] = pd.to_datetime(df["Date"])
-        df.set_index("Date", inplace=True)
-        df.sort_index(inplace=True)
+            raise NoDataError("新浪备用接口未返回数据")
 
-        return df if not df.empty else None
+        return parse_sina_kline(data)
     except DataFetchError:
         raise
     except Exception as e:
         raise DataFetchError(f"备用接口获取失败 {symbol} scale={scale}: {e}") from e
 
 
-def fetch_kline_data(symbol: str, scale: int = 240, datalen: int = 100) -> Optional[pd.DataFrame]:
-    """获取K线数据 - 支持A股和港股（统一入口，自动降级，带缓存；仅从网络获取，不读不写数据库）
+# 各周期每个交易日的 K 线条数（A股 4 小时交易时段）
+_BARS_PER_DAY = {240: 1, 60: 4, 30: 8, 15: 16, 5: 48, 1: 240}
+
+
+# fetch_kline_data 的指标范围（键族为 "kline:<周期>"）
+_METRICS_SCOPE = "fetch"
+
+# 1分钟替代方法在负缓存中的数据源名称
+_ALTERNATIVE_1MIN = "alternative_1min"
+
+
+def _fetch_kline_from_sources(
+    symbol: str, scale: int, datalen: int, incremental: bool = False
+) -> Optional[pd.DataFrame]:
+    """从各网络数据源获取K线（不读缓存、不读写数据库）
+
+    A股数据源按近期延迟与成功率排序，首选数据源超过其 p90 延迟未返回时对冲请求下一个。
+
+    1分钟替代方法生成的模拟数据会标记 df.attrs["synthetic"] = True，调用方不应持久化。
+
+    incremental=True 表示读穿的增量请求（只取最新几条）：尚无新 K 线是正常情况，
+    无数据不记入负缓存，也不尝试1分钟替代方法。
+    """
+    if symbol.startswith("HK."):
+        from .hk_stock_fetcher import fetch_kline_data_from_hk_sources
+
+        try:
+            df = fetch_kline_data_from_hk_sources(symbol, scale, datalen)
+        except DataFetchError as e:
+            logger.warning("港股数据获取失败 %s: %s", symbol, e)
+            df = None
+        return df if (df is not None and not df.empty) else None
+
+    # 新浪主接口、新浪备用接口与其他数据源按近期延迟/成功率排序，慢数据源超时对冲
+    candidates = [
+        ("sina", lambda: fetch_kline_data_from_sina(symbol, scale, datalen)),
+        ("sina_fallback", lambda: fetch_kline_data_fallback(symbol, scale, datalen)),
+    ]
+    if symbol.startswith(("sh", "sz")):
+        from ..a_share_data_sources import AShareDataSources
+
+        candidates.extend(AShareDataSources.candidates(symbol, scale, datalen))
+    source, df = fetch_ranked(candidates, negative_key=(symbol, scale), record_negative=not incremental)
+    if source is not None:
+        logger.debug("K线数据来自 %s: %s scale=%s", source, symbol, scale)
+
+    negative = get_negative_cache()
+    if (df is None or df.empty) and scale == 1 and not incremental:
+        if negative is not None and negative.get(symbol, scale, _ALTERNATIVE_1MIN) is not None:
+            logger.debug("负缓存跳过1分钟替代方法: %s", symbol)
+            return None
+        logger.info("所有数据源1分钟数据不可用，尝试替代方法: %s", symbol)
+        try:
+            from .hk_stock_fetcher import fetch_alternative_1min_data
+
+            df = fetch_alternative_1min_data(symbol, days=5)
+            if df is not None and not df.empty:
+                df.attrs["synthetic"] = True
+                logger.info("替代方法获取到 %s 条1分钟数据", len(df))
+            elif negative is not None:
+                negative.record(symbol, scale, _ALTERNATIVE_1MIN, EMPTY)
+        except Exception as e:
+            logger.warning("替代方法失败: %s", e)
+            if negative is not None:
+                negative.record(symbol, scale, _ALTERNATIVE_1MIN, FAILED, e)
+
+    return df if (df is not None and not df.empty) else None
+
+
+def _estimate_missing_bars(latest: pd.Timestamp, scale: int) -> int:
+    """估算库中最新一条之后缺失的 K 线条数（按工作日计，含最新一条以便覆盖未收盘的 K 线）"""
+    import numpy as np
+
+    today = pd.Timestamp.now().normalize()
+    days = int(np.busday_count(latest.normalize().date(), today.date())) + 1
+    bars_per_day = _BARS_PER_DAY.get(scale, max(1, 240 // max(scale, 1)))
+    return max(1, days) * bars_per_day + 1
+
+
+def _kline_cache_expiry(symbol: str, scale: int) -> float:
+    """K线缓存的过期时间戳：按所属市场交易日历，下一根 K 线收盘（并留出数据源更新时间）时过期
+
+    交易时段内正在形成的 K 线在其收盘前沿用缓存；收盘后至下一交易日第一根 K 线收盘前
+    （含周末与节假日）不会出现新 K 线，全部由缓存提供。
+    """
+    from src.utils.trading_calendar import get_trading_calendar, to_timestamp
+
+    try:
+        from src.config import Config
+
+        settle = timedelta(minutes=Config().get("cache.bar_settle_minutes", 2))
+    except Exception:
+        settle = timedelta(minutes=2)
+    market = "HK" if symbol.startswith("HK.") else "A"
+    close = get_trading_calendar(market).next_bar_close(scale, settle=settle)
+    return to_timestamp(close + settle)
+
+
+def _read_through_enabled() -> bool:
+    """是否启用数据库读穿（database.read_through）"""
+    try:
+        from src.config import Config
+
+        return bool(Config().get("database.read_through", False))
+    except Exception:
+        return False
+
+
+def _fetch_kline_read_through(db, symbol: str, scale: int, datalen: int) -> Optional[pd.DataFrame]:
+    """数据库读穿：已存 K 线从 SQLite 读取，只向数据源请求最新日期之后的部分，新数据回写数据库
+
+    Args:
+        db: StockDatabase 实例
+        symbol: 股票代码
+        scale: K线周期
+        datalen: 需要的数据长度
+
+    Returns:
+        pd.DataFrame: 最近 datalen 条 K 线
+    """
+    stored = None
+    try:
+        latest = db.get_latest_date(symbol, scale)
+        if latest is not None:
+            stored = db.get_kline_data(symbol, scale, limit=datalen)
+    except Exception as e:
+        logger.warning("读取数据库K线失败 %s scale=%s: %s", symbol, scale, e)
+        latest = None
+
+    # 库中不足 datalen 条：完整拉取
+    if stored is None or len(stored) < datalen:
+        df = _fetch_kline_from_sources(symbol, scale, datalen)
+        if df is not None and not df.attrs.get("synthetic"):
+            db.save_kline_data(symbol, scale, df)
+        return df if df is not None else stored
+
+    delta = min(datalen, _estimate_missing_bars(latest, scale))
+    new = _fetch_kline_from_sources(symbol, scale, delta, incremental=True)
+    if new is None or new.attrs.get("synthetic"):
+        logger.debug("增量获取无新数据 %s scale=%s，使用数据库数据", symbol, scale)
+        return stored
+
+    # 增量窗口未与库中数据衔接（中间有缺口）：完整拉取
+    if new.index.min() > latest:
+        logger.debug("增量数据与库中数据存在缺口 %s scale=%s，完整拉取", symbol, scale)
+        full = _fetch_kline_from_sources(symbol, scale, datalen)
+        if full is None or full.attrs.get("synthetic"):
+            return stored
+        db.save_kline_data(symbol, scale, full)
+        return full
+
+    fresh = new[new.index >= latest]
+    if not fresh.empty:
+        db.save_kline_data(symbol, scale, fresh)
+    merged = pd.concat([stored[stored.index < fresh.index.min()], fresh]) if not fresh.empty else stored
+    logger.debug("数据库读穿 %s scale=%s: 库中 %s 条，新增/更新 %s 条", symbol, scale, len(stored), len(fresh))
+    return merged.sort_index().tail(datalen)
+
+
+@single_flight
+def fetch_kline_data(
+    symbol: str, scale: int = 240, datalen: int = 100, use_db: Optional[bool] = None
+) -> Optional[pd.DataFrame]:
+    """获取K线数据 - 支持A股和港股（统一入口，自动降级，带缓存）
+
+    启用数据库读穿时（use_db=True 或配置 database.read_through），库中已有的 K 线直接从 SQLite 读取，
+    只向数据源请求最新日期之后的 K 线，并将新数据写回数据库。
+    参数相同的并发调用合并为一次获取，共享同一结果。
 
     Args:
         symbol: 股票代码，A股如 sh600460，港股如 HK.00700
         scale: K线周期，240=日线，30=30分钟，5=5分钟，1=1分钟
         datalen: 数据长度
+        use_db: 是否使用数据库读穿，None 使用 database.read_through 配置
 
     Returns:
         pd.DataFrame: K线数据
     """
     is_ashare = symbol.startswith("sh") or symbol.startswith("sz")
+    # 按周期统计调用次数与各获取路径（缓存/数据库读穿/数据源）的耗时
+    metrics, family = get_metrics(), f"kline:{scale}"
+    metrics.incr(_METRICS_SCOPE, family, "calls")
+    started = time.monotonic()
 
-    # 尝试从缓存获取（交易日且是日线数据时，需要检查缓存数据是否包含今天的数据）
+    # 尝试从缓存获取（条目在下一根 K 线收盘时过期，见 _kline_cache_expiry）
     try:
         from src.utils.cache import get_cache
-        from src.utils.trading_hours import is_china_stock_market_open
-        import pandas as pd
 
         cache = get_cache()
         if cache is not None:
-            if scale == 240:
-                ttl_hours = 24
-            elif scale in [30, 5]:
-                ttl_hours = 1
-            else:
-                ttl_hours = 0.5
-            cached_data = cache.get(
-                "fetch_kline_data",
-                ttl_hours=ttl_hours,
-                symbol=symbol,
-                scale=scale,
-                datalen=datalen,
-            )
+            cached_data = cache.get("fetch_kline_data", symbol=symbol, scale=scale, datalen=datalen)
             if cached_data is not None:
-                # 如果是交易日且是日线数据，检查缓存数据是否包含今天的数据
-                if is_ashare and scale == 240 and is_china_stock_market_open():
-                    today = pd.Timestamp.now().date()
-                    latest_date = cached_data.index.max().date() if not cached_data.empty else None
-                    if latest_date == today:
-                        # 缓存数据包含今天的数据，可以使用
-                        logger.debug("缓存数据包含今天的数据 %s，使用缓存", symbol)
-                        return cached_data
-                    else:
-                        # 缓存数据不包含今天的数据，跳过缓存，执行增量更新
-                        logger.debug(
-                            "缓存数据不包含今天的数据 %s（最新日期：%s），跳过缓存",
-                            symbol,
-                            latest_date,
-                        )
-                else:
-                    # 非交易日或非日线数据，直接使用缓存
-                    return cached_data
+                metrics.incr(_METRICS_SCOPE, family, "cache_hits")
+                metrics.observe(_METRICS_SCOPE, family, "cache", time.monotonic() - started)
+                return cached_data
     except Exception:
         pass
 
-    if symbol.startswith("HK."):
-        from .hk_stock_fetcher import fetch_kline_data_from_hk_sources
+    if use_db is None:
+        use_db = _read_through_enabled()
+    db = _get_db() if use_db else None
 
+    path = "db" if db is not None else "network"
+    if db is not None:
         try:
-            df = fetch_kline_data_from_hk_sources(symbol, scale, datalen)
-        except DataFetchError as e:
-            logger.warning("港股数据获取失败 %s: %s", symbol, e)
-            df = None
+            df = _fetch_kline_read_through(db, symbol, scale, datalen)
+        except Exception as e:
+            logger.warning("数据库读穿失败 %s scale=%s: %s，改为直接获取", symbol, scale, e)
+            path = "network"
+            df = _fetch_kline_from_sources(symbol, scale, datalen)
     else:
-        df = None
-        if df is None:
-            try:
-                df = fetch_kline_data_from_sina(symbol, scale, datalen)
-            except DataFetchError as e:
-                logger.debug("新浪主接口失败 %s: %s，尝试备用", symbol, e)
-            if df is None or df.empty:
-                try:
-                    df = fetch_kline_data_fallback(symbol, scale, datalen)
-                except DataFetchError as e:
-                    logger.debug("新浪备用接口失败 %s: %s", symbol, e)
-            if (df is None or df.empty) and symbol.startswith(("sh", "sz")):
-                logger.info("新浪财经接口不可用，尝试其他数据源: %s", symbol)
-                try:
-                    from ..a_share_data_sources import AShareDataSources
-
-                    df = AShareDataSources.get_kline_with_fallback(symbol, scale, datalen)
-                except Exception as e:
-                    logger.warning("其他数据源获取失败 %s: %s", symbol, e)
-            if (df is None or df.empty) and scale == 1:
-                logger.info("所有数据源1分钟数据不可用，尝试替代方法: %s", symbol)
-                try:
-                    from .hk_stock_fetcher import fetch_alternative_1min_data
-
-                    df = fetch_alternative_1min_data(symbol, days=5)
-                    if df is not None and not df.empty:
-                        logger.info("替代方法获取到 %s 条1分钟数据", len(df))
-                except Exception as e:
-                    logger.warning("替代方法失败: %s", e)
+        df = _fetch_kline_from_sources(symbol, scale, datalen)
+    metrics.incr(_METRICS_SCOPE, family, path)
+    metrics.observe(_METRICS_SCOPE, family, path, time.monotonic() - started)
 
-            # 如果是交易日且是日线数据，检查获取到的数据是否包含今天的数据
-            if df is not None and not df.empty and is_ashare and scale == 240:
-                try:
-                    from src.utils.trading_hours import is_china_stock_market_open
-                    import pandas as pd
-
-                    if is_china_stock_market_open():
-                        today = pd.Timestamp.now().date()
-                        latest_date = df.index.max().date() if not df.empty else None
-                        if latest_date != today:
-                            logger.warning(
-                                "今天是交易日，但完整获取的数据不包含今天的数据 %s（最新日期：%s），返回None",
-                                symbol,
-                                latest_date,
-                            )
-                            return None
-                except Exception as e:
-                    logger.debug("检查数据日期失败 %s: %s", symbol, e)
+    # A股日线：检查获取到的数据是否包含最近一个已开盘交易日的K线（开盘前为上一交易日）
+    if df is not None and not df.empty and is_ashare and scale == 240:
+        try:
+            from src.utils.trading_calendar import get_trading_calendar
+
+            expected = get_trading_calendar("A").last_session_day()
+            latest_date = df.index.max().date()
+            if latest_date < expected:
+                logger.warning(
+                    "获取的数据缺少最近交易日的K线 %s（最新日期：%s，应为：%s），返回None",
+                    symbol,
+                    latest_date,
+                    expected,
+                )
+                metrics.incr(_METRICS_SCOPE, family, "stale")
+                return None
+            logger.debug("验证通过：返回的数据包含最近交易日的K线 %s", symbol)
+        except Exception as e:
+            logger.debug("检查数据日期失败 %s: %s", symbol, e)
 
     # 保存到缓存
     if df is not None and not df.empty:
@@ -372,42 +581,17 @@ def fetch_kline_data(symbol: str, scale: int = 240, datalen: int = 100) -> Optio
 
             cache = get_cache()
             if cache is not None:
-                if scale == 240:
-                    ttl_hours = 24
-                elif scale in [30, 5]:
-                    ttl_hours = 1
-                else:
-                    ttl_hours = 0.5
                 cache.set(
                     "fetch_kline_data",
                     df,
-                    ttl_hours=ttl_hours,
+                    expires_at=_kline_cache_expiry(symbol, scale),
                     symbol=symbol,
                     scale=scale,
                     datalen=datalen,
                 )
         except Exception:
             pass
-
-    # 最终验证：如果是交易日且是日线数据，确保返回的数据包含今天的数据
-    if df is not None and not df.empty and is_ashare and scale == 240:
-        try:
-            from src.utils.trading_hours import is_china_stock_market_open
-            import pandas as pd
-
-            if is_china_stock_market_open():
-                today = pd.Timestamp.now().date()
-                latest_date = df.index.max().date() if not df.empty else None
-                if latest_date != today:
-                    logger.warning(
-                        "最终验证失败：今天是交易日，但返回的数据不包含今天的数据 %s（最新日期：%s），返回None",
-                        symbol,
-                        latest_date,
-                    )
-                    return None
-                else:
-                    logger.debug("最终验证通过：返回的数据包含今天的数据 %s", symbol)
-        except Exception as e:
-            logger.debug("最终验证异常 %s: %s", symbol, e)
+    else:
+        metrics.incr(_METRICS_SCOPE, family, "empty")
 
     return df if (df is not None and not df.empty) else None
@@ -0,0 +1,143 @@
+"""
+异步K线批量获取模块
+将多个 (symbol, scale, datalen) 请求同时发出，批量耗时取决于最慢的单个请求而非请求总和
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+KlineRequest = Tuple[str, int, int]
+KlineResult = Union[pd.DataFrame, Exception, None]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_max_concurrency() -> int:
+    """读取 http.max_concurrency 配置（默认16）"""
+    try:
+        from src.config import Config
+
+        return int(Config().get("http.max_concurrency", 16))
+    except Exception:
+        return 16
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """批量获取共享线程池（首次使用时按 http.max_concurrency 创建，各次调用复用同一批线程）"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, _default_max_concurrency()), thread_name_prefix="kline-fetch"
+                )
+    return _executor
+
+
+def _unique_requests(requests: Iterable[KlineRequest]) -> List[KlineRequest]:
+    """去重并保持原有顺序"""
+    seen = set()
+    unique = []
+    for req in requests:
+        req = (req[0], int(req[1]), int(req[2]))
+        if req not in seen:
+            seen.add(req)
+            unique.append(req)
+    return unique
+
+
+async def fetch_kline_many_async(
+    requests: Iterable[KlineRequest],
+    max_concurrency: Optional[int] = None,
+    fetch_func: Optional[Callable[..., Optional[pd.DataFrame]]] = None,
+    return_exceptions: bool = False,
+) -> Dict[KlineRequest, KlineResult]:
+    """异步批量获取K线数据
+
+    所有请求同时在途（受 max_concurrency 与 HTTP 客户端的每 host 并发上限约束），
+    每个请求的结果与单独调用 fetch_kline_data 相同。
+
+    Args:
+        requests: (symbol, scale, datalen) 列表，重复请求只获取一次
+        max_concurrency: 本次调用的并发数，None 使用 http.max_concurrency 配置
+            （请求在共享线程池中执行，实际并发同时受线程池大小限制）
+        fetch_func: 单个请求的获取函数，默认 fetch_kline_data
+        return_exceptions: True 时失败请求的结果为异常对象，否则记录日志并返回 None
+
+    Returns:
+        Dict[(symbol, scale, datalen), DataFrame]: 获取结果
+    """
+    if fetch_func is None:
+        from .a_share_fetcher import fetch_kline_data as fetch_func
+
+    unique = _unique_requests(requests)
+    if not unique:
+        return {}
+
+    workers = max(1, min(len(unique), max_concurrency or _default_max_concurrency()))
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def _fetch_one(req: KlineRequest) -> Tuple[KlineRequest, KlineResult]:
+        try:
+            async with semaphore:
+                df = await loop.run_in_executor(executor, fetch_func, *req)
+            return req, df
+        except Exception as e:
+            if return_exceptions:
+                return req, e
+            logger.warning("批量获取失败 %s scale=%s: %s", req[0], req[1], e)
+            return req, None
+
+    logger.debug("异步批量获取 %s 个K线请求（并发 %s）", len(unique), workers)
+    results = await asyncio.gather(*(_fetch_one(req) for req in unique))
+    return dict(results)
+
+
+def fetch_kline_many(
+    requests: Iterable[KlineRequest],
+    max_concurrency: Optional[int] = None,
+    fetch_func: Optional[Callable[..., Optional[pd.DataFrame]]] = None,
+    return_exceptions: bool = False,
+) -> Dict[KlineRequest, KlineResult]:
+    """批量获取K线数据（同步入口，参数同 fetch_kline_many_async）
+
+    可在普通线程（如 batch_process 的工作线程）中直接调用；
+    若当前线程已有运行中的事件循环，则在独立线程中执行。
+
+    Returns:
+        Dict[(symbol, scale, datalen), DataFrame]: 获取结果
+    """
+    coro_args = (list(requests), max_concurrency, fetch_func, return_exceptions)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(fetch_kline_many_async(*coro_args))
+
+    # 已在事件循环中：不能嵌套 asyncio.run，改在独立线程中运行
+    box: Dict[str, object] = {}
+
+    def _runner():
+        try:
+            box["result"] = asyncio.run(fetch_kline_many_async(*coro_args))
+        except Exception as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=_runner, name="kline-fetch-loop")
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]
+    return box.get("result", {})
@@ -1,6 +1,7 @@
 """
 市场指数数据获取模块
-获取A股和港股市场指数数据；仅从网络获取，不读不写数据库。
+获取A股和港股市场指数数据；A股指数经 fetch_kline_data 获取（启用 database.read_through 时增量读写数据库），
+结果缓存并在过期后后台刷新。
 """
 
 from typing import Dict, Any
@@ -10,10 +11,16 @@ import pandas as pd
 # 导入数据获取和技术分析模块
 from .a_share_fetcher import fetch_kline_data
 from src.analysis import calculate_technical_indicators
+from src.utils.single_flight import single_flight
+from src.utils.stale_while_revalidate import get_or_revalidate
 
 
+@single_flight
 def get_market_indices_data(is_hk: bool = False) -> Dict[str, Any]:
-    """获取市场指数数据 - 仅从网络获取，带缓存
+    """获取市场指数数据 - 带缓存，并发的相同请求合并为一次获取
+
+    缓存 6 小时内直接返回；过期后在 cache.max_stale_hours 内先返回旧数据并在后台刷新，
+    生成报告时不等待指数获取。
 
     Args:
         is_hk: 是否为港股市场
@@ -21,19 +28,11 @@ def get_market_indices_data(is_hk: bool = False) -> Dict[str, Any]:
     Returns:
         dict: {code: {'name': name, 'data': df, 'type': 'A' or 'HK'}}
     """
-    # 尝试从缓存获取
-    try:
-        from src.utils.cache import get_cache
-
-        cache = get_cache()
-        if cache is not None:
-            # 指数数据缓存6小时
-            cached_data = cache.get("get_market_indices_data", ttl_hours=6, is_hk=is_hk)
-            if cached_data is not None:
-                return cached_data
-    except Exception:
-        pass
+    return get_or_revalidate("get_market_indices_data", lambda: _load_market_indices(is_hk), ttl_hours=6, is_hk=is_hk)
+
 
+def _load_market_indices(is_hk: bool) -> Dict[str, Any]:
+    """从数据源获取市场指数数据（不经缓存）"""
     indices_data = {}
 
     if is_hk:
@@ -119,15 +118,4 @@ def get_market_indices_data(is_hk: bool = False) -> Dict[str, Any]:
             else:
                 print("    ❌ 获取失败")
 
-    # 保存到缓存
-    if indices_data:
-        try:
-            from src.utils.cache import get_cache
-
-            cache = get_cache()
-            if cache is not None:
-                cache.set("get_market_indices_data", indices_data, ttl_hours=6, is_hk=is_hk)
-        except Exception:
-            pass
-
     return indices_data
@@ -7,6 +7,9 @@ import os
 import json
 from typing import Optional, Dict, Any
 
+from src.utils.single_flight import single_flight
+from src.utils.stale_while_revalidate import get_or_revalidate
+
 
 def load_sector_index_map() -> Dict[str, Any]:
     """加载行业代码对照表"""
@@ -44,9 +47,10 @@ def get_sector_index_name(sector_input: str) -> Optional[str]:
     return None
 
 
+@single_flight
 def get_sector_indices_data(sector_input: Optional[str] = None, count: int = 150) -> Dict[str, Any]:
     """
-    获取行业板块指数数据
+    获取行业板块指数数据 - 带缓存，并发的相同请求合并为一次获取
 
     Args:
         sector_input: 行业代码（如"BK1031"）或行业名称（如"光伏设备"）
@@ -55,10 +59,22 @@ def get_sector_indices_data(sector_input: Optional[str] = None, count: int = 150
     Returns:
         dict: {code: {'name': name, 'data': df, 'type': 'SECTOR'}}
     """
-    sector_data = {}
-
     if not sector_input:
-        return sector_data
+        return {}
+
+    # 缓存 6 小时内直接返回；过期后在 cache.max_stale_hours 内先返回旧数据并在后台刷新
+    return get_or_revalidate(
+        "get_sector_indices_data",
+        lambda: _load_sector_indices(sector_input, count),
+        ttl_hours=6,
+        sector_input=sector_input,
+        count=count,
+    )
+
+
+def _load_sector_indices(sector_input: str, count: int) -> Dict[str, Any]:
+    """从数据源获取行业板块指数数据（不经缓存）"""
+    sector_data = {}
 
     try:
         import akshare as ak
@@ -4,31 +4,55 @@
 """
 
 import logging
-import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import pandas as pd
 import requests
 
+from src.data.parsers import EASTMONEY_FIELDS, parse_delimited_klines
+from src.utils.circuit_breaker import OPEN, get_breaker, guarded_call
+from src.utils.exceptions import CircuitOpenError
+from src.utils.http_client import http_get
+from src.utils.negative_cache import EMPTY, get_negative_cache
+from src.utils.rate_limiter import get_rate_limiter
+
 logger = logging.getLogger(__name__)
 
 
-def _request_with_retry(url, params=None, headers=None, timeout=10, retries=2, backoff=1.0):
-    """简单重试封装，缓解临时网络波动"""
+def _request_with_retry(url, params=None, headers=None, timeout=10, retries=2, profile="default"):
+    """简单重试封装，缓解临时网络波动（经共享连接池发送，重试间隔由 host 的自适应限速器决定）"""
     last_exc = None
-    for attempt in range(retries + 1):
+    for _ in range(retries + 1):
         try:
-            return requests.get(url, params=params, headers=headers, timeout=timeout)
+            return http_get(url, params=params, headers=headers, timeout=timeout, profile=profile)
         except Exception as exc:
             last_exc = exc
-            if attempt < retries:
-                time.sleep(backoff * (attempt + 1))
     if last_exc:
         raise last_exc
     return None
 
 
+def _paced_akshare(fetch):
+    """AKShare 请求不经 http_get，改由名为 akshare 的自适应限速器控制节奏（失败时降速）"""
+
+    def call():
+        limiter = get_rate_limiter("akshare")
+        limiter.acquire()
+        try:
+            df = fetch()
+        except Exception:
+            limiter.on_throttle()
+            raise
+        limiter.on_success()
+        return df
+
+    return call
+
+
+# K线周期与负缓存中使用的周期（分钟）对应关系，与 A 股的 scale 一致
+_PERIOD_SCALES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "1d": 240}
+
 try:
     import akshare as ak
 
@@ -61,11 +85,7 @@ class HKDataSources:
         try:
             sina_code = f"hk{symbol}"
             url = f"http://hq.sinajs.cn/list={sina_code}"
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://finance.sina.com.cn",
-            }
-            response = _request_with_retry(url, headers=headers, timeout=10)
+            response = _request_with_retry(url, timeout=10, profile="sina_quote")
             response.encoding = "gbk"
 
             if response.status_code == 200:
@@ -85,11 +105,7 @@ class HKDataSources:
             em_code = f"116.{symbol}"
             url = "https://push2.eastmoney.com/api/qt/stock/get"
             params = {"secid": em_code, "fields": "f12,f13,f14"}
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://quote.eastmoney.com/",
-            }
-            response = _request_with_retry(url, params=params, headers=headers, timeout=10)
+            response = _request_with_retry(url, params=params, timeout=10, profile="eastmoney")
             if response.status_code == 200:
                 data = response.json()
                 if data.get("data") and data["data"].get("f14"):
@@ -138,15 +154,9 @@ class HKDataSources:
             url = "https://quotes.sina.com.cn/cn/api/jsonp_v2.php/var%20_hk/HK_StockService.getHKKLineData"
             params = {"symbol": symbol, "scale": scale, "datalen": min(count, 1023)}
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://finance.sina.com.cn",
-            }
-
-            response = _request_with_retry(url, params=params, headers=headers, timeout=15)
+            response = _request_with_retry(url, params=params, timeout=15, profile="sina")
 
-            if response.status_code != 200:
-                return None
+            response.raise_for_status()
 
             text = response.text
             # 解析 JSONP: var _hk=[{...}];
@@ -196,6 +206,9 @@ class HKDataSources:
 
         except Exception as e:
             logger.error(f"新浪财经获取数据失败 {code}: {e}")
+            # 网络/HTTP 错误向上抛出，由熔断器计为数据源失败；其余情况视为无数据
+            if isinstance(e, requests.RequestException):
+                raise
             return None
 
     @staticmethod
@@ -226,15 +239,9 @@ class HKDataSources:
                 "lmt": count,
             }
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Referer": "https://quote.eastmoney.com/",
-            }
-
-            response = _request_with_retry(url, params=params, headers=headers, timeout=15)
+            response = _request_with_retry(url, params=params, timeout=15, profile="eastmoney")
 
-            if response.status_code != 200:
-                return None
+            response.raise_for_status()
 
             data = response.json()
 
@@ -243,32 +250,10 @@ class HKDataSources:
 
             klines = data["data"]["klines"]
 
-            # 解析数据
-            data_list = []
-            for kline_str in klines:
-                parts = kline_str.split(",")
-                if len(parts) >= 6:
-                    try:
-                        data_list.append(
-                            {
-                                "Date": pd.to_datetime(parts[0]),
-                                "Open": float(parts[1]),
-                                "Close": float(parts[2]),
-                                "High": float(parts[3]),
-                                "Low": float(parts[4]),
-                                "Volume": float(parts[5]),
-                            }
-                        )
-                    except Exception:
-                        continue
-
-            if not data_list:
+            df = parse_delimited_klines(klines, EASTMONEY_FIELDS)
+            if df is None:
                 return None
 
-            df = pd.DataFrame(data_list)
-            df.set_index("Date", inplace=True)
-            df.sort_index(inplace=True)
-
             # 限制数据量
             if len(df) > count:
                 df = df.tail(count)
@@ -278,94 +263,138 @@ class HKDataSources:
 
         except Exception as e:
             logger.error(f"东方财富获取数据失败 {code}: {e}")
+            # 网络/HTTP 错误向上抛出，由熔断器计为数据源失败；其余情况视为无数据
+            if isinstance(e, requests.RequestException):
+                raise
+            return None
+
+    @staticmethod
+    def _get_kline_from_akshare_min(symbol: str, period: str, count: int) -> Optional[pd.DataFrame]:
+        """从 AKShare 获取港股分钟K线"""
+        minute_map = {"1m": "1", "5m": "5", "15m": "15", "30m": "30", "60m": "60"}
+        now = datetime.now()
+        start = (now - timedelta(days=7)).strftime("%Y-%m-%d 09:30:00")
+        end = now.strftime("%Y-%m-%d %H:%M:%S")
+        df = ak.stock_hk_hist_min_em(
+            symbol=symbol, period=minute_map[period], adjust="", start_date=start, end_date=end
+        )
+        if df is None or df.empty:
+            return None
+        df = df.tail(count).copy()
+        df.rename(
+            columns={
+                "时间": "Date",
+                "开盘": "Open",
+                "收盘": "Close",
+                "最高": "High",
+                "最低": "Low",
+                "成交量": "Volume",
+            },
+            inplace=True,
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        df.set_index("Date", inplace=True)
+        df.sort_index(inplace=True)
+        logger.info(f"✅ 从AKShare获取 {len(df)} 条分钟数据")
+        return df
+
+    @staticmethod
+    def _get_kline_from_akshare_hist(symbol: str, period: str, count: int) -> Optional[pd.DataFrame]:
+        """从 AKShare 获取港股日/周/月K线"""
+        period_map = {"1d": "daily", "1w": "weekly", "1M": "monthly"}
+        if period not in period_map:
+            return None
+        now = datetime.now()
+        df = ak.stock_hk_hist(
+            symbol=symbol,
+            period=period_map[period],
+            start_date=(now - timedelta(days=365 * 3)).strftime("%Y%m%d"),
+            end_date=now.strftime("%Y%m%d"),
+            adjust="",
+        )
+        if df is None or df.empty:
             return None
+        df = df.tail(count).copy()
+        df.rename(
+            columns={
+                "日期": "Date",
+                "开盘": "Open",
+                "收盘": "Close",
+                "最高": "High",
+                "最低": "Low",
+                "成交量": "Volume",
+            },
+            inplace=True,
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        df.set_index("Date", inplace=True)
+        df.sort_index(inplace=True)
+        logger.info(f"✅ 从AKShare获取 {len(df)} 条数据")
+        return df
 
     @staticmethod
     def get_kline_with_fallback(code: str, period: str = "1d", count: int = 100) -> Optional[pd.DataFrame]:
-        """获取港股K线（多个数据源自动降级）"""
+        """获取港股K线（多个数据源自动降级）
+
+        各数据源经进程级熔断器调用：已熔断的数据源直接跳过，全部熔断时不再重试等待。
+        """
         symbol = HKDataSources.normalize_code(code)
-        minute_map = {"1m": "1", "5m": "5", "15m": "15", "30m": "30", "60m": "60"}
 
-        # 针对网络不稳定做整体重试
-        for attempt in range(3):
-            if attempt > 0:
-                time.sleep(2 * attempt)
-
-            # 分钟线优先用 AKShare（接口支持分钟）
-            if period in minute_map:
-                if AK_AVAILABLE:
-                    try:
-                        now = datetime.now()
-                        start = (now - timedelta(days=7)).strftime("%Y-%m-%d 09:30:00")
-                        end = now.strftime("%Y-%m-%d %H:%M:%S")
-                        df = ak.stock_hk_hist_min_em(
-                            symbol=symbol, period=minute_map[period], adjust="", start_date=start, end_date=end
-                        )
-                        if df is not None and not df.empty:
-                            df = df.tail(count).copy()
-                            df.rename(
-                                columns={
-                                    "时间": "Date",
-                                    "开盘": "Open",
-                                    "收盘": "Close",
-                                    "最高": "High",
-                                    "最低": "Low",
-                                    "成交量": "Volume",
-                                },
-                                inplace=True,
-                            )
-                            df["Date"] = pd.to_datetime(df["Date"])
-                            df.set_index("Date", inplace=True)
-                            df.sort_index(inplace=True)
-                            logger.info(f"✅ 从AKShare获取 {len(df)} 条分钟数据")
-                            return df
-                    except Exception as e:
-                        logger.debug(f"AKShare分钟数据失败: {e}")
-                continue
-
-            # 1. 优先尝试东方财富（目前对港股最稳定）
-            df = HKDataSources.get_kline_from_eastmoney(symbol, period, count)
-            if df is not None and not df.empty:
-                return df
-
-            # 2. 尝试新浪财经
-            df = HKDataSources.get_kline_from_sina(symbol, period, count)
-            if df is not None and not df.empty:
-                return df
-
-            # 3. 尝试AKShare（如果可用）
+        # 分钟线只用 AKShare（接口支持分钟）；日线优先东方财富（目前对港股最稳定），其次新浪财经、AKShare
+        if period in {"1m", "5m", "15m", "30m", "60m"}:
+            sources = []
             if AK_AVAILABLE:
+                sources.append(
+                    (
+                        "akshare",
+                        _paced_akshare(lambda: HKDataSources._get_kline_from_akshare_min(symbol, period, count)),
+                    )
+                )
+        else:
+            sources = [
+                ("eastmoney", lambda: HKDataSources.get_kline_from_eastmoney(symbol, period, count)),
+                ("sina", lambda: HKDataSources.get_kline_from_sina(symbol, period, count)),
+            ]
+            if AK_AVAILABLE:
+                sources.append(
+                    (
+                        "akshare",
+                        _paced_akshare(lambda: HKDataSources._get_kline_from_akshare_hist(symbol, period, count)),
+                    )
+                )
+
+        # 近期对该代码无数据的数据源（负缓存）直接跳过
+        negative = get_negative_cache()
+        negative_symbol, scale = f"HK.{symbol}", _PERIOD_SCALES.get(period, period)
+        if negative is not None:
+            sources = [(name, fetch) for name, fetch in sources if negative.get(negative_symbol, scale, name) is None]
+
+        # 针对网络不稳定做整体重试：不固定等待，由各 host 的自适应限速器（失败后降速）与熔断器控制节奏
+        empty = set()
+        for _ in range(3):
+            attempted = False
+            for name, fetch in sources:
+                if get_breaker(name).state == OPEN:
+                    continue
+                attempted = True
                 try:
-                    now = datetime.now()
-                    if period in {"1d", "1w", "1M"}:
-                        period_map = {"1d": "daily", "1w": "weekly", "1M": "monthly"}
-                        df = ak.stock_hk_hist(
-                            symbol=symbol,
-                            period=period_map[period],
-                            start_date=(now - timedelta(days=365 * 3)).strftime("%Y%m%d"),
-                            end_date=now.strftime("%Y%m%d"),
-                            adjust="",
-                        )
-                        if df is not None and not df.empty:
-                            df = df.tail(count).copy()
-                            df.rename(
-                                columns={
-                                    "日期": "Date",
-                                    "开盘": "Open",
-                                    "收盘": "Close",
-                                    "最高": "High",
-                                    "最低": "Low",
-                                    "成交量": "Volume",
-                                },
-                                inplace=True,
-                            )
-                            df["Date"] = pd.to_datetime(df["Date"])
-                            df.set_index("Date", inplace=True)
-                            df.sort_index(inplace=True)
-                            logger.info(f"✅ 从AKShare获取 {len(df)} 条数据")
-                            return df
+                    df = guarded_call(name, fetch)
+                except CircuitOpenError:
+                    continue
                 except Exception as e:
-                    logger.debug(f"AKShare失败: {e}")
+                    logger.debug(f"{name} 获取港股数据失败: {e}")
+                    continue
+                if df is not None and not df.empty:
+                    return df
+                empty.add(name)
+
+            if not attempted:
+                logger.warning(f"港股数据源均不可用或熔断中，跳过重试: {code}")
+                break
 
+        # 正常响应但无数据的数据源记入负缓存（请求失败由熔断器处理，不按代码记录）
+        if negative is not None:
+            for name in sorted(empty):
+                negative.record(negative_symbol, scale, name, EMPTY)
         logger.error(f"❌ 所有数据源都无法获取港股数据: {code}")
         return None
@@ -0,0 +1,159 @@
+"""
+K线数据解析模块
+将各数据源的原始响应按列提取为数值数组，一次构建 DataFrame（列式解析），
+替代逐条 float() 构造字典的循环，回补大量 1 分钟K线时开销显著降低
+"""
+
+import io
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+# 东方财富 klines / 腾讯 K 线数组的字段顺序：日期, 开, 收, 高, 低, 量
+EASTMONEY_FIELDS = ("Date", "Open", "Close", "High", "Low", "Volume")
+TENCENT_FIELDS = EASTMONEY_FIELDS
+
+# pandas 2.x 支持 ISO8601 快速解析（"2024-01-15"、"2024-01-15 09:31" 等），旧版本退回自动推断
+ISO_DATE_FORMAT = "ISO8601" if int(pd.__version__.split(".")[0]) >= 2 else None
+
+# 新浪日线 / 分钟线字段名
+_SINA_DAILY_KEYS = {"day": "Date", "open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+_SINA_MINUTE_KEYS = {"o": "Open", "h": "High", "l": "Low", "c": "Close", "v": "Volume"}
+
+
+def _to_float(values: Sequence[Any]) -> np.ndarray:
+    """整列转换为 float64：先走 numpy 快速路径，含无法解析的值时逐个容错转换为 NaN"""
+    try:
+        return np.asarray(values, dtype="float64")
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype="float64")
+
+
+def build_ohlcv(
+    dates: Sequence[Any], columns: Dict[str, Sequence[Any]], date_format: Optional[str] = None
+) -> Optional[pd.DataFrame]:
+    """
+    由日期列与 OHLCV 数值列构建标准K线 DataFrame
+
+    开高低收或日期无法解析的行丢弃，缺失成交量记为 0；按日期排序。
+
+    Args:
+        dates: 日期列
+        columns: 列名（Open/High/Low/Close/Volume）-> 原始值序列，缺少的列视为全部缺失
+        date_format: 日期格式（已知时传入可加速解析）
+
+    Returns:
+        pd.DataFrame: 以 Date 为索引、列为 Open/High/Low/Close/Volume 的 float64 数据，无有效行时返回 None
+    """
+    n = len(dates)
+    if n == 0:
+        return None
+    data = {}
+    for col in OHLCV:
+        values = columns.get(col)
+        data[col] = _to_float(values) if values is not None else np.full(n, np.nan)
+    data["Volume"] = np.nan_to_num(data["Volume"], nan=0.0)
+
+    index = pd.DatetimeIndex(pd.to_datetime(dates, format=date_format, errors="coerce"), name="Date")
+    valid = ~index.isna()
+    for col in ("Open", "High", "Low", "Close"):
+        valid &= ~np.isnan(data[col])
+    if not valid.all():
+        index = index[valid]
+        data = {col: arr[valid] for col, arr in data.items()}
+    if len(index) == 0:
+        return None
+
+    df = pd.DataFrame(data, index=index, columns=OHLCV)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+    return df
+
+
+def parse_sina_kline(items: Sequence[Dict[str, Any]], minute: bool = False) -> Optional[pd.DataFrame]:
+    """
+    解析新浪K线 JSON 数组
+
+    Args:
+        items: 日线为 {day, open, high, low, close, volume}，分钟线为 {d, t, o, h, l, c, v}
+        minute: 是否为分钟线格式
+
+    Returns:
+        pd.DataFrame: 标准K线数据
+    """
+    if not items:
+        return None
+    if not minute:
+        return parse_records(items, _SINA_DAILY_KEYS)
+
+    columns = {col: [item.get(key) for item in items] for key, col in _SINA_MINUTE_KEYS.items()}
+    dates = [f"{item.get('d')} {item.get('t')}" for item in items]
+    return build_ohlcv(dates, columns, date_format="%Y-%m-%d %H:%M")
+
+
+def parse_delimited_klines(lines: Sequence[str], fields: Sequence[str] = EASTMONEY_FIELDS) -> Optional[pd.DataFrame]:
+    """
+    解析逗号分隔的K线字符串数组（如东方财富 klines），由 pandas C 解析器一次性读入
+
+    Args:
+        lines: 每条为 "日期,开,收,高,低,量,..." 的字符串
+        fields: 前若干字段对应的列名
+
+    Returns:
+        pd.DataFrame: 标准K线数据；字段不足或格式错误的行被丢弃
+    """
+    if not lines:
+        return None
+    width = max(len(fields), lines[0].count(",") + 1)
+    raw = pd.read_csv(
+        io.StringIO("\n".join(lines)),
+        header=None,
+        names=list(range(width)),
+        usecols=list(range(len(fields))),
+        dtype={0: str},
+        on_bad_lines="skip",
+        engine="c",
+    )
+    columns = {name: raw[i].to_numpy() for i, name in enumerate(fields) if i > 0}
+    return build_ohlcv(raw[0].to_numpy(), columns, date_format=ISO_DATE_FORMAT)
+
+
+def parse_kline_rows(rows: Sequence[Sequence[Any]], fields: Sequence[str] = TENCENT_FIELDS) -> Optional[pd.DataFrame]:
+    """
+    解析K线二维数组（如腾讯 [[日期, 开, 收, 高, 低, 量, ...], ...]）
+
+    Args:
+        rows: K线数组，每行多余的元素被忽略，元素不足的行被丢弃
+        fields: 前若干元素对应的列名
+
+    Returns:
+        pd.DataFrame: 标准K线数据
+    """
+    if not rows:
+        return None
+    width = len(fields)
+    complete = [row for row in rows if len(row) >= width]
+    if not complete:
+        return None
+    columns = {name: [row[i] for row in complete] for i, name in enumerate(fields)}
+    return build_ohlcv(columns.pop("Date"), columns, date_format=ISO_DATE_FORMAT)
+
+
+def parse_records(records: List[Dict[str, Any]], column_map: Dict[str, str]) -> Optional[pd.DataFrame]:
+    """
+    解析字段名各异的 JSON 对象数组
+
+    Args:
+        records: JSON 对象列表
+        column_map: 原字段名 -> 标准列名（Date/Open/High/Low/Close/Volume）
+
+    Returns:
+        pd.DataFrame: 标准K线数据
+    """
+    if not records:
+        return None
+    columns = {col: [record.get(key) for record in records] for key, col in column_map.items()}
+    return build_ohlcv(columns.pop("Date"), columns, date_format=ISO_DATE_FORMAT)
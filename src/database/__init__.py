@@ -5,15 +5,16 @@ SQLite 存储历史 K 线等，供 fetcher 层优先读库、未命中再请求
 
 from typing import Optional
 
+from .archive import KlineArchive
 from .manager import StockDatabase
 
 _db: Optional[StockDatabase] = None
 
 
 def get_stock_db() -> Optional[StockDatabase]:
-    """根据 config 返回 StockDatabase；未启用则返回 None"""
+    """根据 config 返回 StockDatabase；未启用则返回 None（已被 close() 的实例会重新创建）"""
     global _db
-    if _db is not None:
+    if _db is not None and not _db.closed:
         return _db
     try:
         from src.config import Config
@@ -23,10 +24,18 @@ def get_stock_db() -> Optional[StockDatabase]:
         if not db_cfg.get("enabled", False):
             return None
         path = db_cfg.get("path", "data/stock_data.db")
-        _db = StockDatabase(path)
+        archive_cfg = db_cfg.get("archive") or {}
+        _db = StockDatabase(
+            path,
+            cache_size_mb=db_cfg.get("cache_size_mb", 64),
+            mmap_size_mb=db_cfg.get("mmap_size_mb", 256),
+            audit_batches=db_cfg.get("audit_batches", True),
+            archive_path=archive_cfg.get("path", "data/archive") if archive_cfg.get("enabled", False) else None,
+            archive_buckets=archive_cfg.get("buckets", 16),
+        )
         return _db
     except Exception:
         return None
 
 
-__all__ = ["StockDatabase", "get_stock_db"]
+__all__ = ["KlineArchive", "StockDatabase", "get_stock_db"]
@@ -0,0 +1,181 @@
+"""
+K 线冷数据归档（Parquet）
+早于保留期限的 K 线从 SQLite 移入按 周期/年份/代码分桶 分区的 Parquet 文件：
+    {root}/scale={scale}/year={year}/bucket={bucket:02d}/data.parquet
+每个分区文件按 (code, ts) 排序、zstd 压缩，读取时先按路径裁剪分区，再以 code/ts 条件下推到行组统计信息，
+只解码命中的行组。需要安装 pyarrow（可选依赖）
+"""
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 可选依赖：pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+
+# 分区文件中的列（scale/year/bucket 由目录名表示，不重复存储）
+ARCHIVE_COLUMNS = ["code", "ts", "open", "high", "low", "close", "volume"]
+
+# 行组大小：排序后同一代码的行集中在少数行组，按代码/时间过滤时可跳过其余行组
+_ROW_GROUP_SIZE = 64 * 1024
+_META_FILE = "archive.json"
+
+
+def _years(ts: np.ndarray) -> np.ndarray:
+    """整数时间戳所在的年份"""
+    return ts.astype("datetime64[s]").astype("datetime64[Y]").astype("int64") + 1970
+
+
+class KlineArchive:
+    """按 周期/年份/代码分桶 分区的 Parquet K 线归档"""
+
+    def __init__(self, root: str = "data/archive", buckets: int = 16):
+        """
+        打开（或创建）归档目录
+
+        Args:
+            root: 归档根目录
+            buckets: 代码分桶数；已有归档以首次写入时记录的分桶数为准
+        """
+        if pa is None:
+            raise ImportError("K 线归档需要安装 pyarrow: pip install pyarrow")
+        self.root = Path(root)
+        self.buckets = buckets
+        meta_path = self.root / _META_FILE
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text(encoding="utf-8")).get("buckets", buckets)
+            if stored != buckets:
+                logger.info("归档 %s 已按 %d 个分桶写入，忽略配置的 %d", root, stored, buckets)
+            self.buckets = stored
+
+    def bucket(self, code: str) -> int:
+        """代码所在的分桶（crc32 取模，跨进程稳定）"""
+        return zlib.crc32(code.encode("utf-8")) % self.buckets
+
+    def _partition_path(self, scale: int, year: int, bucket: int) -> Path:
+        return self.root / f"scale={scale}" / f"year={year}" / f"bucket={bucket:02d}" / "data.parquet"
+
+    def write(self, scale: int, df: pd.DataFrame) -> int:
+        """
+        写入一批 K 线：按分区与已有文件合并（同一 (code, ts) 以新写入的为准），原子替换分区文件
+
+        Args:
+            scale: K线周期
+            df: 列为 ARCHIVE_COLUMNS 的 DataFrame
+
+        Returns:
+            int: 改写的分区文件数
+        """
+        if df.empty:
+            return 0
+        meta_path = self.root / _META_FILE
+        if not meta_path.exists():
+            self.root.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(json.dumps({"buckets": self.buckets}), encoding="utf-8")
+
+        df = df[ARCHIVE_COLUMNS]
+        years = _years(df["ts"].to_numpy(dtype="int64"))
+        buckets = np.array([self.bucket(code) for code in df["code"]])
+        written = 0
+        for (year, bucket), part in df.groupby([years, buckets], sort=False):
+            path = self._partition_path(scale, int(year), int(bucket))
+            if path.exists():
+                part = pd.concat([pq.read_table(path).to_pandas(), part], ignore_index=True)
+                part = part.drop_duplicates(["code", "ts"], keep="last")
+            part = part.sort_values(["code", "ts"], kind="stable")
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            pq.write_table(table, tmp_path, compression="zstd", row_group_size=_ROW_GROUP_SIZE)
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    def _paths(self, scale: int, buckets: Iterable[int], start_ts: Optional[int], end_ts: Optional[int]) -> List[str]:
+        """按周期、年份范围与分桶裁剪出需要读取的分区文件"""
+        scale_dir = self.root / f"scale={scale}"
+        if not scale_dir.is_dir():
+            return []
+        buckets = sorted(set(buckets))
+        low = int(_years(np.array([start_ts]))[0]) if start_ts is not None else None
+        high = int(_years(np.array([end_ts]))[0]) if end_ts is not None else None
+        paths = []
+        for year_dir in sorted(scale_dir.glob("year=*")):
+            # 跳过目录中的杂项（临时文件、.DS_Store、名称不合法的目录），不影响归档读取
+            suffix = year_dir.name[len("year=") :]
+            if not year_dir.is_dir() or not suffix.isdigit():
+                continue
+            year = int(suffix)
+            if (low is not None and year < low) or (high is not None and year > high):
+                continue
+            for bucket in buckets:
+                path = year_dir / f"bucket={bucket:02d}" / "data.parquet"
+                if path.exists():
+                    paths.append(str(path))
+        return paths
+
+    def read(
+        self,
+        codes: List[str],
+        scale: int,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        读取归档的 K 线
+
+        Args:
+            codes: 股票代码列表
+            scale: K线周期
+            start_ts: 起始时间戳（含），可选
+            end_ts: 结束时间戳（含），可选
+            limit: 只需最近 limit 条时（单只股票查询），按年份从新到旧读取分区，够数即停
+
+        Returns:
+            pd.DataFrame: 列为 ARCHIVE_COLUMNS，按 (code, ts) 排序；无数据时为空表
+        """
+        paths = self._paths(scale, (self.bucket(code) for code in codes), start_ts, end_ts)
+        if not paths:
+            return pd.DataFrame(columns=ARCHIVE_COLUMNS)
+        condition = ds.field("code").isin(list(codes))
+        if start_ts is not None:
+            condition &= ds.field("ts") >= start_ts
+        if end_ts is not None:
+            condition &= ds.field("ts") <= end_ts
+
+        if limit is None:
+            table = ds.dataset(paths, format="parquet").to_table(columns=ARCHIVE_COLUMNS, filter=condition)
+        else:
+            tables, count = [], 0
+            for path in reversed(paths):
+                tables.append(ds.dataset(path, format="parquet").to_table(columns=ARCHIVE_COLUMNS, filter=condition))
+                count += tables[-1].num_rows
+                if count >= limit:
+                    break
+            table = pa.concat_tables(tables)
+        return table.to_pandas().sort_values(["code", "ts"], kind="stable", ignore_index=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """归档统计：分区文件数、行数（来自 Parquet 元数据）与磁盘占用"""
+        files = rows = size = 0
+        for path in self.root.glob("scale=*/year=*/bucket=*/data.parquet"):
+            files += 1
+            rows += pq.read_metadata(path).num_rows
+            size += path.stat().st_size
+        return {"archive_files": files, "archived_kline_records": rows, "archive_size_mb": size / (1024 * 1024)}
@@ -2,51 +2,302 @@
 可选数据库支持（本地积累 + 复用）
 使用 SQLite 按 (code, scale) 存储 K 线，先读库、缺的再拉接口、新数据回写
 增强版：支持数据验证、元数据跟踪、市场指数存储
+数据库以 WAL 模式运行：每个线程使用自己的只读连接，所有写操作由专用写线程按队列顺序执行，
+读不阻塞写，批量获取的工作线程与统计脚本可同时访问
+K 线表以 (代码, 周期, 整数时间戳) 为聚簇主键（WITHOUT ROWID），不再逐行保存审计时间，
+写入时间按批次记录在 write_batches 中；表结构版本记录在 PRAGMA user_version，打开时自动迁移
+可选的冷数据归档：早于保留期限的 K 线移入 Parquet（见 archive.py），读取时与库中数据透明合并
 """
 
+import queue
+import sqlite3
+import threading
+import weakref
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, TypeVar, Union
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
+from src.database.archive import ARCHIVE_COLUMNS, KlineArchive
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# 表结构版本（PRAGMA user_version）：0 为旧版 TEXT 日期 + 逐行 created_at/updated_at，
+# 1 为整数时间戳 ts（北京时间墙上时间的 epoch 秒）+ WITHOUT ROWID + 按批次审计
+SCHEMA_VERSION = 1
+
+# K 线 DataFrame 的列与库表列的对应关系（顺序即写入顺序）
+_OHLCV_COLUMNS = {"Date": "ts", "Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+
+# K 线类表：建表语句与除 (scale, ts) 外的键列
+_KLINE_TABLES = {
+    "kline_by_scale": (
+        """
+        CREATE TABLE IF NOT EXISTS kline_by_scale (
+            code TEXT NOT NULL,
+            scale INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL,
+            batch_id INTEGER,
+            PRIMARY KEY (code, scale, ts)
+        ) WITHOUT ROWID
+        """,
+        "code",
+    ),
+    "market_indices": (
+        """
+        CREATE TABLE IF NOT EXISTS market_indices (
+            index_code TEXT NOT NULL,
+            index_name TEXT,
+            scale INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            volume REAL,
+            batch_id INTEGER,
+            PRIMARY KEY (index_code, scale, ts)
+        ) WITHOUT ROWID
+        """,
+        "index_code, index_name",
+    ),
+}
+
+
+def _epoch_seconds(dates: pd.DatetimeIndex) -> np.ndarray:
+    """日期转为整数 epoch 秒：带时区的先换算为北京时间，统一按墙上时间存储"""
+    if dates.tz is not None:
+        dates = dates.tz_convert("Asia/Shanghai").tz_localize(None)
+    return dates.values.astype("datetime64[s]").astype("int64")
+
+
+def _to_ts(value: Union[str, datetime, pd.Timestamp]) -> int:
+    """查询边界（日期字符串或时间）转为整数时间戳"""
+    return int(_epoch_seconds(pd.DatetimeIndex([pd.Timestamp(value)]))[0])
+
+
+def _ohlcv_arrays(df: pd.DataFrame) -> List[list]:
+    """将 K 线 DataFrame 一次性转换为列数组：日期为整数时间戳，价格与成交量为 float"""
+    work = df.reset_index() if "Date" not in df.columns else df
+    arrays = [_epoch_seconds(pd.DatetimeIndex(pd.to_datetime(work["Date"]))).tolist()]
+    arrays.extend(work[col].to_numpy(dtype=float).tolist() for col in list(_OHLCV_COLUMNS)[1:])
+    return arrays
+
+
+def _ohlcv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """查询结果（ts 升序）转为以 Date 为 index 的 K 线 DataFrame"""
+    df = df.rename(columns={v: k for k, v in _OHLCV_COLUMNS.items()})
+    df["Date"] = pd.to_datetime(df["Date"], unit="s")
+    return df.set_index("Date")
+
+
+class _Reader:
+    """线程私有的只读连接（放在 threading.local 中，线程退出时被回收）"""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _close_reader(conn: sqlite3.Connection, readers: List[sqlite3.Connection], lock: threading.Lock) -> None:
+    """关闭已退出线程的只读连接并从连接列表中移除"""
+    with lock:
+        if conn in readers:
+            readers.remove(conn)
+    conn.close()
+
 
 class StockDatabase:
     """SQLite K 线存储，按 (code, scale) 区分周期"""
 
-    def __init__(self, db_path: str = "data/stock_data.db"):
+    def __init__(
+        self,
+        db_path: str = "data/stock_data.db",
+        cache_size_mb: float = 64,
+        mmap_size_mb: float = 256,
+        audit_batches: bool = True,
+        archive_path: Optional[str] = None,
+        archive_buckets: int = 16,
+    ):
+        """
+        打开（或创建）数据库，旧版表结构自动迁移
+
+        Args:
+            db_path: 数据库文件路径
+            cache_size_mb: 每个连接的页缓存大小（MB）
+            mmap_size_mb: 内存映射读取的上限（MB），0 关闭
+            audit_batches: 每次写入在 write_batches 中记录一条批次（行数、时间范围、写入时间），
+                K 线行只保存批次号；False 时不记录
+            archive_path: Parquet 冷数据归档目录，None 不启用（需安装 pyarrow）
+            archive_buckets: 归档的代码分桶数
+        """
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self.db_path = db_path
-        self.conn = __import__("sqlite3").connect(db_path)
-        self._init_tables()
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.audit_batches = audit_batches
+        self.archive: Optional[KlineArchive] = None
+        if archive_path:
+            try:
+                self.archive = KlineArchive(archive_path, archive_buckets)
+            except ImportError as e:
+                logger.warning("%s，冷数据归档不可用", e)
+
+        # 读：每个线程一个只读连接（首次使用时创建，线程退出时关闭）
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+        # 写：专用写线程独占写连接，按队列顺序逐个事务执行
+        self._write_conn = self._connect()
+        self._write_conn.execute("PRAGMA journal_mode=WAL")
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._writer_loop, name="stock-db-writer", daemon=True)
+        self._writer.start()
+        if self._write(self._init_tables):
+            # 迁移后整理数据库文件，回收旧表占用的页（不能在事务中执行）
+            self._write(self._vacuum)
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """打开连接并设置 PRAGMA（写冲突时等待而非立即报错）"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_mb * 1024)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size_mb * 1024 * 1024)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """当前线程的只读连接"""
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = _Reader(self._connect(read_only=True))
+            with self._readers_lock:
+                self._readers.append(reader.conn)
+            # 线程退出时其 threading.local 中的值被释放，随之关闭连接（短生命周期的工作线程不累积连接）
+            weakref.finalize(reader, _close_reader, reader.conn, self._readers, self._readers_lock)
+            self._local.reader = reader
+        return reader.conn
+
+    def _writer_loop(self) -> None:
+        """写线程：逐个执行队列中的写操作，每个操作一个事务（异常时回滚并交给调用方）"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            func, future = item
+            try:
+                with self._write_conn:
+                    result = func(self._write_conn)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+        self._write_conn.close()
+
+    def _write(self, func: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        在写线程中以单个事务执行 func(写连接)，阻塞等待其完成
 
-    def _init_tables(self) -> None:
-        """初始化数据库表结构"""
-        # 表1: K线数据表（增强版：添加时间戳字段）
-        self.conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS kline_by_scale (
-                code TEXT NOT NULL,
-                scale INTEGER NOT NULL,
-                date TEXT NOT NULL,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (code, scale, date)
-            )
-            """
+        Returns:
+            func 的返回值（func 抛出的异常原样抛出，事务已回滚）
+
+        Raises:
+            sqlite3.ProgrammingError: 数据库已关闭（写线程已退出，排队的写操作永远不会执行）
+        """
+        if threading.current_thread() is self._writer:
+            return func(self._write_conn)
+        future: Future = Future()
+        with self._close_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            self._queue.put((func, future))
+        return future.result()
+
+    @staticmethod
+    def _vacuum(conn: sqlite3.Connection) -> None:
+        """整理数据库文件（WAL 模式下 VACUUM 写入日志，检查点后主文件才会缩小）"""
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def _bulk_upsert(self, conn: sqlite3.Connection, table: str, keys: Dict[str, Any], df: pd.DataFrame) -> int:
+        """
+        批量写入 K 线行（INSERT OR REPLACE，单次 executemany；在写线程的事务中调用）
+
+        Args:
+            conn: 写连接
+            table: 表名
+            keys: 每行相同的键列及其值（如 {"code": ..., "scale": ...}，第一个为代码）
+            df: K线数据（Date 为 index 或列）
+
+        Returns:
+            int: 写入的行数
+        """
+        arrays = _ohlcv_arrays(df)
+        if not arrays[0]:
+            return 0
+        batch_id = self._record_batch(conn, table, keys, arrays[0]) if self.audit_batches else None
+        columns = list(keys) + list(_OHLCV_COLUMNS.values()) + ["batch_id"]
+        prefix = tuple(keys.values())
+        rows = [prefix + values + (batch_id,) for values in zip(*arrays)]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows,
         )
+        return len(rows)
+
+    @staticmethod
+    def _record_batch(conn: sqlite3.Connection, table: str, keys: Dict[str, Any], ts: List[int]) -> int:
+        """记录一个写入批次，返回批次号"""
+        cursor = conn.execute(
+            "INSERT INTO write_batches (table_name, code, scale, row_count, first_ts, last_ts, written_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                table,
+                next(iter(keys.values())),
+                keys["scale"],
+                len(ts),
+                min(ts),
+                max(ts),
+                int(datetime.now().timestamp()),
+            ),
+        )
+        return cursor.lastrowid
+
+    def _init_tables(self, conn: sqlite3.Connection) -> bool:
+        """
+        初始化数据库表结构（在写线程中执行）
 
-        # 表2: 元数据表（跟踪数据状态）
-        self.conn.execute(
+        Returns:
+            bool: 是否从旧版表结构迁移了数据
+        """
+        migrated = False
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            migrated = self._migrate_v1(conn)
+
+        # K 线数据表与市场指数数据表：主键即聚簇索引，无需另建索引
+        for ddl, _ in _KLINE_TABLES.values():
+            conn.execute(ddl)
+
+        # 元数据表（跟踪数据状态）
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS meta_info (
                 code TEXT NOT NULL,
@@ -63,64 +314,70 @@ class StockDatabase:
             """
         )
 
-        # 表3: 市场指数数据表
-        self.conn.execute(
+        # 写入批次表（代替逐行的 created_at/updated_at）
+        conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS market_indices (
-                index_code TEXT NOT NULL,
-                index_name TEXT,
+            CREATE TABLE IF NOT EXISTS write_batches (
+                batch_id INTEGER PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                code TEXT NOT NULL,
                 scale INTEGER NOT NULL,
-                date TEXT NOT NULL,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume REAL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (index_code, scale, date)
+                row_count INTEGER NOT NULL,
+                first_ts INTEGER,
+                last_ts INTEGER,
+                written_at INTEGER NOT NULL
             )
             """
         )
 
-        # 创建索引
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_kline_code_scale ON kline_by_scale(code, scale)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_kline_date ON kline_by_scale(date)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_index_code_scale ON market_indices(index_code, scale)")
-
-        # 数据库迁移：如果表已存在但缺少新字段，则添加（向后兼容）
-        try:
-            # 检查 kline_by_scale 表
-            cursor = self.conn.execute("PRAGMA table_info(kline_by_scale)")
-            existing_columns = [row[1] for row in cursor.fetchall()]
-
-            if "created_at" not in existing_columns:
-                logger.info("升级数据库表：添加 created_at 字段")
-                self.conn.execute("ALTER TABLE kline_by_scale ADD COLUMN created_at TEXT DEFAULT CURRENT_TIMESTAMP")
-
-            if "updated_at" not in existing_columns:
-                logger.info("升级数据库表：添加 updated_at 字段")
-                self.conn.execute("ALTER TABLE kline_by_scale ADD COLUMN updated_at TEXT DEFAULT CURRENT_TIMESTAMP")
-
-            # 检查 market_indices 表
-            cursor = self.conn.execute("PRAGMA table_info(market_indices)")
-            existing_columns = [row[1] for row in cursor.fetchall()]
-
-            if "created_at" not in existing_columns:
-                logger.info("升级数据库表：为 market_indices 添加 created_at 字段")
-                self.conn.execute("ALTER TABLE market_indices ADD COLUMN created_at TEXT DEFAULT CURRENT_TIMESTAMP")
+        # 已归档的 (代码, 周期) 及其时间范围（读取时据此判断是否需要读归档）
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archive_ranges (
+                code TEXT NOT NULL,
+                scale INTEGER NOT NULL,
+                first_ts INTEGER NOT NULL,
+                last_ts INTEGER NOT NULL,
+                PRIMARY KEY (code, scale)
+            ) WITHOUT ROWID
+            """
+        )
 
-            if "updated_at" not in existing_columns:
-                logger.info("升级数据库表：为 market_indices 添加 updated_at 字段")
-                self.conn.execute("ALTER TABLE market_indices ADD COLUMN updated_at TEXT DEFAULT CURRENT_TIMESTAMP")
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.commit()
+        logger.info("数据库表初始化完成")
+        return migrated
 
-            self.conn.commit()
-        except Exception as e:
-            logger.warning("数据库迁移检查失败: %s", e)
-            self.conn.rollback()
+    @staticmethod
+    def _migrate_v1(conn: sqlite3.Connection) -> bool:
+        """
+        迁移到版本 1：TEXT 日期转为整数时间戳，重建为 WITHOUT ROWID 表，
+        丢弃逐行审计字段与冗余的二级索引（随旧表一起删除）；整个迁移在一个事务中完成
 
-        self.conn.commit()
-        logger.info("数据库表初始化完成")
+        Returns:
+            bool: 是否有旧表被迁移
+        """
+        migrated = False
+        conn.execute("BEGIN")
+        for table, (ddl, keys) in _KLINE_TABLES.items():
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if "date" not in columns:
+                continue
+            logger.info("升级数据库表 %s：整数时间戳 + WITHOUT ROWID", table)
+            conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v0")
+            conn.execute(ddl)
+            # 同一时刻的不同日期写法（如 "2024-01-02" 与 "2024-01-02 00:00:00"）合并为一行，后写入的保留
+            conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {table} ({keys}, scale, ts, open, high, low, close, volume)
+                SELECT {keys}, scale, CAST(strftime('%s', date) AS INTEGER), open, high, low, close, volume
+                FROM {table}_v0 WHERE strftime('%s', date) IS NOT NULL ORDER BY rowid
+                """
+            )
+            conn.execute(f"DROP TABLE {table}_v0")
+            migrated = True
+        conn.commit()
+        return migrated
 
     def validate_data(self, df: pd.DataFrame) -> bool:
         """
@@ -199,113 +456,116 @@ class StockDatabase:
             return 0
 
         try:
-            subset = df.reset_index()[["Date", "Open", "High", "Low", "Close", "Volume"]].copy()
-            subset = subset.rename(
-                columns={
-                    "Date": "date",
-                    "Open": "open",
-                    "High": "high",
-                    "Low": "low",
-                    "Close": "close",
-                    "Volume": "volume",
-                }
-            )
-            subset["date"] = subset["date"].astype(str)
-            subset["code"] = code
-            subset["scale"] = scale
-
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            inserted_count = 0
-
-            # 检查表是否有 updated_at 字段（兼容旧表结构）
-            cursor = self.conn.execute("PRAGMA table_info(kline_by_scale)")
-            columns = [row[1] for row in cursor.fetchall()]
-            has_updated_at = "updated_at" in columns
-
-            for _, row in subset.iterrows():
-                try:
-                    if has_updated_at:
-                        # 新表结构：包含 updated_at
-                        self.conn.execute(
-                            """
-                            INSERT OR REPLACE INTO kline_by_scale
-                            (code, scale, date, open, high, low, close, volume, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                str(row["code"]),
-                                int(row["scale"]),
-                                str(row["date"]),
-                                float(row["open"]),
-                                float(row["high"]),
-                                float(row["low"]),
-                                float(row["close"]),
-                                float(row["volume"]),
-                                now,
-                            ),
-                        )
-                    else:
-                        # 旧表结构：不包含 updated_at
-                        self.conn.execute(
-                            """
-                            INSERT OR REPLACE INTO kline_by_scale
-                            (code, scale, date, open, high, low, close, volume)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                str(row["code"]),
-                                int(row["scale"]),
-                                str(row["date"]),
-                                float(row["open"]),
-                                float(row["high"]),
-                                float(row["low"]),
-                                float(row["close"]),
-                                float(row["volume"]),
-                            ),
-                        )
-                    inserted_count += 1
-                except Exception as e:
-                    logger.warning("插入单条记录失败: %s", e)
-                    continue
-
-            self.conn.commit()
-
-            # 更新元数据
-            if inserted_count > 0:
-                self._update_meta_info(code, scale, stock_name, len(subset), df.index.max())
-                logger.info("DB 写入成功: %s scale=%s %d 条", code, scale, inserted_count)
-
-            return inserted_count
-
+            inserted_count = self._write(lambda conn: self._save_kline_rows(conn, code, scale, df, stock_name))
         except Exception as e:
             logger.error("保存K线数据失败: %s", e)
-            self.conn.rollback()
             return 0
 
+        if inserted_count > 0:
+            logger.info("DB 写入成功: %s scale=%s %d 条", code, scale, inserted_count)
+        return inserted_count
+
+    def _save_kline_rows(
+        self, conn: sqlite3.Connection, code: str, scale: int, df: pd.DataFrame, stock_name: Optional[str]
+    ) -> int:
+        """批量写入 K 线并更新元数据（在写线程的同一事务中执行）"""
+        inserted_count = self._bulk_upsert(conn, "kline_by_scale", {"code": str(code), "scale": int(scale)}, df)
+        if inserted_count > 0:
+            self._update_meta_info(conn, code, scale, stock_name, inserted_count, df.index.max())
+        return inserted_count
+
+    @staticmethod
+    def _market_type(code: str) -> str:
+        """根据代码判断市场类型"""
+        return "A股" if code.startswith(("sh", "sz")) else "港股"
+
     def _update_meta_info(
-        self, code: str, scale: int, stock_name: Optional[str], data_count: int, latest_date: pd.Timestamp
+        self,
+        conn: sqlite3.Connection,
+        code: str,
+        scale: int,
+        stock_name: Optional[str],
+        data_count: int,
+        latest_date: pd.Timestamp,
     ) -> None:
-        """更新元数据表"""
+        """更新元数据表（未提供名称时保留已有的 stock_name；在写线程的事务中执行）"""
         try:
             now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             latest_date_str = latest_date.strftime("%Y-%m-%d %H:%M:%S")
 
-            # 获取市场类型
-            market_type = "A股" if code.startswith(("sh", "sz")) else "港股"
-
-            self.conn.execute(
+            conn.execute(
                 """
-                INSERT OR REPLACE INTO meta_info
+                INSERT INTO meta_info
                 (code, stock_name, market_type, last_update_date, last_update_scale,
                  data_count, last_success_at, updated_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(code) DO UPDATE SET
+                    stock_name = COALESCE(excluded.stock_name, meta_info.stock_name),
+                    market_type = excluded.market_type,
+                    last_update_date = excluded.last_update_date,
+                    last_update_scale = excluded.last_update_scale,
+                    data_count = excluded.data_count,
+                    last_success_at = excluded.last_success_at,
+                    updated_at = excluded.updated_at
                 """,
-                (code, stock_name, market_type, latest_date_str, scale, data_count, now, now),
+                (code, stock_name, self._market_type(code), latest_date_str, scale, data_count, now, now),
             )
-            self.conn.commit()
         except Exception as e:
             logger.warning("更新元数据失败: %s", e)
 
+    def get_stock_names(self, codes: List[str]) -> Dict[str, str]:
+        """批量读取 meta_info 中已保存的股票名称
+
+        Args:
+            codes: 股票代码列表
+
+        Returns:
+            Dict[code, name]: 仅包含已保存名称的代码
+        """
+        names: Dict[str, str] = {}
+        codes = list(dict.fromkeys(codes))
+        # SQLite 默认最多 999 个绑定参数，分批查询
+        for i in range(0, len(codes), 500):
+            chunk = codes[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT code, stock_name FROM meta_info WHERE code IN ({placeholders}) AND stock_name IS NOT NULL",
+                chunk,
+            ).fetchall()
+            names.update({code: name for code, name in rows if name})
+        return names
+
+    def save_stock_names(self, names: Dict[str, str]) -> int:
+        """批量写入股票名称到 meta_info（不影响其他元数据字段）
+
+        Args:
+            names: {code: name}
+
+        Returns:
+            int: 写入的记录数
+        """
+        rows = [(code, name, self._market_type(code)) for code, name in names.items() if code and name]
+        if not rows:
+            return 0
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._write(
+                lambda conn: conn.executemany(
+                    """
+                    INSERT INTO meta_info (code, stock_name, market_type, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(code) DO UPDATE SET
+                        stock_name = excluded.stock_name,
+                        updated_at = excluded.updated_at
+                    """,
+                    [row + (now,) for row in rows],
+                )
+            )
+            return len(rows)
+        except Exception as e:
+            logger.warning("保存股票名称失败: %s", e)
+            return 0
+
     def get_kline_data(
         self,
         code: str,
@@ -314,48 +574,231 @@ class StockDatabase:
         end_date: Optional[str] = None,
         limit: Optional[int] = None,
     ) -> Optional[pd.DataFrame]:
-        """按 (code, scale) 查 K 线，可选日期范围与条数（取最近 limit 条）"""
-        query = "SELECT date, open, high, low, close, volume FROM kline_by_scale " "WHERE code = ? AND scale = ?"
+        """按 (code, scale) 查 K 线，可选日期范围与条数（取最近 limit 条）；有归档时合并冷数据"""
+        start_ts = _to_ts(start_date) if start_date else None
+        end_ts = _to_ts(end_date) if end_date else None
+        limit = int(limit) if limit is not None and limit > 0 else None
+        query = "SELECT ts, open, high, low, close, volume FROM kline_by_scale WHERE code = ? AND scale = ?"
         params: List[object] = [code, scale]
-        if start_date:
-            query += " AND date >= ?"
-            params.append(start_date)
-        if end_date:
-            query += " AND date <= ?"
-            params.append(end_date)
-        query += " ORDER BY date DESC"
-        if limit is not None and limit > 0:
-            query += f" LIMIT {int(limit)}"
+        if start_ts is not None:
+            query += " AND ts >= ?"
+            params.append(start_ts)
+        if end_ts is not None:
+            query += " AND ts <= ?"
+            params.append(end_ts)
+        query += " ORDER BY ts DESC"
+        if limit is not None:
+            query += f" LIMIT {limit}"
         try:
-            df = pd.read_sql_query(query, self.conn, params=params)
+            df = pd.read_sql_query(query, self.conn, params=params).iloc[::-1]
         except Exception:
             return None
+
+        # 库中不足 limit 条（或未限制条数）且有重叠的归档：合并冷数据，同一时刻以库中数据为准
+        if (limit is None or len(df) < limit) and self._archived_codes([code], scale, start_ts, end_ts):
+            cold = self._read_archive([code], scale, start_ts, end_ts, limit)
+            if cold is not None and not cold.empty:
+                cold = cold.drop(columns="code")
+                df = cold if df.empty else pd.concat([cold, df], ignore_index=True)
+                df = df.drop_duplicates("ts", keep="last").sort_values("ts")
+                if limit is not None:
+                    df = df.tail(limit)
         if df.empty:
             return None
-        df = df.sort_values("date").reset_index(drop=True)
-        df = df.rename(
-            columns={
-                "date": "Date",
-                "open": "Open",
-                "high": "High",
-                "low": "Low",
-                "close": "Close",
-                "volume": "Volume",
-            }
-        )
-        df["Date"] = pd.to_datetime(df["Date"])
-        df.set_index("Date", inplace=True)
-        return df
+        return _ohlcv_frame(df.reset_index(drop=True))
 
     def get_latest_date(self, code: str, scale: int) -> Optional[pd.Timestamp]:
-        """返回 (code, scale) 库中最新一条的日期"""
+        """返回 (code, scale) 最新一条的日期（库中已无数据时取归档的最新日期）"""
         row = self.conn.execute(
-            "SELECT date FROM kline_by_scale WHERE code = ? AND scale = ? ORDER BY date DESC LIMIT 1",
+            "SELECT MAX(ts) FROM kline_by_scale WHERE code = ? AND scale = ?",
             (code, scale),
         ).fetchone()
-        if not row:
+        if not row or row[0] is None:
+            row = self.conn.execute(
+                "SELECT last_ts FROM archive_ranges WHERE code = ? AND scale = ?", (code, scale)
+            ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return pd.Timestamp(row[0], unit="s")
+
+    def _archived_codes(
+        self, codes: List[str], scale: int, start_ts: Optional[int], end_ts: Optional[int]
+    ) -> List[str]:
+        """已归档且归档时间范围与查询范围重叠的代码"""
+        found: List[str] = []
+        for i in range(0, len(codes), 500):
+            chunk = codes[i : i + 500]
+            query = f"SELECT code FROM archive_ranges WHERE scale = ? AND code IN ({','.join('?' * len(chunk))})"
+            params: List[object] = [scale, *chunk]
+            if start_ts is not None:
+                query += " AND last_ts >= ?"
+                params.append(start_ts)
+            if end_ts is not None:
+                query += " AND first_ts <= ?"
+                params.append(end_ts)
+            found.extend(row[0] for row in self.conn.execute(query, params))
+        return found
+
+    def _read_archive(
+        self,
+        codes: List[str],
+        scale: int,
+        start_ts: Optional[int],
+        end_ts: Optional[int],
+        limit: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        """读取归档的 K 线（列为 ARCHIVE_COLUMNS）；归档不可用或读取失败时返回 None"""
+        if self.archive is None:
+            logger.warning("%d 只股票 scale=%s 的部分K线已归档，但归档未启用或未安装 pyarrow", len(codes), scale)
+            return None
+        try:
+            return self.archive.read(codes, scale, start_ts, end_ts, limit)
+        except Exception as e:
+            logger.warning("读取归档K线失败 scale=%s: %s", scale, e)
             return None
-        return pd.to_datetime(row[0])
+
+    def get_kline_panel(
+        self,
+        codes: List[str],
+        scale: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        as_arrays: bool = False,
+    ) -> Union[pd.DataFrame, Dict[str, Any]]:
+        """
+        批量读取多只股票同一周期的 K 线（每 500 只一次查询，用于跨股票筛选与回测）
+
+        Args:
+            codes: 股票代码列表（重复的只取一次，顺序即结果中的股票顺序）
+            scale: K线周期
+            start_date: 起始日期（含），可选
+            end_date: 结束日期（含），可选
+            as_arrays: False 返回长表；True 返回按 (股票, 时间) 对齐的二维数组
+
+        Returns:
+            长表: 列为 Symbol（分类类型，类别为全部请求的代码）、Date、Open、High、Low、Close、Volume，
+                按 Symbol、Date 排序
+            二维数组: {"symbols": 代码列表, "dates": 全部股票时间的并集 DatetimeIndex,
+                "Open"/"High"/"Low"/"Close"/"Volume": 形状 (股票数, 时间数) 的 float 数组，缺失为 NaN}
+        """
+        codes = list(dict.fromkeys(codes))
+        start_ts = _to_ts(start_date) if start_date else None
+        end_ts = _to_ts(end_date) if end_date else None
+        condition = ""
+        bounds: List[object] = []
+        if start_ts is not None:
+            condition += " AND ts >= ?"
+            bounds.append(start_ts)
+        if end_ts is not None:
+            condition += " AND ts <= ?"
+            bounds.append(end_ts)
+
+        rows: List[tuple] = []
+        # SQLite 默认最多 999 个绑定参数，分批查询
+        for i in range(0, len(codes), 500):
+            chunk = codes[i : i + 500]
+            rows.extend(
+                self.conn.execute(
+                    "SELECT code, ts, open, high, low, close, volume FROM kline_by_scale "
+                    f"WHERE scale = ? AND code IN ({','.join('?' * len(chunk))}){condition}",
+                    [scale, *chunk, *bounds],
+                )
+            )
+
+        fields = list(_OHLCV_COLUMNS)[1:]
+        names = [row[0] for row in rows]
+        ts = np.fromiter((row[1] for row in rows), dtype="int64", count=len(rows))
+        values = np.array([row[2:] for row in rows], dtype=float).reshape(len(rows), len(fields))
+
+        archived = self._archived_codes(codes, scale, start_ts, end_ts)
+        cold = self._read_archive(archived, scale, start_ts, end_ts) if archived else None
+        if cold is not None and not cold.empty:
+            # 合并冷数据，同一 (代码, 时刻) 以库中数据为准
+            hot = pd.DataFrame(values, columns=ARCHIVE_COLUMNS[2:])
+            hot.insert(0, "ts", ts)
+            hot.insert(0, "code", names)
+            merged = cold if hot.empty else pd.concat([cold, hot], ignore_index=True)
+            merged = merged.drop_duplicates(["code", "ts"], keep="last")
+            names = merged["code"].tolist()
+            ts = merged["ts"].to_numpy(dtype="int64")
+            values = merged[ARCHIVE_COLUMNS[2:]].to_numpy(dtype=float)
+        symbols = pd.Categorical(names, categories=codes)
+
+        if as_arrays:
+            times = np.unique(ts)
+            panel: Dict[str, Any] = {"symbols": codes, "dates": pd.DatetimeIndex(pd.to_datetime(times, unit="s"))}
+            positions = (symbols.codes, np.searchsorted(times, ts))
+            for j, field in enumerate(fields):
+                grid = np.full((len(codes), len(times)), np.nan)
+                grid[positions] = values[:, j]
+                panel[field] = grid
+            return panel
+
+        order = np.lexsort((ts, symbols.codes))
+        df = pd.DataFrame(values[order], columns=fields)
+        df.insert(0, "Date", pd.to_datetime(ts[order], unit="s"))
+        df.insert(0, "Symbol", symbols[order])
+        return df
+
+    def archive_old_klines(self, horizon_days: float, vacuum: bool = False) -> Dict[str, int]:
+        """
+        将早于保留期限的 K 线移入 Parquet 归档
+        按 (周期, 代码分桶) 分组、每组在写线程的一个事务中完成：读出旧行、写入归档、从库中删除并记录归档范围；
+        归档写入失败时该组回滚，不删除任何行
+
+        Args:
+            horizon_days: 保留期限（天），早于 当前北京时间 - horizon_days 的 K 线被归档
+            vacuum: 归档后整理数据库文件，回收删除行占用的空间
+
+        Returns:
+            Dict: {"rows": 归档行数, "stocks": 涉及的 (代码, 周期) 数, "files": 改写的分区文件数}
+        """
+        if self.archive is None:
+            raise RuntimeError("冷数据归档未启用或未安装 pyarrow")
+        cutoff = _to_ts(pd.Timestamp.now(tz="Asia/Shanghai") - pd.Timedelta(days=horizon_days))
+        pairs = self.conn.execute("SELECT DISTINCT scale, code FROM kline_by_scale WHERE ts < ?", (cutoff,)).fetchall()
+
+        groups: Dict[tuple, List[str]] = {}
+        for scale, code in pairs:
+            groups.setdefault((scale, self.archive.bucket(code)), []).append(code)
+        summary = {"rows": 0, "stocks": len(pairs), "files": 0}
+        for (scale, _), codes in sorted(groups.items()):
+            for i in range(0, len(codes), 500):
+                chunk = codes[i : i + 500]
+                rows, files = self._write(lambda conn: self._archive_codes(conn, scale, chunk, cutoff))
+                summary["rows"] += rows
+                summary["files"] += files
+
+        if vacuum and summary["rows"]:
+            self._write(self._vacuum)
+        logger.info(
+            "K线归档完成: %d 条（%d 只股票/周期），改写 %d 个分区文件",
+            summary["rows"],
+            summary["stocks"],
+            summary["files"],
+        )
+        return summary
+
+    def _archive_codes(self, conn: sqlite3.Connection, scale: int, codes: List[str], cutoff: int) -> tuple:
+        """归档一组代码早于 cutoff 的 K 线（在写线程的事务中执行），返回 (行数, 改写的分区文件数)"""
+        where = f"WHERE scale = ? AND code IN ({','.join('?' * len(codes))}) AND ts < ?"
+        params = [scale, *codes, cutoff]
+        df = pd.read_sql_query(f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM kline_by_scale {where}", conn, params=params)
+        if df.empty:
+            return 0, 0
+        files = self.archive.write(scale, df)
+        conn.execute(f"DELETE FROM kline_by_scale {where}", params)
+        ranges = df.groupby("code")["ts"].agg(["min", "max"])
+        conn.executemany(
+            """
+            INSERT INTO archive_ranges (code, scale, first_ts, last_ts) VALUES (?, ?, ?, ?)
+            ON CONFLICT(code, scale) DO UPDATE SET
+                first_ts = MIN(first_ts, excluded.first_ts),
+                last_ts = MAX(last_ts, excluded.last_ts)
+            """,
+            [(code, scale, int(row["min"]), int(row["max"])) for code, row in ranges.iterrows()],
+        )
+        return len(df), files
 
     def save_market_index_data(
         self, index_code: str, index_name: str, scale: int, df: pd.DataFrame, validate: bool = True
@@ -368,94 +811,22 @@ class StockDatabase:
         if df is None or df.empty:
             return 0
 
+        keys = {"index_code": index_code, "index_name": index_name, "scale": int(scale)}
         try:
-            subset = df.reset_index()[["Date", "Open", "High", "Low", "Close", "Volume"]].copy()
-            subset = subset.rename(
-                columns={
-                    "Date": "date",
-                    "Open": "open",
-                    "High": "high",
-                    "Low": "low",
-                    "Close": "close",
-                    "Volume": "volume",
-                }
-            )
-            subset["date"] = subset["date"].astype(str)
-            subset["index_code"] = index_code
-            subset["index_name"] = index_name
-            subset["scale"] = scale
-
-            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            inserted_count = 0
-
-            # 检查表是否有 updated_at 字段（兼容旧表结构）
-            cursor = self.conn.execute("PRAGMA table_info(market_indices)")
-            columns = [row[1] for row in cursor.fetchall()]
-            has_updated_at = "updated_at" in columns
-
-            for _, row in subset.iterrows():
-                try:
-                    if has_updated_at:
-                        # 新表结构：包含 updated_at
-                        self.conn.execute(
-                            """
-                            INSERT OR REPLACE INTO market_indices
-                            (index_code, index_name, scale, date, open, high, low, close, volume, updated_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                index_code,
-                                index_name,
-                                scale,
-                                str(row["date"]),
-                                float(row["open"]),
-                                float(row["high"]),
-                                float(row["low"]),
-                                float(row["close"]),
-                                float(row["volume"]),
-                                now,
-                            ),
-                        )
-                    else:
-                        # 旧表结构：不包含 updated_at
-                        self.conn.execute(
-                            """
-                            INSERT OR REPLACE INTO market_indices
-                            (index_code, index_name, scale, date, open, high, low, close, volume)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                index_code,
-                                index_name,
-                                scale,
-                                str(row["date"]),
-                                float(row["open"]),
-                                float(row["high"]),
-                                float(row["low"]),
-                                float(row["close"]),
-                                float(row["volume"]),
-                            ),
-                        )
-                    inserted_count += 1
-                except Exception as e:
-                    logger.warning("插入指数数据失败: %s", e)
-                    continue
-
-            self.conn.commit()
-            if inserted_count > 0:
-                logger.info("指数 DB 写入成功: %s %d 条", index_code, inserted_count)
-            return inserted_count
-
+            inserted_count = self._write(lambda conn: self._bulk_upsert(conn, "market_indices", keys, df))
         except Exception as e:
             logger.error("保存指数数据失败: %s", e)
-            self.conn.rollback()
             return 0
 
+        if inserted_count > 0:
+            logger.info("指数 DB 写入成功: %s %d 条", index_code, inserted_count)
+        return inserted_count
+
     def get_market_index_data(self, index_code: str, scale: int, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
         """获取市场指数数据"""
         query = (
-            "SELECT date, open, high, low, close, volume FROM market_indices "
-            "WHERE index_code = ? AND scale = ? ORDER BY date DESC"
+            "SELECT ts, open, high, low, close, volume FROM market_indices "
+            "WHERE index_code = ? AND scale = ? ORDER BY ts DESC"
         )
 
         if limit:
@@ -466,21 +837,7 @@ class StockDatabase:
             if df.empty:
                 return None
 
-            df = df.sort_values("date").reset_index(drop=True)
-            df = df.rename(
-                columns={
-                    "date": "Date",
-                    "open": "Open",
-                    "high": "High",
-                    "low": "Low",
-                    "close": "Close",
-                    "volume": "Volume",
-                }
-            )
-
-            df["Date"] = pd.to_datetime(df["Date"])
-            df.set_index("Date", inplace=True)
-
+            df = _ohlcv_frame(df.iloc[::-1].reset_index(drop=True))
             for col in ["Open", "High", "Low", "Close", "Volume"]:
                 df[col] = pd.to_numeric(df[col], errors="coerce")
 
@@ -508,6 +865,18 @@ class StockDatabase:
             cursor = self.conn.execute("SELECT COUNT(DISTINCT index_code) FROM market_indices")
             stats["total_indices"] = cursor.fetchone()[0]
 
+            stats["schema_version"] = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            cursor = self.conn.execute("SELECT COUNT(*), MAX(written_at) FROM write_batches")
+            stats["write_batches"], last_write = cursor.fetchone()
+            if last_write is not None:
+                stats["last_write_at"] = datetime.fromtimestamp(last_write).strftime("%Y-%m-%d %H:%M:%S")
+
+            # 冷数据归档
+            cursor = self.conn.execute("SELECT COUNT(DISTINCT code) FROM archive_ranges")
+            stats["archived_stocks"] = cursor.fetchone()[0]
+            if self.archive is not None:
+                stats.update(self.archive.stats())
+
             # 数据库文件大小
             db_file = Path(self.db_path)
             if db_file.exists():
@@ -519,8 +888,23 @@ class StockDatabase:
         return stats
 
     def close(self) -> None:
-        """关闭数据库连接"""
-        self.conn.close()
+        """等待已提交的写操作完成后关闭写线程与全部连接；之后的写入抛出 sqlite3.ProgrammingError"""
+        with self._close_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        if self._writer.is_alive():
+            self._writer.join()
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+        self._local = threading.local()
+
+    @property
+    def closed(self) -> bool:
+        """是否已调用 close()"""
+        return self._closed
 
     def __enter__(self):
         return self
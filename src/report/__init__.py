@@ -4,8 +4,10 @@
 """
 
 from .generator import process_multiple_stocks, create_zip_archive
+from .warmup import warm_up
 
 __all__ = [
     "process_multiple_stocks",
     "create_zip_archive",
+    "warm_up",
 ]
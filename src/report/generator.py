@@ -6,7 +6,6 @@
 import os
 import re
 import shutil
-import time
 import zipfile
 from datetime import datetime
 from typing import List, Tuple, Optional, Dict, Any
@@ -16,7 +15,9 @@ import pandas as pd
 from src.utils.code_normalizer import normalize_code, parse_stock_list
 from src.data.fetchers import (
     get_name,
+    get_names,
     fetch_kline_data,
+    fetch_kline_many,
     get_market_indices_data,
     get_sector_indices_data,
     load_sector_index_map,
@@ -28,6 +29,7 @@ from src.visualization import create_candle_chart, create_indices_charts, create
 from src.config import Config
 from src.utils.logger import get_logger
 from src.utils.parallel import batch_process
+from src.utils.rate_limiter import get_rate_limiter
 from src.utils.exceptions import (
     DataFetchError,
     IndicatorCalculationError,
@@ -37,8 +39,54 @@ from src.utils.exceptions import (
 logger = get_logger(__name__)
 
 
+# 个股报告需要的K线周期：(scale, datalen)
+_STOCK_KLINE_SCALES = [(240, 150), (30, 100), (5, 100), (1, 100)]
+
+
+def _resolve_input(code_input: str, sector_map: Dict[str, Any]) -> Tuple[str, Optional[str], bool]:
+    """
+    识别输入是行业（代码/名称/模糊匹配）还是普通股票
+
+    Args:
+        code_input: 股票代码或行业代码/名称
+        sector_map: 行业映射字典
+
+    Returns:
+        Tuple[code, sector_name, is_sector]: 股票为标准化代码且名称为 None
+    """
+    name_to_code = sector_map.get("name_to_code", {})
+    code_to_name = sector_map.get("code_to_name", {})
+
+    # 1. 检查是否为行业代码（BK开头）
+    if code_input.startswith("BK") and code_input in code_to_name:
+        return code_input, code_to_name[code_input], True
+
+    # 2. 检查是否为行业名称（完全匹配）
+    if code_input in name_to_code:
+        return name_to_code[code_input], code_input, True
+
+    # 3. 模糊匹配行业名称
+    potential_name = code_input.split(".")[0] if "." in code_input else code_input
+    for s_name, s_code in name_to_code.items():
+        if len(potential_name) >= 2 and (potential_name in s_name or s_name in potential_name):
+            return s_code, s_name, True
+
+    return normalize_code(code_input), None, False
+
+
+def _stock_kline_requests(stock_code: str) -> List[Tuple[str, int, int]]:
+    """个股报告所需的全部K线请求"""
+    return [(stock_code, scale, datalen) for scale, datalen in _STOCK_KLINE_SCALES]
+
+
 def _process_single_stock(
-    code_input: str, output_folder: str, sector_input: Optional[str], sector_map: Dict[str, Any], index: int, total: int
+    code_input: str,
+    output_folder: str,
+    sector_input: Optional[str],
+    sector_map: Dict[str, Any],
+    index: int,
+    total: int,
+    prefetched: Optional[Dict[Tuple[str, int, int], Any]] = None,
 ) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
     """
     处理单个股票（内部函数，用于并发处理）
@@ -50,6 +98,7 @@ def _process_single_stock(
         sector_map: 行业映射字典
         index: 当前索引
         total: 总数
+        prefetched: 已批量获取的K线结果（fetch_kline_many 的返回值），缺失的请求会在此补拉
 
     Returns:
         Tuple[stock_code, stock_name, pdf_path, error]: 处理结果
@@ -63,41 +112,11 @@ def _process_single_stock(
             logger.warning("⚠️  跳过空代码")
             return (None, None, None, "空代码")
 
-        name_to_code = sector_map.get("name_to_code", {})
-        code_to_name = sector_map.get("code_to_name", {})
-
-        is_sector_input = False
-        stock_code = None
-        stock_name = None
-
-        # 1. 检查是否为行业代码（BK开头）
-        if code_input.startswith("BK") and code_input in code_to_name:
-            stock_code = code_input
-            stock_name = code_to_name[code_input]
-            is_sector_input = True
-            logger.info(f"ℹ️  识别为行业代码: {stock_code} ({stock_name})")
-
-        # 2. 检查是否为行业名称（完全匹配）
-        elif code_input in name_to_code:
-            stock_code = name_to_code[code_input]
-            stock_name = code_input
-            is_sector_input = True
-            logger.info(f"ℹ️  识别为行业名称: {stock_name} ({stock_code})")
-
-        # 3. 模糊匹配行业名称
-        if not is_sector_input:
-            potential_name = code_input.split(".")[0] if "." in code_input else code_input
-            for s_name, s_code in name_to_code.items():
-                if len(potential_name) >= 2 and (potential_name in s_name or s_name in potential_name):
-                    stock_code = s_code
-                    stock_name = s_name
-                    is_sector_input = True
-                    logger.info(f"ℹ️  模糊匹配到行业: {stock_name} ({stock_code})")
-                    break
-
-        # 4. 如果仍然不是行业，则作为普通股票处理
-        if not is_sector_input:
-            stock_code = normalize_code(code_input)
+        stock_code, stock_name, is_sector_input = _resolve_input(code_input, sector_map)
+
+        if is_sector_input:
+            logger.info(f"ℹ️  识别为行业: {stock_name} ({stock_code})")
+        else:
             stock_name = get_name(stock_code)
             logger.info(f"📈 识别为股票: {stock_code} ({stock_name or '未知'})")
 
@@ -110,7 +129,8 @@ def _process_single_stock(
 
         logger.info("\n1️⃣  获取市场指数数据...")
         is_hk = str(stock_code).startswith("HK.")
-        indices_data = get_market_indices_data(is_hk=is_hk)
+        # 指数数据经请求合并与缓存共享给并发任务，复制后再合并行业指数，避免不同报告互相写入
+        indices_data = dict(get_market_indices_data(is_hk=is_hk) or {})
 
         # 获取行业板块指数
         current_sector = sector_input or (stock_code if is_sector_input else None)
@@ -161,8 +181,11 @@ def _process_single_stock(
                     stock_data_map["week"] = resample_kline_data(df_day, "W")
                     stock_data_map["month"] = resample_kline_data(df_day, "M")
 
+                    # AKShare 请求经自适应限速器发送，失败时由限速器退避而非固定等待
+                    limiter = get_rate_limiter("akshare")
                     for p in ["30", "5"]:
                         for retry in range(3):
+                            limiter.acquire()
                             try:
                                 df_min = ak.stock_board_industry_hist_min_em(symbol=stock_name, period=p)
                                 if df_min is not None and not df_min.empty:
@@ -180,19 +203,31 @@ def _process_single_stock(
                                     df_min.set_index("Date", inplace=True)
                                     df_min = calculate_technical_indicators(df_min)
                                     stock_data_map[f"{p}m"] = df_min
+                                    limiter.on_success()
                                     break
                             except Exception:
-                                time.sleep(2)
+                                limiter.on_throttle()
             else:
-                df_day = fetch_kline_data(stock_code, 240, 150)
+                # 所有周期同时发出，耗时取决于最慢的一个请求
+                kline_requests = _stock_kline_requests(stock_code)
+                frames = dict(prefetched or {})
+                missing = [req for req in kline_requests if req not in frames]
+                if missing:
+                    frames.update(fetch_kline_many(missing, fetch_func=fetch_kline_data, return_exceptions=True))
+                for req in kline_requests:
+                    if isinstance(frames.get(req), Exception):
+                        raise frames[req]
+
+                df_day = frames.get(kline_requests[0])
                 if df_day is not None:
                     df_day = calculate_technical_indicators(df_day)
                     stock_data_map["day"] = df_day
                     stock_data_map["week"] = resample_kline_data(df_day, "W")
                     stock_data_map["month"] = resample_kline_data(df_day, "M")
 
-                    for p in [30, 5, 1]:
-                        df_min = fetch_kline_data(stock_code, p, 100)
+                    for req in kline_requests[1:]:
+                        p = req[1]
+                        df_min = frames.get(req)
                         if df_min is not None:
                             if not is_hk:
                                 df_min = normalize_beijing_time(df_min)
@@ -269,6 +304,46 @@ def _process_single_stock(
         return (None, None, None, str(e))
 
 
+def split_stock_inputs(stock_codes: List[str], sector_map: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """
+    将输入列表分为个股与行业
+
+    Args:
+        stock_codes: 股票代码或行业代码/名称列表
+        sector_map: 行业映射字典
+
+    Returns:
+        Tuple[List[str], List[str]]: (标准化的股票代码, 行业代码)
+    """
+    stock_symbols, sector_codes = [], []
+    for code_input in stock_codes:
+        if code_input:
+            code, _, is_sector = _resolve_input(code_input, sector_map)
+            (sector_codes if is_sector else stock_symbols).append(code)
+    return stock_symbols, sector_codes
+
+
+def prefetch_stocks(stock_symbols: List[str]) -> Dict[Tuple[str, int, int], Any]:
+    """
+    批量获取个股报告所需的名称与全部K线周期（结果写入缓存/数据库）
+
+    Args:
+        stock_symbols: 标准化的股票代码列表
+
+    Returns:
+        Dict[(symbol, scale, datalen), DataFrame 或异常]: fetch_kline_many 的结果
+    """
+    if not stock_symbols:
+        return {}
+
+    # 一次批量请求解析整个列表的股票名称（结果写入缓存/数据库，逐只处理时不再请求）
+    get_names(stock_symbols)
+
+    stock_requests = [req for code in stock_symbols for req in _stock_kline_requests(code)]
+    logger.info(f"📡 并发获取 {len(stock_requests)} 个K线请求...")
+    return fetch_kline_many(stock_requests, fetch_func=fetch_kline_data, return_exceptions=True)
+
+
 def process_multiple_stocks(
     stock_codes_input: str, output_folder: str, sector_input: Optional[str] = None
 ) -> Tuple[List[Tuple], List[Tuple]]:
@@ -292,6 +367,10 @@ def process_multiple_stocks(
     # 加载行业映射
     sector_map = load_sector_index_map()
 
+    # 所有个股的全部K线周期一次性并发拉取，后续逐个处理时直接复用
+    stock_symbols, _ = split_stock_inputs(stock_codes, sector_map)
+    prefetched = prefetch_stocks(stock_symbols)
+
     # 检查是否启用并发处理
     config = Config()
     parallel_config = config.get("parallel", {})
@@ -301,13 +380,14 @@ def process_multiple_stocks(
         # 使用并发处理
         max_workers = parallel_config.get("max_workers", 3)
         batch_size = parallel_config.get("batch_size", 5)
-        delay_between_batches = parallel_config.get("delay_between_batches", 1)
+        # 请求节奏由各 host 的自适应限速器控制，批次间默认不再固定等待
+        delay_between_batches = parallel_config.get("delay_between_batches", 0)
 
         logger.info(f"🚀 启用并发处理: 最大并发数={max_workers}, 批次大小={batch_size}")
 
         # 准备处理任务
         tasks = [
-            (code_input, output_folder, sector_input, sector_map, i + 1, len(stock_codes))
+            (code_input, output_folder, sector_input, sector_map, i + 1, len(stock_codes), prefetched)
             for i, code_input in enumerate(stock_codes)
         ]
 
@@ -338,7 +418,7 @@ def process_multiple_stocks(
 
         for i, code_input in enumerate(stock_codes, 1):
             stock_code, stock_name, pdf_path, error = _process_single_stock(
-                code_input, output_folder, sector_input, sector_map, i, len(stock_codes)
+                code_input, output_folder, sector_input, sector_map, i, len(stock_codes), prefetched
             )
 
             if error is None and pdf_path:
@@ -346,16 +426,6 @@ def process_multiple_stocks(
             else:
                 failed_reports.append((stock_code or code_input, stock_name or "未知", error or "处理失败"))
 
-            # 串行模式下的延迟（并发模式下由batch_process处理）
-            if i < len(stock_codes):
-                delays = config.delays
-                if stock_code and str(stock_code).startswith("HK."):
-                    delay = delays.get("hk_stock", 3)
-                else:
-                    delay = delays.get("normal", 1)
-                logger.debug(f"💤 等待 {delay} 秒后处理下一个股票...")
-                time.sleep(delay)
-
     return successful_reports, failed_reports
 
 
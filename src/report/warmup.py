@@ -0,0 +1,98 @@
+"""
+盘前预热模块
+在开盘前把报告需要的交易日历、股票名称、K线、市场指数与行业指数提前写入缓存和本地数据库，
+之后的定时任务只需获取增量数据
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config import Config
+from src.data.fetchers import get_market_indices_data, get_sector_indices_data, load_sector_index_map
+from src.report.generator import prefetch_stocks, split_stock_inputs
+from src.utils.logger import get_logger
+from src.utils.parallel import parallel_process
+from src.utils.stale_while_revalidate import wait_for_refreshes
+from src.utils.trading_calendar import get_trading_calendar
+
+logger = get_logger(__name__)
+
+
+def _warm_index_task(task):
+    """预热一项指数数据：("indices", is_hk) 或 ("sector", 行业代码)"""
+    kind, arg = task
+    if kind == "indices":
+        return get_market_indices_data(is_hk=arg)
+    # 与生成报告时的请求参数一致，才能命中同一缓存条目
+    return get_sector_indices_data(arg, count=150)
+
+
+def warm_up(
+    stock_codes: Optional[List[str]] = None,
+    sectors: Optional[List[str]] = None,
+    refresh_timeout: float = 120,
+) -> Dict[str, Any]:
+    """
+    预热缓存与数据库
+
+    个股名称与K线走与生成报告相同的批量/并发获取路径，指数与行业并发获取；
+    过期但仍可用的指数数据会在后台刷新，退出前等待刷新完成。
+
+    Args:
+        stock_codes: 股票代码或行业代码/名称列表，None 使用 Config().stocks
+        sectors: 额外预热的行业代码或名称，None 使用 warmup.sectors 配置
+        refresh_timeout: 等待后台刷新完成的最长时间（秒）
+
+    Returns:
+        Dict: 预热结果统计 {stocks, klines, klines_failed, indices, indices_failed, elapsed}
+    """
+    started = time.monotonic()
+    config = Config()
+    stock_codes = config.stocks if stock_codes is None else stock_codes
+    if sectors is None:
+        sectors = config.get("warmup.sectors", []) or []
+
+    # 1. 交易日历（每天一次，后续的交易日判断与K线缓存过期时间都依赖它）
+    for market in ("A", "HK"):
+        try:
+            get_trading_calendar(market).is_trading_day()
+        except Exception as e:
+            logger.warning("预热交易日历失败 %s: %s", market, e)
+
+    # 2. 个股名称与全部K线周期
+    sector_map = load_sector_index_map()
+    stock_symbols, sector_codes = split_stock_inputs(stock_codes, sector_map)
+    for code in split_stock_inputs(sectors, sector_map)[1]:
+        if code not in sector_codes:
+            sector_codes.append(code)
+    klines = prefetch_stocks(stock_symbols)
+    klines_ok = sum(1 for df in klines.values() if df is not None and not isinstance(df, Exception))
+
+    # 3. 市场指数与行业指数
+    tasks = [("indices", False)]
+    if any(symbol.startswith("HK.") for symbol in stock_symbols):
+        tasks.append(("indices", True))
+    tasks.extend(("sector", code) for code in sector_codes)
+    results = parallel_process(tasks, _warm_index_task)
+    indices_ok = sum(1 for _, result, error in results if error is None and result)
+    if not wait_for_refreshes(refresh_timeout):
+        logger.warning("等待后台刷新超时（%s 秒），部分指数数据未更新", refresh_timeout)
+
+    summary = {
+        "stocks": len(stock_symbols),
+        "klines": klines_ok,
+        "klines_failed": len(klines) - klines_ok,
+        "indices": indices_ok,
+        "indices_failed": len(tasks) - indices_ok,
+        "elapsed": time.monotonic() - started,
+    }
+    logger.info(
+        "🔥 预热完成: %s 只股票, K线 %s 成功/%s 失败, 指数 %s 成功/%s 失败, 耗时 %.1f 秒",
+        summary["stocks"],
+        summary["klines"],
+        summary["klines_failed"],
+        summary["indices"],
+        summary["indices_failed"],
+        summary["elapsed"],
+    )
+    return summary
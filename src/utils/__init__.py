@@ -9,6 +9,8 @@ from .parallel import parallel_process, batch_process, parallel_map
 from .exceptions import (
     StockAnalysisError,
     DataFetchError,
+    NoDataError,
+    CircuitOpenError,
     IndicatorCalculationError,
     ReportGenerationError,
     ConfigError,
@@ -24,6 +26,8 @@ __all__ = [
     "parallel_map",
     "StockAnalysisError",
     "DataFetchError",
+    "NoDataError",
+    "CircuitOpenError",
     "IndicatorCalculationError",
     "ReportGenerationError",
     "ConfigError",
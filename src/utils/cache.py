@@ -1,56 +1,162 @@
 """
 数据缓存模块
-提供文件缓存机制，支持TTL（生存时间），避免重复数据请求
+提供文件缓存机制，支持TTL（生存时间），避免重复数据请求；
+条目元数据保存在 SQLite 索引（cache_index.db）中。
+DataFrame 以 Arrow IPC（Feather V2）格式保存，读取时内存映射、按列零拷贝还原；
+其他类型或未安装 pyarrow 时使用 pickle。
+文件先写临时文件再原子替换，读取方不会看到写了一半的文件；
+替换文件与更新索引在跨进程文件锁内完成，多个进程可共享同一缓存目录
 """
 
+import os
 import pickle
 import hashlib
 import json
+import threading
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Dict, Tuple
 
+import pandas as pd
+
+from src.utils.cache_index import EVICTION_ORDER, CacheIndex
+from src.utils.file_lock import FileLock
 from src.utils.logger import get_logger
+from src.utils.memory_cache import MISS, MemoryLRU
+from src.utils.metrics import get_metrics
 
 logger = get_logger(__name__)
 
+# 可选依赖：pyarrow
+try:
+    import pyarrow as pa
+except Exception:
+    pa = None
+
+FORMAT_PICKLE = "pickle"
+FORMAT_ARROW = "arrow"
+_SUFFIXES = {FORMAT_PICKLE: ".pkl", FORMAT_ARROW: ".arrow"}
+_ATTRS_KEY = b"cache_attrs"
+
+# 指标范围（键族为缓存键名，负缓存等 "前缀:..." 形式的键名按前缀归类）
+_METRICS_SCOPE = "cache"
+
+# 清理孤立文件时跳过最近修改的文件（可能正在写入、尚未登记到索引）
+_ORPHAN_GRACE_SECONDS = 600
+
+
+def _arrow_compatible(value: Any) -> bool:
+    """是否可按 Arrow 格式保存：普通列名（字符串）的 DataFrame"""
+    if pa is None or not isinstance(value, pd.DataFrame):
+        return False
+    return not isinstance(value.columns, pd.MultiIndex) and all(isinstance(c, str) for c in value.columns)
+
+
+def _write_arrow(df: pd.DataFrame, path: Path) -> None:
+    """DataFrame 写为未压缩的 Arrow IPC 文件（保留索引与 attrs）"""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    if df.attrs:
+        metadata = dict(table.schema.metadata or {})
+        metadata[_ATTRS_KEY] = json.dumps(df.attrs, ensure_ascii=False, default=str).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _absolute_expiry(entry: Dict[str, Any]) -> Optional[float]:
+    """条目写入时指定的绝对过期时间（按 TTL 写入的条目返回 None）"""
+    return entry["expires_at"] if entry["ttl_hours"] is None else None
+
+
+def _is_expired(entry: Dict[str, Any], ttl_seconds: float, now: float) -> bool:
+    """绝对过期时间优先，否则按写入时间与读取时给定的 TTL 判断"""
+    expires_at = _absolute_expiry(entry)
+    if expires_at is not None:
+        return now >= expires_at
+    return now - entry["created_at"] > ttl_seconds
+
+
+def _family(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _read_arrow(path: Path) -> pd.DataFrame:
+    """内存映射读取 Arrow IPC 文件；无缺失值的数值列直接引用映射内存"""
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(split_blocks=True)
+    attrs = (table.schema.metadata or {}).get(_ATTRS_KEY)
+    if attrs:
+        df.attrs.update(json.loads(attrs))
+    return df
+
 
 class DataCache:
     """数据缓存管理器"""
 
-    def __init__(self, cache_dir: str = "cache", default_ttl_hours: int = 1):
+    def __init__(
+        self,
+        cache_dir: str = "cache",
+        default_ttl_hours: int = 1,
+        use_arrow: bool = True,
+        memory_max_mb: float = 0,
+        max_size_mb: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        eviction: str = "lru",
+        shared: bool = False,
+    ):
         """
         初始化缓存管理器
 
         Args:
             cache_dir: 缓存目录路径
             default_ttl_hours: 默认缓存生存时间（小时）
+            use_arrow: DataFrame 是否使用 Arrow 格式保存（需安装 pyarrow）
+            memory_max_mb: 进程内 LRU 内存层容量（MB），0 表示不启用
+            max_size_mb: 磁盘缓存总大小上限（MB），None 表示不限
+            max_entries: 缓存条目数上限，None 表示不限
+            eviction: 超出上限时的淘汰策略，"lru"（最近最少使用）或 "lfu"（最不经常使用）
+            shared: 缓存目录是否由多个进程同时使用；开启后内存层命中需与索引核对，
+                以感知其他进程的覆盖与删除
         """
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.default_ttl_hours = default_ttl_hours
-
-        # 元数据文件路径
-        self.metadata_file = self.cache_dir / "cache_metadata.json"
-        self.metadata = self._load_metadata()
-
-    def _load_metadata(self) -> Dict[str, Any]:
-        """加载缓存元数据"""
-        if self.metadata_file.exists():
-            try:
-                with open(self.metadata_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"加载缓存元数据失败: {e}")
-        return {}
-
-    def _save_metadata(self):
-        """保存缓存元数据"""
-        try:
-            with open(self.metadata_file, "w", encoding="utf-8") as f:
-                json.dump(self.metadata, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"保存缓存元数据失败: {e}")
+        self.use_arrow = use_arrow and pa is not None
+        self.memory = MemoryLRU(int(memory_max_mb * 1024 * 1024)) if memory_max_mb else None
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.max_entries = max_entries or None
+        if eviction not in EVICTION_ORDER:
+            raise ValueError(f"不支持的淘汰策略: {eviction}")
+        self.eviction = eviction
+        self.evictions = 0
+        self._memory_max_mb = memory_max_mb
+        self._janitor: Optional[threading.Thread] = None
+        self._janitor_stop = threading.Event()
+        self.shared = shared
+        # 跨进程写锁：替换文件、更新索引、淘汰与清理在锁内完成；读取不加锁
+        self._lock = FileLock(self.cache_dir / ".lock")
+
+        # 元数据索引（旧版 cache_metadata.json 首次打开时迁移）
+        self.index = CacheIndex(self.cache_dir)
+        legacy_metadata = self.cache_dir / "cache_metadata.json"
+        with self._lock:
+            if legacy_metadata.exists():
+                self.index.import_json_metadata(legacy_metadata)
+
+    def __reduce__(self):
+        """跨进程传递（如 ProcessPoolExecutor）时在子进程按相同配置以共享模式重新打开"""
+        args = (
+            str(self.cache_dir),
+            self.default_ttl_hours,
+            self.use_arrow,
+            self._memory_max_mb,
+            self.max_bytes / (1024 * 1024) if self.max_bytes else None,
+            self.max_entries,
+            self.eviction,
+            True,
+        )
+        return (DataCache, args)
 
     def _get_cache_key(self, key: str, **kwargs) -> str:
         """
@@ -71,9 +177,10 @@ class DataCache:
         hash_obj = hashlib.md5(combined.encode("utf-8"))
         return f"{hash_obj.hexdigest()}.pkl"
 
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """获取缓存文件路径"""
-        return self.cache_dir / cache_key
+    def _get_cache_path(self, cache_key: str, fmt: str = FORMAT_PICKLE) -> Path:
+        """获取缓存文件路径（缓存键对应 pickle 文件名，其他格式替换扩展名）"""
+        path = self.cache_dir / cache_key
+        return path if fmt == FORMAT_PICKLE else path.with_suffix(_SUFFIXES[fmt])
 
     def get(self, key: str, ttl_hours: Optional[int] = None, **kwargs) -> Optional[Any]:
         """
@@ -81,45 +188,120 @@ class DataCache:
 
         Args:
             key: 缓存键名
-            ttl_hours: 缓存生存时间（小时），None使用默认值
+            ttl_hours: 缓存生存时间（小时），None使用默认值；写入时指定了 expires_at 的条目以其为准
             **kwargs: 额外的参数（用于区分不同的请求）
 
         Returns:
             缓存的数据，如果不存在或已过期返回None
         """
+        return self._lookup(key, ttl_hours, kwargs)[0]
+
+    def get_with_age(
+        self, key: str, ttl_hours: Optional[int] = None, **kwargs
+    ) -> Tuple[Optional[Any], Optional[float]]:
+        """
+        从缓存获取数据及其写入时间
+
+        Args:
+            key: 缓存键名
+            ttl_hours: 缓存生存时间（小时），None使用默认值
+            **kwargs: 额外的参数（用于区分不同的请求）
+
+        Returns:
+            Tuple: (缓存的数据, 写入时间戳)，不存在或已过期时为 (None, None)
+        """
+        return self._lookup(key, ttl_hours, kwargs)
+
+    def _lookup(
+        self, key: str, ttl_hours: Optional[int], kwargs: Dict[str, Any]
+    ) -> Tuple[Optional[Any], Optional[float]]:
         cache_key = self._get_cache_key(key, **kwargs)
-        cache_path = self._get_cache_path(cache_key)
+        ttl_seconds = (ttl_hours or self.default_ttl_hours) * 3600
+        metrics, family = get_metrics(), _family(key)
+
+        # 先查进程内内存层
+        if self.memory is not None:
+            value = self.memory.get(cache_key, ttl_seconds)
+            created_at = self.memory.created_at(cache_key)
+            if value is not MISS and self.shared:
+                # 共享模式下核对索引：其他进程可能已覆盖或删除该条目
+                current = self.index.get(cache_key)
+                if current is None or current["created_at"] != created_at:
+                    self.memory.delete(cache_key)
+                    value = MISS
+            if value is not MISS:
+                self.index.touch(cache_key)
+                metrics.incr(_METRICS_SCOPE, family, "hits")
+                metrics.incr(_METRICS_SCOPE, family, "memory_hits")
+                logger.debug(f"从内存缓存读取: {key}")
+                return value, created_at
+
+        entry = self.index.get(cache_key)
+        fmt = entry["fmt"] if entry is not None else FORMAT_PICKLE
+        cache_path = self._get_cache_path(cache_key, fmt)
 
         if not cache_path.exists():
+            metrics.incr(_METRICS_SCOPE, family, "misses")
             logger.debug(f"缓存不存在: {key}")
-            return None
+            return None, None
 
         # 检查是否过期
-        if cache_key in self.metadata:
-            created_time = datetime.fromisoformat(self.metadata[cache_key]["created_at"])
-            ttl = timedelta(hours=ttl_hours or self.default_ttl_hours)
-
-            if datetime.now() - created_time > ttl:
-                logger.debug(f"缓存已过期: {key} (创建于 {created_time})")
-                self.delete(key, **kwargs)
-                return None
+        if entry is not None:
+            if _is_expired(entry, ttl_seconds, time.time()):
+                logger.debug(f"缓存已过期: {key} (创建于 {time.ctime(entry['created_at'])})")
+                self._discard(cache_key, entry["created_at"])
+                metrics.incr(_METRICS_SCOPE, family, "expirations")
+                metrics.incr(_METRICS_SCOPE, family, "misses")
+                return None, None
 
         # 读取缓存文件
         try:
-            with open(cache_path, "rb") as f:
-                data = pickle.load(f)
+            started = time.monotonic()
+            if fmt == FORMAT_ARROW:
+                data = _read_arrow(cache_path)
+            else:
+                with open(cache_path, "rb") as f:
+                    data = pickle.load(f)
+            metrics.observe(_METRICS_SCOPE, family, "load", time.monotonic() - started)
+            metrics.incr(_METRICS_SCOPE, family, "hits")
+            metrics.incr(_METRICS_SCOPE, family, "bytes_read", entry["size"] if entry is not None else 0)
             logger.debug(f"从缓存读取: {key}")
-            return data
+            if entry is not None:
+                self.index.touch(cache_key)
+                if self.memory is not None:
+                    self.memory.put(cache_key, data, entry["created_at"], _absolute_expiry(entry))
+            return data, entry["created_at"] if entry is not None else None
+        except FileNotFoundError:
+            # 读取前被其他进程（或线程）淘汰、删除
+            metrics.incr(_METRICS_SCOPE, family, "misses")
+            logger.debug(f"缓存不存在: {key}")
+            return None, None
         except Exception as e:
+            metrics.incr(_METRICS_SCOPE, family, "errors")
+            metrics.incr(_METRICS_SCOPE, family, "misses")
             logger.warning(f"读取缓存失败: {key}, 错误: {e}")
             # 删除损坏的缓存文件
-            if cache_path.exists():
-                cache_path.unlink()
-            if cache_key in self.metadata:
-                del self.metadata[cache_key]
-            return None
-
-    def set(self, key: str, value: Any, ttl_hours: Optional[int] = None, **kwargs):
+            self._discard(cache_key, entry["created_at"] if entry is not None else None)
+            return None, None
+
+    def _discard(self, cache_key: str, created_at: Optional[float]) -> None:
+        """删除条目；created_at 不为 None 时仅当索引中仍是该次写入的条目才删除，避免误删其他进程的新写入"""
+        with self._lock:
+            if created_at is not None:
+                current = self.index.get(cache_key)
+                if current is not None and current["created_at"] != created_at:
+                    return
+            self._remove_files([cache_key])
+            self.index.delete([cache_key])
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_hours: Optional[int] = None,
+        expires_at: Optional[float] = None,
+        **kwargs,
+    ):
         """
         保存数据到缓存
 
@@ -127,28 +309,60 @@ class DataCache:
             key: 缓存键名
             value: 要缓存的数据
             ttl_hours: 缓存生存时间（小时），None使用默认值
+            expires_at: 绝对过期时间（Unix 时间戳），给定时忽略 ttl_hours，
+                读取时也不再按调用方传入的 TTL 判断（如按交易时段计算的 K 线收盘时间）
             **kwargs: 额外的参数（用于区分不同的请求）
         """
         cache_key = self._get_cache_key(key, **kwargs)
-        cache_path = self._get_cache_path(cache_key)
+        tmp_path = self.cache_dir / f"{cache_key}.{os.getpid()}.{threading.get_ident()}.tmp"
 
         try:
-            # 保存数据
-            with open(cache_path, "wb") as f:
-                pickle.dump(value, f)
-
-            # 更新元数据
-            self.metadata[cache_key] = {
-                "key": key,
-                "created_at": datetime.now().isoformat(),
-                "ttl_hours": ttl_hours or self.default_ttl_hours,
-                "params": kwargs,
-            }
-            self._save_metadata()
-
+            # 先写临时文件（锁外）：DataFrame 优先 Arrow，失败（如 object 列类型混杂）时退回 pickle
+            started = time.monotonic()
+            fmt = FORMAT_PICKLE
+            if self.use_arrow and _arrow_compatible(value):
+                try:
+                    _write_arrow(value, tmp_path)
+                    fmt = FORMAT_ARROW
+                except Exception as e:
+                    logger.debug(f"Arrow 格式保存失败，改用 pickle: {key}, 错误: {e}")
+            if fmt == FORMAT_PICKLE:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(value, f)
+            size = tmp_path.stat().st_size
+
+            with self._lock:
+                # 原子替换；同一键此前可能以另一种格式保存
+                os.replace(tmp_path, self._get_cache_path(cache_key, fmt))
+                for other in _SUFFIXES:
+                    if other != fmt:
+                        self._get_cache_path(cache_key, other).unlink(missing_ok=True)
+
+                # 更新元数据（单行写入）
+                created_at = time.time()
+                self.index.put(
+                    cache_key,
+                    key,
+                    ttl_hours or self.default_ttl_hours,
+                    params=kwargs,
+                    size=size,
+                    created_at=created_at,
+                    fmt=fmt,
+                    expires_at=expires_at,
+                )
+                if self.memory is not None:
+                    self.memory.put(cache_key, value, created_at, expires_at)
+                self._enforce_limits(protect=cache_key)
+
+            metrics, family = get_metrics(), _family(key)
+            metrics.observe(_METRICS_SCOPE, family, "store", time.monotonic() - started)
+            metrics.incr(_METRICS_SCOPE, family, "writes")
+            metrics.incr(_METRICS_SCOPE, family, "bytes_written", size)
             logger.debug(f"保存到缓存: {key}")
         except Exception as e:
             logger.warning(f"保存缓存失败: {key}, 错误: {e}")
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
     def delete(self, key: str, **kwargs):
         """
@@ -159,14 +373,9 @@ class DataCache:
             **kwargs: 额外的参数
         """
         cache_key = self._get_cache_key(key, **kwargs)
-        cache_path = self._get_cache_path(cache_key)
-
-        if cache_path.exists():
-            cache_path.unlink()
-
-        if cache_key in self.metadata:
-            del self.metadata[cache_key]
-            self._save_metadata()
+        with self._lock:
+            self._remove_files([cache_key])
+            self.index.delete([cache_key])
 
         logger.debug(f"删除缓存: {key}")
 
@@ -177,33 +386,144 @@ class DataCache:
         Args:
             pattern: 可选，如果提供则只删除匹配的缓存（支持通配符）
         """
-        if pattern:
-            # 删除匹配的缓存
-            import fnmatch
-
-            for cache_key in list(self.metadata.keys()):
-                if fnmatch.fnmatch(self.metadata[cache_key]["key"], pattern):
-                    cache_path = self._get_cache_path(cache_key)
-                    if cache_path.exists():
-                        cache_path.unlink()
-                    del self.metadata[cache_key]
-        else:
-            # 清空所有缓存
-            for cache_file in self.cache_dir.glob("*.pkl"):
-                cache_file.unlink()
-            self.metadata = {}
-
-        self._save_metadata()
+        with self._lock:
+            if pattern:
+                # 删除匹配的缓存（索引查询，键名支持 * ? [...] 通配符）
+                cache_keys = self.index.match(pattern)
+                self._remove_files(cache_keys)
+                self.index.delete(cache_keys)
+            else:
+                # 清空所有缓存
+                for suffix in _SUFFIXES.values():
+                    for cache_file in self.cache_dir.glob(f"*{suffix}"):
+                        cache_file.unlink()
+                self.index.clear()
+                if self.memory is not None:
+                    self.memory.clear()
+
         logger.info(f"清空缓存: {pattern or '全部'}")
 
+    def purge_expired(self) -> int:
+        """
+        删除按写入时 TTL 已过期的缓存
+
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            cache_keys = self.index.expired()
+            self._remove_files(cache_keys)
+            self.index.delete(cache_keys)
+        if cache_keys:
+            logger.info(f"清理过期缓存: {len(cache_keys)} 条")
+        return len(cache_keys)
+
+    def _enforce_limits(self, protect: Optional[str] = None) -> None:
+        """超出容量上限时按淘汰策略删除条目（protect 为刚写入、不参与淘汰的缓存键）"""
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        victims = self.index.eviction_candidates(self.max_bytes, self.max_entries, self.eviction, protect=protect)
+        if victims:
+            self._remove_files(victims)
+            self.index.delete(victims)
+            self.evictions += len(victims)
+            logger.debug(f"缓存超出容量上限，淘汰 {len(victims)} 条（{self.eviction}）")
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        清理过期条目、孤立文件（无索引记录的缓存文件与残留临时文件）
+        以及文件已丢失的索引记录，并执行容量限制
+
+        Returns:
+            Dict[str, int]: 各类清理数量
+        """
+        with self._lock:
+            expired = self.purge_expired()
+
+            known = set(self.index.all_keys())
+            orphan_files = 0
+            cutoff = time.time() - _ORPHAN_GRACE_SECONDS
+            for path in self.cache_dir.iterdir():
+                if path.suffix not in (".pkl", ".arrow", ".tmp") or not path.is_file():
+                    continue
+                if path.suffix != ".tmp" and f"{path.stem}.pkl" in known:
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        orphan_files += 1
+                except FileNotFoundError:
+                    pass
+
+            missing = []
+            for cache_key in known:
+                entry = self.index.get(cache_key)
+                if entry is not None and not self._get_cache_path(cache_key, entry["fmt"]).exists():
+                    missing.append(cache_key)
+            self.index.delete(missing)
+
+            before = self.evictions
+            self._enforce_limits()
+        result = {
+            "expired": expired,
+            "orphan_files": orphan_files,
+            "missing_files": len(missing),
+            "evicted": self.evictions - before,
+        }
+        if any(result.values()):
+            logger.info(f"缓存清理完成: {result}")
+        return result
+
+    def start_janitor(self, interval_minutes: float) -> None:
+        """
+        启动后台清理线程：立即清理一次，之后每隔 interval_minutes 分钟清理一次
+
+        Args:
+            interval_minutes: 清理间隔（分钟），0 表示只在启动时清理一次
+        """
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._janitor_stop.clear()
+
+        def _run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.warning(f"缓存清理失败: {e}")
+                if not interval_minutes or self._janitor_stop.wait(interval_minutes * 60):
+                    return
+
+        self._janitor = threading.Thread(target=_run, name="cache-janitor", daemon=True)
+        self._janitor.start()
+
+    def stop_janitor(self) -> None:
+        """停止后台清理线程"""
+        self._janitor_stop.set()
+        if self._janitor is not None:
+            self._janitor.join(timeout=5)
+            self._janitor = None
+
+    def _remove_files(self, cache_keys):
+        for cache_key in cache_keys:
+            if self.memory is not None:
+                self.memory.delete(cache_key)
+            for fmt in _SUFFIXES:
+                self._get_cache_path(cache_key, fmt).unlink(missing_ok=True)
+
     def get_stats(self) -> Dict[str, Any]:
-        """获取缓存统计信息"""
-        total_size = sum(f.stat().st_size for f in self.cache_dir.glob("*.pkl"))
+        """获取缓存统计信息（条目数与大小来自索引，不扫描目录；families 为本进程各键族的命中、读写与延迟指标）"""
+        entries, total_size = self.index.totals()
 
         return {
-            "total_files": len(list(self.cache_dir.glob("*.pkl"))),
+            "total_files": entries,
             "total_size_mb": total_size / (1024 * 1024),
-            "metadata_entries": len(self.metadata),
+            "metadata_entries": entries,
+            "max_size_mb": self.max_bytes / (1024 * 1024) if self.max_bytes else None,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "memory": self.memory.stats() if self.memory is not None else None,
+            "families": get_metrics().snapshot(_METRICS_SCOPE).get(_METRICS_SCOPE, {}),
         }
 
 
@@ -240,9 +560,20 @@ def get_cache(cache_dir: Optional[str] = None, default_ttl_hours: Optional[int]
             cache_dir = cache_dir or cache_config.get("dir", "cache")
             default_ttl_hours = default_ttl_hours or cache_config.get("default_ttl_hours", 1)
         except Exception:
+            cache_config = {}
             cache_dir = cache_dir or "cache"
             default_ttl_hours = default_ttl_hours or 1
 
-        _cache_instance = DataCache(cache_dir, default_ttl_hours)
+        _cache_instance = DataCache(
+            cache_dir,
+            default_ttl_hours,
+            use_arrow=cache_config.get("arrow", True),
+            memory_max_mb=cache_config.get("memory_max_mb", 256),
+            max_size_mb=cache_config.get("max_size_mb", 2048),
+            max_entries=cache_config.get("max_entries", 20000),
+            eviction=cache_config.get("eviction", "lru"),
+            shared=cache_config.get("shared", False),
+        )
+        _cache_instance.start_janitor(cache_config.get("janitor_interval_minutes", 30))
 
     return _cache_instance
@@ -0,0 +1,276 @@
+"""
+缓存索引模块
+用 SQLite 保存缓存元数据（每个条目一行），读写均为按主键的 O(1) 操作，
+过期检查与按模式清理为索引查询，替代每次写入都整体重写的 cache_metadata.json
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILENAME = "cache_index.db"
+
+# 旧版索引缺少的列（打开时补齐）
+_ADDED_COLUMNS = {
+    "fmt": "TEXT NOT NULL DEFAULT 'pickle'",
+    "last_access": "REAL",
+    "hits": "INTEGER NOT NULL DEFAULT 0",
+}
+
+# 淘汰顺序：LRU 按最近访问时间，LFU 按访问次数（相同时按最近访问时间）
+EVICTION_ORDER = {
+    "lru": "COALESCE(last_access, created_at) ASC",
+    "lfu": "hits ASC, COALESCE(last_access, created_at) ASC",
+}
+
+
+class CacheIndex:
+    """缓存元数据索引（线程安全）"""
+
+    def __init__(self, cache_dir: Path):
+        """
+        打开（或创建）缓存目录下的索引库
+
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.path = Path(cache_dir) / INDEX_FILENAME
+        self._lock = threading.RLock()
+        # 多进程共享：WAL 模式下读不阻塞写，写冲突时等待而非立即报错
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError as e:
+            logger.debug("缓存索引无法启用 WAL 模式: %s", e)
+        # 访问记录先攒在内存，随下一次写操作批量落盘，读路径不产生事务
+        self._pending_access: Dict[str, Tuple[float, int]] = {}
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    cache_key TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    ttl_hours REAL,
+                    expires_at REAL,
+                    params TEXT,
+                    size INTEGER DEFAULT 0,
+                    fmt TEXT NOT NULL DEFAULT 'pickle',
+                    last_access REAL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(entries)")}
+            for name, definition in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE entries ADD COLUMN {name} {definition}")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_key ON entries(key)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access)")
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """按缓存键读取条目"""
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM entries WHERE cache_key = ?", (cache_key,)).fetchone()
+        return dict(row) if row else None
+
+    def touch(self, cache_key: str) -> None:
+        """记录一次读取（用于 LRU/LFU 淘汰）"""
+        with self._lock:
+            _, count = self._pending_access.get(cache_key, (0.0, 0))
+            self._pending_access[cache_key] = (time.time(), count + 1)
+
+    def _flush_access(self) -> None:
+        """将攒下的访问记录写入索引（调用方持有锁并处于事务中）"""
+        if not self._pending_access:
+            return
+        self.conn.executemany(
+            "UPDATE entries SET last_access = ?, hits = hits + ? WHERE cache_key = ?",
+            [(ts, count, cache_key) for cache_key, (ts, count) in self._pending_access.items()],
+        )
+        self._pending_access.clear()
+
+    def put(
+        self,
+        cache_key: str,
+        key: str,
+        ttl_hours: Optional[float],
+        params: Optional[Dict[str, Any]] = None,
+        size: int = 0,
+        created_at: Optional[float] = None,
+        fmt: str = "pickle",
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """写入或覆盖条目；给定 expires_at（绝对过期时间戳）时不记录 TTL"""
+        created_at = time.time() if created_at is None else created_at
+        if expires_at is not None:
+            ttl_hours = None
+        elif ttl_hours:
+            expires_at = created_at + ttl_hours * 3600
+        params_json = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, default=str)
+        with self._lock, self.conn:
+            self._pending_access.pop(cache_key, None)
+            self._flush_access()
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (cache_key, key, created_at, ttl_hours, expires_at, params, size, fmt, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                """,
+                (cache_key, key, created_at, ttl_hours, expires_at, params_json, size, fmt, created_at),
+            )
+
+    def delete(self, cache_keys: List[str]) -> None:
+        """删除条目"""
+        if not cache_keys:
+            return
+        with self._lock, self.conn:
+            for cache_key in cache_keys:
+                self._pending_access.pop(cache_key, None)
+            self.conn.executemany("DELETE FROM entries WHERE cache_key = ?", [(k,) for k in cache_keys])
+
+    def match(self, pattern: str) -> List[str]:
+        """键名匹配通配符（* ? [...]）的缓存键"""
+        with self._lock:
+            rows = self.conn.execute("SELECT cache_key FROM entries WHERE key GLOB ?", (pattern,)).fetchall()
+        return [row[0] for row in rows]
+
+    def entries(self, pattern: str) -> List[Dict[str, Any]]:
+        """键名匹配通配符的条目（按写入时间倒序）"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM entries WHERE key GLOB ? ORDER BY created_at DESC", (pattern,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def expired(self, now: Optional[float] = None) -> List[str]:
+        """已超过写入时 TTL 的缓存键"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT cache_key FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def totals(self) -> Tuple[int, int]:
+        """条目数与文件总字节数"""
+        with self._lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return count, size
+
+    def eviction_candidates(
+        self,
+        max_bytes: Optional[int],
+        max_entries: Optional[int],
+        policy: str = "lru",
+        protect: Optional[str] = None,
+    ) -> List[str]:
+        """
+        按淘汰策略选出需要删除的条目，使剩余条目满足容量限制
+
+        Args:
+            max_bytes: 文件总字节数上限，None 表示不限
+            max_entries: 条目数上限，None 表示不限
+            policy: "lru" 或 "lfu"
+            protect: 不参与淘汰的缓存键（如刚写入的条目，LFU 下其访问次数为 0）
+
+        Returns:
+            List[str]: 需淘汰的缓存键（按淘汰顺序）
+        """
+        count, size = self.totals()
+        excess_entries = count - max_entries if max_entries else 0
+        excess_bytes = size - max_bytes if max_bytes else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return []
+
+        victims = []
+        with self._lock, self.conn:
+            self._flush_access()
+            rows = self.conn.execute(f"SELECT cache_key, size FROM entries ORDER BY {EVICTION_ORDER[policy]}")
+            for cache_key, entry_size in rows:
+                if excess_entries <= 0 and excess_bytes <= 0:
+                    break
+                if cache_key == protect:
+                    continue
+                victims.append(cache_key)
+                excess_entries -= 1
+                excess_bytes -= entry_size or 0
+        return victims
+
+    def all_keys(self) -> List[str]:
+        """全部缓存键"""
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT cache_key FROM entries")]
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock, self.conn:
+            self._pending_access.clear()
+            self.conn.execute("DELETE FROM entries")
+
+    def import_json_metadata(self, metadata_file: Path) -> int:
+        """导入旧版 cache_metadata.json，成功后删除该文件
+
+        Returns:
+            int: 导入的条目数
+        """
+        try:
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except Exception as e:
+            logger.warning("读取旧版缓存元数据失败，已忽略: %s", e)
+            metadata_file.unlink()
+            return 0
+
+        rows = []
+        for cache_key, meta in metadata.items():
+            try:
+                created_at = time.mktime(time.strptime(meta["created_at"][:19], "%Y-%m-%dT%H:%M:%S"))
+                size = (self.path.parent / cache_key).stat().st_size
+                ttl_hours = meta.get("ttl_hours")
+                rows.append(
+                    (
+                        cache_key,
+                        meta.get("key", ""),
+                        created_at,
+                        ttl_hours,
+                        created_at + ttl_hours * 3600 if ttl_hours else None,
+                        json.dumps(meta.get("params", {}), sort_keys=True, ensure_ascii=False, default=str),
+                        size,
+                        "pickle",
+                    )
+                )
+            except Exception:
+                # 时间格式错误或缓存文件已不存在
+                continue
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO entries (cache_key, key, created_at, ttl_hours, expires_at, params, size, fmt)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+        metadata_file.unlink()
+        logger.info("已迁移旧版缓存元数据: %s 条", len(rows))
+        return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            with self.conn:
+                self._flush_access()
+            self.conn.close()
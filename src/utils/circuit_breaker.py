@@ -0,0 +1,190 @@
+"""
+数据源熔断器模块
+按数据源维护进程级熔断状态（closed/open/half-open），连续失败达到阈值后在冷却期内直接跳过该数据源，
+避免批量处理中每只股票都重复等待已失效数据源的超时与重试。
+只有异常（连接错误、HTTP 错误、超时等）计为失败；数据源正常响应但某只股票无数据（停牌、退市、
+不支持的周期）不影响熔断状态，这类按股票的无数据由负缓存记录
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.exceptions import CircuitOpenError, NoDataError
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """单个数据源的熔断器（线程安全）"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown: float = 60.0, enabled: bool = True):
+        """
+        初始化熔断器
+
+        Args:
+            name: 数据源名称
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断冷却时间（秒），到期后放行一次试探请求
+            enabled: 是否启用，False 时始终放行
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.enabled = enabled
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态（open 冷却到期后视为 half_open）"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """是否放行请求；half-open 状态只放行一个试探请求"""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """记录成功：关闭熔断并清零失败计数"""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("数据源 %s 恢复，关闭熔断", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """记录失败：连续失败达到阈值或试探失败时熔断"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                if self._state == CLOSED:
+                    logger.warning("数据源 %s 连续失败 %s 次，熔断 %.0f 秒", self.name, self._failures, self.cooldown)
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def record_empty(self) -> None:
+        """记录无数据的正常响应：不计入失败也不清零失败计数；试探请求无数据时放行下一个试探"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self) -> None:
+        """重置为关闭状态"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+
+# 全局熔断器注册表
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def _breaker_config() -> Dict[str, Any]:
+    """读取 circuit_breaker 配置"""
+    try:
+        from src.config import Config
+
+        return Config().get("circuit_breaker", {}) or {}
+    except Exception:
+        return {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    获取数据源的全局熔断器（同名数据源在整个进程内共享）
+
+    Args:
+        name: 数据源名称，如 sina、eastmoney
+
+    Returns:
+        CircuitBreaker: 熔断器实例
+    """
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                cfg = _breaker_config()
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=cfg.get("failure_threshold", 3),
+                    cooldown=cfg.get("cooldown_seconds", 60),
+                    enabled=cfg.get("enabled", True),
+                )
+                _breakers[name] = breaker
+    return breaker
+
+
+def reset_breakers() -> None:
+    """重置所有熔断器"""
+    with _breakers_lock:
+        for breaker in _breakers.values():
+            breaker.reset()
+
+
+def _is_valid(result: Any) -> bool:
+    """默认有效性判断：非 None 且非空"""
+    return result is not None and not getattr(result, "empty", False)
+
+
+def guarded_call(name: str, func: Callable[[], Any], is_valid: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    经熔断器调用数据源：有效结果记为成功，异常记为失败，
+    无数据（结果无效或抛出 NoDataError）不影响熔断状态
+
+    Args:
+        name: 数据源名称
+        func: 无参获取函数
+        is_valid: 判断结果是否有效的函数，默认非 None 且非空即有效
+
+    Returns:
+        获取函数的返回值
+
+    Raises:
+        CircuitOpenError: 数据源熔断中
+    """
+    breaker = get_breaker(name)
+    if not breaker.allow():
+        raise CircuitOpenError(f"数据源 {name} 熔断中，跳过")
+    if is_valid is None:
+        is_valid = _is_valid
+    try:
+        result = func()
+    except NoDataError:
+        breaker.record_empty()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    if is_valid(result):
+        breaker.record_success()
+    else:
+        breaker.record_empty()
+    return result
@@ -16,6 +16,18 @@ class DataFetchError(StockAnalysisError):
     pass
 
 
+class NoDataError(DataFetchError):
+    """数据源正常响应但没有数据（停牌、退市、不支持的周期等），不计入数据源熔断失败"""
+
+    pass
+
+
+class CircuitOpenError(DataFetchError):
+    """数据源熔断中，请求被直接跳过"""
+
+    pass
+
+
 class IndicatorCalculationError(StockAnalysisError):
     """指标计算错误"""
 
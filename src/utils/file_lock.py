@@ -0,0 +1,70 @@
+"""
+跨进程文件锁模块
+基于 fcntl.flock 的排他锁，同一进程内可重入（按线程串行）；
+不支持 flock 的平台（如 Windows）退化为仅进程内加锁
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+# 可选依赖：fcntl（仅类 Unix 平台）
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileLock:
+    """跨进程排他锁（线程安全、同一线程可重入）"""
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: 锁文件路径（不存在时自动创建）
+        """
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        获取锁
+
+        Args:
+            blocking: 为 False 时锁已被其他进程持有则立即返回 False
+
+        Returns:
+            bool: 是否获得锁
+        """
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0 and fcntl is not None:
+            fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except OSError:
+                os.close(fd)
+                self._thread_lock.release()
+                return False
+            self._fd = fd
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        """释放锁"""
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -0,0 +1,222 @@
+"""
+HTTP 客户端模块
+为各数据源提供共享连接池（每个 host 一个 keep-alive 连接池）、统一的请求头/超时配置，
+并经每个 host 的自适应限速器发送请求
+"""
+
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.logger import get_logger
+from src.utils.rate_limiter import THROTTLE_STATUS, get_rate_limiter
+
+logger = get_logger(__name__)
+
+_BROWSER_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+# 请求配置：数据源名称 -> 默认请求头与超时（秒），调用方传入的 headers/timeout 优先
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "headers": {"User-Agent": _BROWSER_UA},
+        "timeout": 10,
+    },
+    # 新浪财经 K 线接口（quotes.sina.cn / quotes.sina.com.cn）
+    "sina": {
+        "headers": {
+            "User-Agent": _BROWSER_UA,
+            "Referer": "https://finance.sina.com.cn",
+            "Accept": "application/json, text/plain, */*",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        },
+        "timeout": 15,
+    },
+    # 新浪财经实时行情（hq.sinajs.cn，需要 Referer）
+    "sina_quote": {
+        "headers": {
+            "User-Agent": _BROWSER_UA,
+            "Referer": "https://finance.sina.com.cn",
+            "Accept": "*/*",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        },
+        "timeout": 10,
+    },
+    # 新浪 json_v2 备用接口
+    "sina_fallback": {
+        "headers": {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"},
+        "timeout": 20,
+    },
+    "eastmoney": {
+        "headers": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Referer": "https://quote.eastmoney.com/",
+        },
+        "timeout": 15,
+    },
+    "tencent": {
+        "headers": {
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Referer": "http://stock.finance.qq.com/",
+        },
+        "timeout": 15,
+    },
+}
+
+
+class HttpClient:
+    """共享 HTTP 客户端：按 host 复用 Session 与连接池，限制每个 host 的并发请求数并自适应限速"""
+
+    def __init__(self, pool_maxsize: int = 10, max_per_host: Optional[int] = None):
+        """
+        初始化 HTTP 客户端
+
+        Args:
+            pool_maxsize: 每个 host 连接池保留的最大连接数（通常与并发数一致）
+            max_per_host: 每个 host 同时在途的最大请求数，None 表示不限制
+        """
+        self.max_per_host = max(1, int(max_per_host)) if max_per_host else None
+        # 连接池至少能容纳 host 并发上限，避免多余连接用完即弃
+        self.pool_maxsize = max(1, int(pool_maxsize), self.max_per_host or 0)
+        self._sessions: Dict[str, requests.Session] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """提取 scheme://host[:port] 作为连接池键"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _get_session(self, url: str) -> requests.Session:
+        """获取（或创建）目标 host 的 Session"""
+        host_key = self._host_key(url)
+        with self._lock:
+            session = self._sessions.get(host_key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host_key] = session
+                logger.debug("创建连接池: %s (maxsize=%s)", host_key, self.pool_maxsize)
+            return session
+
+    def _get_host_slot(self, url: str) -> Optional[threading.BoundedSemaphore]:
+        """获取目标 host 的并发信号量（未设置上限时返回 None）"""
+        if self.max_per_host is None:
+            return None
+        host_key = self._host_key(url)
+        with self._lock:
+            slot = self._host_slots.get(host_key)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host_key] = slot
+            return slot
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        profile: str = "default",
+    ) -> requests.Response:
+        """
+        发送 GET 请求
+
+        Args:
+            url: 请求地址
+            params: 查询参数
+            headers: 额外请求头（覆盖 profile 中的同名请求头）
+            timeout: 超时时间（秒），None 使用 profile 默认值
+            profile: 请求配置名称，见 PROFILES
+
+        Returns:
+            requests.Response: 响应对象
+        """
+        prof = PROFILES.get(profile, PROFILES["default"])
+        merged_headers = dict(prof["headers"])
+        if headers:
+            merged_headers.update(headers)
+        session = self._get_session(url)
+        limiter = get_rate_limiter(self._host_key(url))
+        slot = self._get_host_slot(url)
+        limiter.acquire()
+        if slot is not None:
+            slot.acquire()
+        try:
+            response = session.get(
+                url,
+                params=params,
+                headers=merged_headers,
+                timeout=timeout if timeout is not None else prof["timeout"],
+            )
+        except Exception:
+            limiter.on_throttle()
+            raise
+        finally:
+            if slot is not None:
+                slot.release()
+        if response.status_code in THROTTLE_STATUS or response.status_code >= 500:
+            limiter.on_throttle()
+        else:
+            limiter.on_success()
+        return response
+
+    def close(self):
+        """关闭所有 Session（释放连接池）"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# 全局客户端实例
+_client_instance: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    获取全局 HTTP 客户端（单例模式）
+
+    连接池大小默认跟随 parallel.max_workers，可通过 http.pool_maxsize 覆盖；
+    http.max_per_host 限制每个 host 同时在途的请求数
+
+    Returns:
+        HttpClient: 客户端实例
+    """
+    global _client_instance
+
+    if _client_instance is None:
+        with _client_lock:
+            if _client_instance is None:
+                try:
+                    from src.config import Config
+
+                    config = Config()
+                    pool_maxsize = config.get("http.pool_maxsize") or config.get("parallel.max_workers", 3)
+                    max_per_host = config.get("http.max_per_host", 8)
+                except Exception:
+                    pool_maxsize = 3
+                    max_per_host = 8
+                _client_instance = HttpClient(pool_maxsize=pool_maxsize, max_per_host=max_per_host)
+
+    return _client_instance
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    profile: str = "default",
+) -> requests.Response:
+    """通过全局客户端发送 GET 请求（参数同 HttpClient.get）"""
+    return get_http_client().get(url, params=params, headers=headers, timeout=timeout, profile=profile)
@@ -0,0 +1,135 @@
+"""
+进程内内存缓存模块
+按字节数限制容量的 LRU 缓存，位于磁盘缓存之前，同一进程内重复读取同一键时
+无需访问文件与反序列化；过期判断与磁盘缓存相同（按写入时间与读取时给定的 TTL）
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MISS = object()
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存字节数（DataFrame 按列数据计算，容器递归累加）"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value: Any) -> Any:
+    """返回可供调用方修改的副本，避免改动内存中的缓存对象"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class MemoryLRU:
+    """字节数受限的 LRU 缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int):
+        """
+        初始化内存缓存
+
+        Args:
+            max_bytes: 容量上限（字节），超过时淘汰最久未使用的条目
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, cache_key: str, max_age_seconds: float) -> Any:
+        """
+        读取条目
+
+        Args:
+            cache_key: 缓存键
+            max_age_seconds: 允许的最大存在时间（秒），超过视为过期并移除；条目带绝对过期时间时以其为准
+
+        Returns:
+            缓存值的副本，不存在或已过期时返回 MISS
+        """
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            value, created_at, _, expires_at = entry
+            now = time.time()
+            if (now >= expires_at) if expires_at is not None else (now - created_at > max_age_seconds):
+                self._pop(cache_key)
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+        return _copy(value)
+
+    def put(self, cache_key: str, value: Any, created_at: float, expires_at: Optional[float] = None) -> None:
+        """写入条目（保存副本），单个条目超过容量上限时不缓存；expires_at 为绝对过期时间戳"""
+        size = estimate_size(value)
+        with self._lock:
+            self._pop(cache_key)
+            if size > self.max_bytes:
+                return
+            self._entries[cache_key] = (_copy(value), created_at, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def created_at(self, cache_key: str) -> Optional[float]:
+        """条目的写入时间，不存在时返回 None"""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+        return entry[1] if entry is not None else None
+
+    def delete(self, cache_key: str) -> None:
+        with self._lock:
+            self._pop(cache_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _pop(self, cache_key: str) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计与占用情况"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_mb": self._bytes / (1024 * 1024),
+                "max_mb": self.max_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,154 @@
+"""
+运行指标模块
+按 (范围, 键族) 累计计数器与延迟直方图，如缓存 "cache"/"fetch_kline_data" 的命中、未命中、
+过期与读写字节数，K线获取 "fetch"/"kline:240" 各路径的耗时，数据源 "source"/"sina" 的请求延迟；
+运行中可随时查询快照，github_stock_bot.py 结束时输出汇总，用于区分慢在缓存未命中还是慢在上游
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 延迟直方图的桶上界（毫秒），最后一个桶收纳更慢的请求
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（调用方负责加锁）"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """估算分位数（毫秒）：取分位所在桶的上界，最后一个桶取最大值"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(LATENCY_BUCKETS_MS[i], self.max_ms) if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, Any]:
+        buckets = {f"<={bound}ms": n for bound, n in zip(LATENCY_BUCKETS_MS, self.counts) if n}
+        if self.counts[-1]:
+            buckets[f">{LATENCY_BUCKETS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": buckets,
+        }
+
+
+class Metrics:
+    """计数器与延迟直方图注册表（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._histograms: Dict[Tuple[str, str], Dict[str, LatencyHistogram]] = {}
+
+    def incr(self, scope: str, family: str, name: str, amount: int = 1) -> None:
+        """
+        累加计数器
+
+        Args:
+            scope: 范围（如 "cache"、"fetch"、"source"）
+            family: 键族（如缓存键名、"kline:240"、数据源名称）
+            name: 计数器名称（如 "hits"、"bytes_read"）
+            amount: 增量
+        """
+        with self._lock:
+            counters = self._counters.setdefault((scope, family), {})
+            counters[name] = counters.get(name, 0) + amount
+
+    def observe(self, scope: str, family: str, name: str, seconds: float) -> None:
+        """记录一次耗时（秒）到延迟直方图"""
+        with self._lock:
+            histograms = self._histograms.setdefault((scope, family), {})
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, scope: str, family: str, name: str) -> Iterator[None]:
+        """计时上下文：退出时（包括异常）记录耗时"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(scope, family, name, time.monotonic() - start)
+
+    def counter(self, scope: str, family: str, name: str) -> int:
+        """读取计数器当前值"""
+        with self._lock:
+            return self._counters.get((scope, family), {}).get(name, 0)
+
+    def snapshot(self, scope: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        当前指标快照
+
+        Args:
+            scope: 只返回该范围，None 返回全部
+
+        Returns:
+            Dict: {scope: {family: {"counters": {...}, "latency": {name: 直方图摘要}}}}
+        """
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            for key in sorted(set(self._counters) | set(self._histograms)):
+                if scope is not None and key[0] != scope:
+                    continue
+                result.setdefault(key[0], {})[key[1]] = {
+                    "counters": dict(self._counters.get(key, {})),
+                    "latency": {name: h.summary() for name, h in self._histograms.get(key, {}).items()},
+                }
+        return result
+
+    def format_report(self) -> str:
+        """多行文本汇总（每个键族一行计数器，每个直方图一行分位数）"""
+        lines: List[str] = []
+        for scope, families in self.snapshot().items():
+            lines.append(f"[{scope}]")
+            for family, data in families.items():
+                counters = ", ".join(f"{k}={v}" for k, v in sorted(data["counters"].items()))
+                lines.append(f"  {family}: {counters or '-'}")
+                for name, h in sorted(data["latency"].items()):
+                    lines.append(
+                        f"    {name}: n={h['count']} mean={h['mean_ms']:.1f}ms p50={h['p50_ms']:.0f}ms "
+                        f"p90={h['p90_ms']:.0f}ms p99={h['p99_ms']:.0f}ms max={h['max_ms']:.0f}ms"
+                    )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# 进程内全局指标
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """获取进程内全局指标注册表"""
+    return _metrics
@@ -0,0 +1,137 @@
+"""
+负缓存模块
+记录某数据源对某个 (代码, 周期) "无数据" 或 "请求失败"，短时间内再次请求时直接跳过该数据源，
+避免退市、停牌或数据源不支持的代码每次都走完整条降级链并逐个超时
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from src.utils.cache import DataCache, get_cache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EMPTY = "empty"
+FAILED = "failed"
+
+_PREFIX = "negative"
+
+Scale = Union[int, str]
+
+
+class NegativeCache:
+    """按 (代码, 周期, 数据源) 记录的短期负缓存，保存在数据缓存中（跨进程、跨运行共享）"""
+
+    def __init__(self, cache: DataCache, empty_ttl_minutes: float = 60, failed_ttl_minutes: float = 10):
+        """
+        Args:
+            cache: 数据缓存实例
+            empty_ttl_minutes: "无数据" 记录的有效时间（分钟）
+            failed_ttl_minutes: "请求失败" 记录的有效时间（分钟）
+        """
+        self.cache = cache
+        self.ttl_minutes = {EMPTY: empty_ttl_minutes, FAILED: failed_ttl_minutes}
+
+    @staticmethod
+    def _key(symbol: str, scale: Scale, source: str) -> str:
+        return f"{_PREFIX}:{symbol}:{scale}:{source}"
+
+    def get(self, symbol: str, scale: Scale, source: str) -> Optional[Dict[str, Any]]:
+        """
+        查询负缓存记录
+
+        Returns:
+            Dict: {"reason": "empty"/"failed", "detail": 说明, "recorded_at": 时间戳}，无记录或已过期返回 None
+        """
+        # 记录写入时带绝对过期时间，读取时传入的 TTL 不生效
+        return self.cache.get(self._key(symbol, scale, source), ttl_hours=1)
+
+    def record(self, symbol: str, scale: Scale, source: str, reason: str, detail: str = "") -> None:
+        """
+        记录数据源无数据（EMPTY）或请求失败（FAILED）
+
+        Args:
+            symbol: 股票代码
+            scale: K线周期
+            source: 数据源名称
+            reason: EMPTY 或 FAILED
+            detail: 说明（如异常信息）
+        """
+        ttl_minutes = self.ttl_minutes.get(reason, self.ttl_minutes[FAILED])
+        if not ttl_minutes:
+            return
+        now = time.time()
+        value = {"reason": reason, "detail": str(detail)[:200], "recorded_at": now}
+        self.cache.set(self._key(symbol, scale, source), value, expires_at=now + ttl_minutes * 60)
+        logger.debug("负缓存 %s %s %s: %s %s", symbol, scale, source, reason, detail)
+
+    def entries(self, symbol: str = "*", scale: Scale = "*", source: str = "*") -> List[Dict[str, Any]]:
+        """
+        列出未过期的负缓存记录（参数支持通配符）
+
+        Returns:
+            List[Dict]: 每条含 symbol/scale/source/reason/detail/recorded_at/expires_at
+        """
+        now = time.time()
+        result = []
+        for entry in self.cache.index.entries(self._key(symbol, scale, source)):
+            if entry["expires_at"] is not None and entry["expires_at"] <= now:
+                continue
+            _, sym, scl, src = entry["key"].split(":", 3)
+            value = self.get(sym, scl, src) or {}
+            result.append(
+                {
+                    "symbol": sym,
+                    "scale": scl,
+                    "source": src,
+                    "reason": value.get("reason"),
+                    "detail": value.get("detail", ""),
+                    "recorded_at": entry["created_at"],
+                    "expires_at": entry["expires_at"],
+                }
+            )
+        return result
+
+    def clear(self, symbol: str = "*", scale: Scale = "*", source: str = "*") -> int:
+        """
+        清除负缓存记录（参数支持通配符，默认全部）
+
+        Returns:
+            int: 清除的条数
+        """
+        pattern = self._key(symbol, scale, source)
+        count = len(self.cache.index.match(pattern))
+        self.cache.clear(pattern)
+        return count
+
+
+_negative_cache: Optional[NegativeCache] = None
+
+
+def get_negative_cache() -> Optional[NegativeCache]:
+    """
+    获取全局负缓存（单例模式）
+
+    Returns:
+        NegativeCache: 负缓存实例，缓存禁用或 negative_cache.enabled 为 false 时返回 None
+    """
+    global _negative_cache
+    if _negative_cache is None:
+        cache = get_cache()
+        if cache is None:
+            return None
+        try:
+            from src.config import Config
+
+            config = Config().get("negative_cache", {}) or {}
+        except Exception:
+            config = {}
+        if not config.get("enabled", True):
+            return None
+        _negative_cache = NegativeCache(
+            cache,
+            empty_ttl_minutes=config.get("empty_ttl_minutes", 60),
+            failed_ttl_minutes=config.get("failed_ttl_minutes", 10),
+        )
+    return _negative_cache
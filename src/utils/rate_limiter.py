@@ -0,0 +1,143 @@
+"""
+自适应限速模块
+按上游 host 维护令牌桶，速率按 AIMD 调整：请求成功时线性提高，遇到限流或错误时成倍降低，
+使各数据源以其可承受的最快速度运行，取代固定 sleep
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 视为限流的 HTTP 状态码（456 为新浪封禁时的返回码）
+THROTTLE_STATUS = frozenset({403, 429, 456, 503})
+
+
+class AdaptiveRateLimiter:
+    """AIMD 令牌桶限速器（线程安全）"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        burst: float = 5.0,
+        increase_step: float = 0.2,
+        decrease_factor: float = 0.5,
+        enabled: bool = True,
+    ):
+        """
+        初始化限速器
+
+        Args:
+            name: 名称（通常为 scheme://host）
+            rate: 初始速率（请求/秒）
+            min_rate: 速率下限
+            max_rate: 速率上限
+            burst: 令牌桶容量（允许的突发请求数）
+            increase_step: 每次成功请求速率增加量（加性增）
+            decrease_factor: 限流或错误时速率乘以该系数（乘性减）
+            enabled: 是否启用，False 时 acquire 立即返回
+        """
+        self.name = name
+        self.min_rate = max(0.01, float(min_rate))
+        self.max_rate = max(self.min_rate, float(max_rate))
+        self.rate = min(self.max_rate, max(self.min_rate, float(rate)))
+        self.burst = max(1.0, float(burst))
+        self.increase_step = float(increase_step)
+        self.decrease_factor = min(1.0, max(0.01, float(decrease_factor)))
+        self.enabled = enabled
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """按当前速率补充令牌（调用方持有 _lock）"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """
+        获取一个令牌，不足时等待（预占令牌，等待在锁外进行，先到先得）
+
+        Returns:
+            float: 实际等待时间（秒）
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self) -> None:
+        """请求成功：速率加性增"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        """遇到限流或错误：速率乘性减并清空令牌（同一时刻的并发失败只降一次）"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < 1.0 / self.rate:
+                return
+            self._refill(now)
+            old_rate = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_decrease = now
+        logger.info("%s 限流/错误，速率 %.2f → %.2f 次/秒", self.name, old_rate, self.rate)
+
+
+# 全局限速器注册表（按 host）
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _rate_limit_config() -> Dict[str, Any]:
+    """读取 rate_limit 配置"""
+    try:
+        from src.config import Config
+
+        return Config().get("rate_limit", {}) or {}
+    except Exception:
+        return {}
+
+
+def get_rate_limiter(host: str, config: Optional[Dict[str, Any]] = None) -> AdaptiveRateLimiter:
+    """
+    获取上游 host 的全局限速器（同一 host 的所有请求共享）
+
+    Args:
+        host: 上游标识，如 https://quotes.sina.cn 或 akshare
+        config: 覆盖 rate_limit 配置（仅首次创建时生效）
+
+    Returns:
+        AdaptiveRateLimiter: 限速器实例
+    """
+    limiter = _limiters.get(host)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                cfg = config if config is not None else _rate_limit_config()
+                limiter = AdaptiveRateLimiter(
+                    host,
+                    rate=cfg.get("initial_rate", 5.0),
+                    min_rate=cfg.get("min_rate", 0.5),
+                    max_rate=cfg.get("max_rate", 50.0),
+                    burst=cfg.get("burst", 5),
+                    increase_step=cfg.get("increase_step", 0.2),
+                    decrease_factor=cfg.get("decrease_factor", 0.5),
+                    enabled=cfg.get("enabled", True),
+                )
+                _limiters[host] = limiter
+    return limiter
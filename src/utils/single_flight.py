@@ -0,0 +1,111 @@
+"""
+请求合并（single-flight）模块
+同一时刻参数相同的调用只执行一次，其余并发调用等待并共享其结果（或异常）
+"""
+
+import inspect
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _Call:
+    """一次在途调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.owner = threading.get_ident()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """按 key 合并并发调用（线程安全）"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        执行 fn；若相同 key 的调用已在途，则等待其完成并返回同一结果
+
+        Args:
+            key: 调用标识
+            fn: 无参函数
+
+        Returns:
+            fn 的返回值（异常同样共享给所有等待者）
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+            elif call.owner == threading.get_ident():
+                # 同一线程内的重入调用直接执行，避免等待自身
+                call = None
+                leader = False
+            else:
+                call.followers += 1
+                leader = False
+
+        if call is None:
+            return fn()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            if call.followers:
+                logger.debug("合并了 %s 个相同的并发请求: %s", call.followers, key)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """当前在途调用数"""
+        with self._lock:
+            return len(self._calls)
+
+
+_group = SingleFlight()
+
+
+def single_flight(func: F) -> F:
+    """
+    装饰器：参数相同（含默认值）的并发调用共享一次执行结果
+
+    参数不可哈希时不做合并，直接调用。调用方共享同一个返回对象，不应原地修改。
+    """
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (func.__module__, func.__qualname__, tuple(bound.arguments.items()))
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        return _group.do(key, lambda: func(*args, **kwargs))
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,317 @@
+"""
+数据源延迟统计与对冲请求模块
+按数据源记录滚动延迟与成功率，据此排序降级链；首选数据源超过其近期 p90 延迟仍未返回时，
+并行发起下一个数据源，取最先返回的有效结果
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.circuit_breaker import OPEN, get_breaker, guarded_call
+from src.utils.exceptions import CircuitOpenError, NoDataError
+from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+
+logger = get_logger(__name__)
+
+SourceCandidate = Tuple[str, Callable[[], Any]]
+
+
+def _is_valid(result: Any) -> bool:
+    """结果是否有效（非 None，且 DataFrame 等对象非空）"""
+    if result is None:
+        return False
+    return not getattr(result, "empty", False)
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    """简单百分位数（最近秩法）"""
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, math.ceil(pct * len(ordered)) - 1))
+    return ordered[idx]
+
+
+class SourceStats:
+    """数据源滚动延迟与成功率表（线程安全）"""
+
+    def __init__(self, window: int = 50, min_samples: int = 3, default_delay: float = 3.0, min_delay: float = 0.3):
+        """
+        初始化统计表
+
+        Args:
+            window: 每个数据源保留的最近样本数
+            min_samples: 计算 p90 所需的最少成功样本数，不足时使用 default_delay
+            default_delay: 无足够样本时的对冲等待时间（秒）
+            min_delay: 对冲等待时间下限（秒），避免对极快的数据源过早对冲
+        """
+        self.window = max(1, int(window))
+        self.min_samples = max(1, int(min_samples))
+        self.default_delay = float(default_delay)
+        self.min_delay = float(min_delay)
+        self._samples: Dict[str, Deque[Tuple[float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, source: str, latency: float, ok: bool) -> None:
+        """记录一次请求结果"""
+        with self._lock:
+            samples = self._samples.get(source)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[source] = samples
+            samples.append((float(latency), bool(ok)))
+
+    def success_rate(self, source: str) -> Optional[float]:
+        """成功率，无样本时返回 None"""
+        with self._lock:
+            samples = list(self._samples.get(source, ()))
+        if not samples:
+            return None
+        return sum(1 for _, ok in samples if ok) / len(samples)
+
+    def latency(self, source: str, pct: float = 0.9) -> Optional[float]:
+        """成功请求的延迟百分位数（秒），样本不足时返回 None"""
+        with self._lock:
+            latencies = [lat for lat, ok in self._samples.get(source, ()) if ok]
+        if len(latencies) < self.min_samples:
+            return None
+        return _percentile(latencies, pct)
+
+    def hedge_delay(self, source: str) -> float:
+        """对冲等待时间：近期 p90 延迟，样本不足时为 default_delay"""
+        p90 = self.latency(source, 0.9)
+        if p90 is None:
+            return self.default_delay
+        return max(self.min_delay, p90)
+
+    def _score(self, source: str) -> float:
+        """期望耗时评分（越小越优先）：中位延迟 / 成功率"""
+        rate = self.success_rate(source)
+        if rate is None:
+            # 无样本：按默认等待时间估计，保持与其他未知数据源的原有顺序
+            return self.default_delay
+        p50 = self.latency(source, 0.5)
+        if p50 is None:
+            p50 = self.default_delay
+        return p50 / max(rate, 0.05)
+
+    def rank(self, sources: Sequence[str]) -> List[str]:
+        """按期望耗时排序数据源（稳定排序，评分相同时保持原有顺序）"""
+        return sorted(sources, key=self._score)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """各数据源统计快照（用于日志与调试）"""
+        with self._lock:
+            names = list(self._samples)
+        return {
+            name: {
+                "samples": len(self._samples.get(name, ())),
+                "success_rate": self.success_rate(name),
+                "p50": self.latency(name, 0.5),
+                "p90": self.latency(name, 0.9),
+            }
+            for name in names
+        }
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._samples.clear()
+
+
+# 全局实例
+_stats_instance: Optional[SourceStats] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_global_lock = threading.Lock()
+
+
+def _sources_config(key: str, default: Any) -> Any:
+    """读取 sources.* 配置"""
+    try:
+        from src.config import Config
+
+        value = Config().get(f"sources.{key}", default)
+        return default if value is None else value
+    except Exception:
+        return default
+
+
+def get_source_stats() -> SourceStats:
+    """
+    获取全局数据源统计表（单例模式）
+
+    Returns:
+        SourceStats: 统计表实例
+    """
+    global _stats_instance
+
+    if _stats_instance is None:
+        with _global_lock:
+            if _stats_instance is None:
+                _stats_instance = SourceStats(
+                    window=_sources_config("latency_window", 50),
+                    default_delay=_sources_config("hedge_default_delay", 3.0),
+                    min_delay=_sources_config("hedge_min_delay", 0.3),
+                )
+    return _stats_instance
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """对冲请求共享线程池"""
+    global _executor
+
+    if _executor is None:
+        with _global_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(_sources_config("hedge_max_workers", 32)), thread_name_prefix="source-hedge"
+                )
+    return _executor
+
+
+def _timed_call(
+    stats: SourceStats, name: str, func: Callable[[], Any], negative_key: Optional[Tuple[str, Any]] = None
+) -> Any:
+    """经熔断器调用数据源并记录延迟与成功与否（异常视为失败并向上抛出，熔断跳过的请求不计入统计）
+
+    给定 negative_key=(代码, 周期) 时，无数据记入负缓存（请求失败由熔断器处理，不按代码记录）。
+    """
+    start = time.monotonic()
+    ok = False
+    skipped = False
+    error: Optional[BaseException] = None
+    try:
+        result = guarded_call(name, func, is_valid=_is_valid)
+        ok = _is_valid(result)
+        return result
+    except CircuitOpenError:
+        skipped = True
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if not skipped:
+            elapsed = time.monotonic() - start
+            stats.record(name, elapsed, ok)
+            metrics = get_metrics()
+            metrics.observe("source", name, "latency", elapsed)
+            metrics.incr("source", name, "ok" if ok else "failed")
+            if negative_key is not None and not ok and (error is None or isinstance(error, NoDataError)):
+                _record_empty(negative_key, name, error)
+
+
+def _record_empty(negative_key: Tuple[str, Any], name: str, error: Optional[BaseException]) -> None:
+    from src.utils.negative_cache import EMPTY, get_negative_cache
+
+    negative = get_negative_cache()
+    if negative is not None:
+        symbol, scale = negative_key
+        negative.record(symbol, scale, name, EMPTY, detail=error or "")
+
+
+def _negative_sources(negative_key: Optional[Tuple[str, Any]], names: Sequence[str]) -> set:
+    """负缓存中记录为无数据/失败的数据源"""
+    if negative_key is None:
+        return set()
+    from src.utils.negative_cache import get_negative_cache
+
+    negative = get_negative_cache()
+    if negative is None:
+        return set()
+    symbol, scale = negative_key
+    return {name for name in names if negative.get(symbol, scale, name) is not None}
+
+
+def fetch_ranked(
+    candidates: Sequence[SourceCandidate],
+    stats: Optional[SourceStats] = None,
+    hedge: Optional[bool] = None,
+    negative_key: Optional[Tuple[str, Any]] = None,
+    record_negative: bool = True,
+) -> Tuple[Optional[str], Any]:
+    """
+    按延迟/成功率排序依次尝试数据源，支持对冲请求
+
+    启用对冲时，当前数据源超过其 p90 延迟仍未返回则并行发起下一个数据源，
+    失败的数据源立即由下一个补上，取最先返回的有效结果；未被采用的请求在后台完成，仅计入统计。
+    每个数据源经进程级熔断器调用，熔断中的数据源直接跳过；
+    给定 negative_key 时，负缓存中近期对该代码无数据的数据源同样跳过。
+
+    Args:
+        candidates: (数据源名称, 无参获取函数) 列表，列表顺序为无统计数据时的默认优先级
+        stats: 统计表，None 使用全局实例
+        hedge: 是否启用对冲，None 使用 sources.hedge_enabled 配置
+        negative_key: (代码, 周期)，给定时跳过负缓存中记录为无数据的数据源，并记录本次无数据的数据源
+        record_negative: False 时只按负缓存跳过、不记录（如增量请求：窗口很小，无数据不代表完整请求也无数据）
+
+    Returns:
+        Tuple[数据源名称, 结果]: 全部失败时返回 (None, None)
+    """
+    if not candidates:
+        return None, None
+    if stats is None:
+        stats = get_source_stats()
+    if hedge is None:
+        hedge = bool(_sources_config("hedge_enabled", True))
+
+    funcs = dict(candidates)
+    # 熔断中的数据源直接跳过（冷却到期的 half-open 数据源保留，由熔断器放行一次试探）
+    order = [name for name in stats.rank(list(funcs)) if get_breaker(name).state != OPEN]
+    skipped = _negative_sources(negative_key, order)
+    record_key = negative_key if record_negative else None
+    if skipped:
+        logger.debug("负缓存跳过数据源 %s: %s", negative_key, ", ".join(sorted(skipped)))
+        order = [name for name in order if name not in skipped]
+    if not order:
+        logger.debug("所有数据源均在熔断中或无数据: %s", ", ".join(funcs))
+        return None, None
+
+    if not hedge or len(order) == 1:
+        for name in order:
+            try:
+                result = _timed_call(stats, name, funcs[name], record_key)
+            except Exception as e:
+                logger.debug("数据源 %s 失败: %s", name, e)
+                continue
+            if _is_valid(result):
+                return name, result
+        return None, None
+
+    executor = _get_executor()
+    pending: Dict[Future, str] = {}
+    remaining = list(order)
+
+    def _launch() -> None:
+        name = remaining.pop(0)
+        pending[executor.submit(_timed_call, stats, name, funcs[name], record_key)] = name
+
+    _launch()
+    while pending:
+        # 最近发起的数据源的 p90 作为等待时间；没有后备数据源时一直等到有结果
+        newest = list(pending.values())[-1]
+        timeout = stats.hedge_delay(newest) if remaining else None
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done:
+            logger.debug("数据源 %s 超过 %.2fs 未返回，对冲请求 %s", newest, timeout, remaining[0])
+            _launch()
+            continue
+
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.debug("数据源 %s 失败: %s", name, e)
+                continue
+            if _is_valid(result):
+                return name, result
+        # 已完成的都失败：立即由下一个数据源补上
+        if remaining:
+            _launch()
+
+    return None, None
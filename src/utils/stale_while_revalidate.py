@@ -0,0 +1,145 @@
+"""
+后台刷新（stale-while-revalidate）模块
+缓存条目超过新鲜期后，在最大陈旧时间内仍立即返回旧值，同时在后台线程刷新；
+超过最大陈旧时间才同步获取，调用方（如正在生成的报告）不再等待数据源
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Set
+
+import pandas as pd
+
+from src.utils.cache import DataCache, get_cache
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_refreshing: Set[Hashable] = set()
+_lock = threading.Lock()
+
+
+def _max_stale_hours() -> float:
+    """最大陈旧时间（cache.max_stale_hours）"""
+    try:
+        from src.config import Config
+
+        return float(Config().get("cache.max_stale_hours", 24))
+    except Exception:
+        return 24.0
+
+
+def _has_value(value: Any) -> bool:
+    """获取结果是否值得缓存（None 与空容器视为获取失败）"""
+    if value is None:
+        return False
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return not value.empty
+    if isinstance(value, (dict, list, tuple)):
+        return len(value) > 0
+    return True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+        return _executor
+
+
+def _refresh(cache: DataCache, key: str, loader: Callable[[], Any], store_ttl_hours: float, kwargs: dict) -> None:
+    """后台刷新一次；失败时保留旧值"""
+    flight = (key, tuple(sorted(kwargs.items())))
+    try:
+        value = loader()
+        if _has_value(value):
+            cache.set(key, value, ttl_hours=store_ttl_hours, **kwargs)
+            logger.debug("后台刷新完成: %s %s", key, kwargs)
+        else:
+            logger.warning("后台刷新未获取到数据，继续使用旧值: %s %s", key, kwargs)
+    except Exception as e:
+        logger.warning("后台刷新失败，继续使用旧值: %s %s: %s", key, kwargs, e)
+    finally:
+        with _lock:
+            _refreshing.discard(flight)
+
+
+def _schedule_refresh(cache: DataCache, key: str, loader: Callable[[], Any], store_ttl_hours: float, kwargs: dict):
+    """提交后台刷新；同一条目已在刷新中时不重复提交"""
+    flight = (key, tuple(sorted(kwargs.items())))
+    with _lock:
+        if flight in _refreshing:
+            return
+        _refreshing.add(flight)
+    _get_executor().submit(_refresh, cache, key, loader, store_ttl_hours, kwargs)
+
+
+def get_or_revalidate(
+    key: str,
+    loader: Callable[[], Any],
+    ttl_hours: float,
+    max_stale_hours: Optional[float] = None,
+    cache: Optional[DataCache] = None,
+    **kwargs,
+) -> Any:
+    """
+    带后台刷新的缓存读取
+
+    Args:
+        key: 缓存键名
+        loader: 获取新值的无参函数（不经缓存），返回 None 或空容器视为失败、不写入缓存
+        ttl_hours: 新鲜期（小时），期内直接返回缓存
+        max_stale_hours: 超过新鲜期后仍可返回旧值并后台刷新的时长（小时），
+            None 使用 cache.max_stale_hours 配置，0 表示不返回旧值
+        cache: 缓存实例，默认全局缓存（缓存禁用时直接调用 loader）
+        **kwargs: 额外的参数（用于区分不同的请求）
+
+    Returns:
+        缓存值或 loader 的返回值
+    """
+    cache = cache if cache is not None else get_cache()
+    if cache is None:
+        return loader()
+
+    max_stale = _max_stale_hours() if max_stale_hours is None else max_stale_hours
+    # 条目保留到新鲜期加最大陈旧时间，新鲜与否按写入时间判断
+    store_ttl_hours = ttl_hours + max_stale
+    value, created_at = cache.get_with_age(key, ttl_hours=store_ttl_hours, **kwargs)
+    if value is not None:
+        if created_at is not None and time.time() - created_at <= ttl_hours * 3600:
+            return value
+        logger.debug("缓存已过新鲜期，返回旧值并后台刷新: %s %s", key, kwargs)
+        _schedule_refresh(cache, key, loader, store_ttl_hours, kwargs)
+        return value
+
+    value = loader()
+    if _has_value(value):
+        cache.set(key, value, ttl_hours=store_ttl_hours, **kwargs)
+    return value
+
+
+def refreshes_in_flight() -> int:
+    """正在进行的后台刷新数"""
+    with _lock:
+        return len(_refreshing)
+
+
+def wait_for_refreshes(timeout: Optional[float] = None) -> bool:
+    """
+    等待后台刷新全部完成（如预热任务退出前）
+
+    Args:
+        timeout: 最长等待时间（秒），None 表示一直等待
+
+    Returns:
+        bool: 是否已全部完成
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while refreshes_in_flight():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
@@ -0,0 +1,303 @@
+"""
+交易日历模块
+A股、港股交易日历持久化到本地磁盘，每天最多刷新一次并缓存在进程内，
+提供 O(1) 的交易日判断以及开盘/收盘时间查询
+"""
+
+import bisect
+import json
+import threading
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 可选依赖：akshare
+try:
+    import akshare as ak
+except Exception:
+    ak = None
+
+# 各市场交易时段（北京时间/香港时间，同为 UTC+8）
+SESSIONS: Dict[str, List[Tuple[time, time]]] = {
+    "A": [(time(9, 30), time(11, 30)), (time(13, 0), time(15, 0))],
+    "HK": [(time(9, 30), time(12, 0)), (time(13, 0), time(16, 0))],
+}
+
+
+def _now() -> datetime:
+    """当前北京时间（不带时区）"""
+    try:
+        from zoneinfo import ZoneInfo
+
+        return datetime.now(ZoneInfo("Asia/Shanghai")).replace(tzinfo=None)
+    except Exception:
+        return datetime.now()
+
+
+def to_timestamp(dt: datetime) -> float:
+    """北京时间（不带时区）转为 Unix 时间戳"""
+    try:
+        from zoneinfo import ZoneInfo
+
+        return dt.replace(tzinfo=ZoneInfo("Asia/Shanghai")).timestamp()
+    except Exception:
+        return dt.timestamp()
+
+
+def _load_a_share_dates() -> List[date]:
+    """A股交易日：新浪交易日历（含当年未来交易日），失败时退回上证指数日线"""
+    if ak is None:
+        raise RuntimeError("akshare 未安装")
+    try:
+        df = ak.tool_trade_date_hist_sina()
+        if df is not None and not df.empty:
+            return [d.date() for d in pd.to_datetime(df["trade_date"])]
+    except Exception as e:
+        logger.debug("新浪交易日历获取失败，改用上证指数日线: %s", e)
+    df = ak.stock_zh_index_daily(symbol="sh000001")
+    return [d.date() for d in pd.to_datetime(df["date"])]
+
+
+def _load_hk_dates() -> List[date]:
+    """港股交易日：恒生指数日线（仅含历史交易日）"""
+    if ak is None:
+        raise RuntimeError("akshare 未安装")
+    df = ak.stock_hk_index_daily_sina(symbol="HSI")
+    return [d.date() for d in pd.to_datetime(df["date"])]
+
+
+_LOADERS: Dict[str, Callable[[], List[date]]] = {"A": _load_a_share_dates, "HK": _load_hk_dates}
+
+
+class TradingCalendar:
+    """单个市场的交易日历（线程安全）
+
+    已知日期范围内按日历判断；范围之外（如港股尚未发生的日期）按工作日估计。
+    """
+
+    def __init__(self, market: str, cache_dir: str = "data/calendar", loader: Optional[Callable] = None):
+        """
+        初始化交易日历
+
+        Args:
+            market: 市场，"A" 或 "HK"
+            cache_dir: 日历文件目录
+            loader: 获取交易日列表的函数，默认按市场选择
+        """
+        self.market = market
+        self.path = Path(cache_dir) / f"{market}.json"
+        self._loader = loader or _LOADERS[market]
+        self._dates: set = set()
+        self._sorted: List[date] = []
+        self._checked_on: Optional[date] = None
+        self._lock = threading.Lock()
+
+    def _set_dates(self, dates) -> None:
+        self._sorted = sorted(set(dates))
+        self._dates = set(self._sorted)
+
+    def _read_file(self) -> Optional[date]:
+        """读取磁盘日历，返回其刷新日期"""
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+            self._set_dates(date.fromisoformat(d) for d in payload.get("dates", []))
+            return date.fromisoformat(payload["updated"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("读取交易日历失败 %s: %s", self.path, e)
+            return None
+
+    def _write_file(self, today: date) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            payload = {"updated": today.isoformat(), "dates": [d.isoformat() for d in self._sorted]}
+            tmp.write_text(json.dumps(payload), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.warning("保存交易日历失败 %s: %s", self.path, e)
+
+    def _ensure_fresh(self) -> None:
+        """确保日历为今日版本：进程内每天检查一次，磁盘文件过期才重新下载"""
+        today = _now().date()
+        if self._checked_on == today:
+            return
+        with self._lock:
+            if self._checked_on == today:
+                return
+            updated = self._read_file()
+            if updated != today:
+                try:
+                    dates = self._loader()
+                    if dates:
+                        self._set_dates(dates)
+                        self._write_file(today)
+                        logger.debug("交易日历已刷新 %s: %s 个交易日", self.market, len(self._sorted))
+                except Exception as e:
+                    # 获取失败时沿用磁盘中的旧日历（或按工作日估计），当天不再重试
+                    logger.warning("交易日历刷新失败 %s: %s", self.market, e)
+            self._checked_on = today
+
+    def refresh(self) -> None:
+        """强制重新下载日历"""
+        with self._lock:
+            self._checked_on = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+        self._ensure_fresh()
+
+    def _in_range(self, day: date) -> bool:
+        return bool(self._sorted) and self._sorted[0] <= day <= self._sorted[-1]
+
+    def is_trading_day(self, day: Optional[date] = None) -> bool:
+        """是否为交易日（默认今天）"""
+        self._ensure_fresh()
+        day = day or _now().date()
+        if isinstance(day, datetime):
+            day = day.date()
+        if self._in_range(day):
+            return day in self._dates
+        return day.weekday() < 5
+
+    def previous_trading_day(self, day: Optional[date] = None) -> date:
+        """严格早于 day 的最近一个交易日"""
+        self._ensure_fresh()
+        day = day or _now().date()
+        if self._sorted and self._sorted[0] < day <= self._sorted[-1] + timedelta(days=1):
+            return self._sorted[bisect.bisect_left(self._sorted, day) - 1]
+        prev = day - timedelta(days=1)
+        while not self.is_trading_day(prev):
+            prev -= timedelta(days=1)
+        return prev
+
+    def next_trading_day(self, day: Optional[date] = None) -> date:
+        """严格晚于 day 的下一个交易日"""
+        self._ensure_fresh()
+        day = day or _now().date()
+        if self._sorted and self._sorted[0] <= day < self._sorted[-1]:
+            return self._sorted[bisect.bisect_right(self._sorted, day)]
+        nxt = day + timedelta(days=1)
+        while not self.is_trading_day(nxt):
+            nxt += timedelta(days=1)
+        return nxt
+
+    def session_open(self, day: Optional[date] = None) -> Optional[datetime]:
+        """交易日开盘时间，非交易日返回 None"""
+        day = day or _now().date()
+        if not self.is_trading_day(day):
+            return None
+        return datetime.combine(day, SESSIONS[self.market][0][0])
+
+    def session_close(self, day: Optional[date] = None) -> Optional[datetime]:
+        """交易日收盘时间，非交易日返回 None"""
+        day = day or _now().date()
+        if not self.is_trading_day(day):
+            return None
+        return datetime.combine(day, SESSIONS[self.market][-1][1])
+
+    def next_session_open(self, now: Optional[datetime] = None) -> datetime:
+        """now 之后（含当前时刻）的下一次开盘时间"""
+        now = now or _now()
+        today_open = self.session_open(now.date())
+        if today_open is not None and now <= today_open:
+            return today_open
+        return datetime.combine(self.next_trading_day(now.date()), SESSIONS[self.market][0][0])
+
+    def last_session_day(self, now: Optional[datetime] = None) -> date:
+        """最近一个已开盘的交易日（今天开盘前为上一交易日），其日线应已出现在行情数据中"""
+        now = now or _now()
+        today_open = self.session_open(now.date())
+        if today_open is not None and now >= today_open:
+            return now.date()
+        return self.previous_trading_day(now.date())
+
+    def bar_closes(self, day: date, scale: int) -> List[datetime]:
+        """
+        交易日内各根 K 线的收盘时间
+
+        Args:
+            day: 日期
+            scale: K线周期（分钟），240 及以上按日线处理
+
+        Returns:
+            List[datetime]: 按时间排序的收盘时间，非交易日为空
+        """
+        if not self.is_trading_day(day):
+            return []
+        if scale >= 240:
+            return [datetime.combine(day, SESSIONS[self.market][-1][1])]
+        closes = []
+        step = timedelta(minutes=scale)
+        for start, end in SESSIONS[self.market]:
+            close = datetime.combine(day, start) + step
+            session_end = datetime.combine(day, end)
+            while close < session_end:
+                closes.append(close)
+                close += step
+            closes.append(session_end)
+        return closes
+
+    def next_bar_close(self, scale: int, now: Optional[datetime] = None, settle: timedelta = timedelta(0)) -> datetime:
+        """
+        now 之后下一根 K 线的收盘时间：此前获取的数据在该时刻之前不会出现新的已收盘 K 线
+
+        Args:
+            scale: K线周期（分钟）
+            now: 当前时间，默认北京时间
+            settle: 收盘后数据源完成更新所需时间；收盘后 settle 内仍视为该根 K 线未完成
+
+        Returns:
+            datetime: 收盘时间（非交易时段为下一交易日第一根 K 线的收盘时间）
+        """
+        now = now or _now()
+        for close in self.bar_closes(now.date(), scale):
+            if close + settle > now:
+                return close
+        return self.bar_closes(self.next_trading_day(now.date()), scale)[0]
+
+    def is_trading_time(self, now: Optional[datetime] = None) -> bool:
+        """当前是否处于连续交易时段内"""
+        now = now or _now()
+        if not self.is_trading_day(now.date()):
+            return False
+        return any(start <= now.time() <= end for start, end in SESSIONS[self.market])
+
+
+# 进程内日历实例
+_calendars: Dict[str, TradingCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_trading_calendar(market: str = "A") -> TradingCalendar:
+    """
+    获取市场交易日历（单例模式）
+
+    Args:
+        market: "A"（A股）或 "HK"（港股）
+
+    Returns:
+        TradingCalendar: 日历实例
+    """
+    calendar = _calendars.get(market)
+    if calendar is None:
+        with _calendars_lock:
+            calendar = _calendars.get(market)
+            if calendar is None:
+                try:
+                    from src.config import Config
+
+                    cache_dir = Config().get("trading_calendar.dir", "data/calendar")
+                except Exception:
+                    cache_dir = "data/calendar"
+                calendar = TradingCalendar(market, cache_dir=cache_dir)
+                _calendars[market] = calendar
+    return calendar
@@ -1,16 +1,9 @@
 """
 交易时间检查模块
-检查A股和港股是否为交易日
+检查A股和港股是否为交易日（基于本地持久化的交易日历，见 trading_calendar）
 """
 
-from datetime import datetime
-import pandas as pd
-
-# 可选依赖：akshare
-try:
-    import akshare as ak
-except Exception:
-    ak = None
+from src.utils.trading_calendar import get_trading_calendar
 
 
 def is_china_stock_market_open() -> bool:
@@ -20,26 +13,7 @@ def is_china_stock_market_open() -> bool:
     Returns:
         bool: True表示今日是交易日，False表示休市
     """
-    try:
-        if ak is None:
-            print("⚠️  akshare 未安装，跳过交易日检查")
-            return True
-        # 获取上证指数最新行情
-        df = ak.stock_zh_index_daily(symbol="sh000001")
-        if df is None or df.empty:
-            return True  # 接口故障时默认运行，防止漏发
-
-        # 比较最后交易日与系统今日日期
-        last_trade_date = pd.to_datetime(df.iloc[-1]["date"]).date()
-        today = datetime.now().date()
-
-        # 如果上证最后交易日期不是今天，说明今天休市
-        if last_trade_date != today:
-            return False
-        return True
-    except Exception as e:
-        print(f"⚠️ 交易日检查异常: {e}")
-        return True
+    return get_trading_calendar("A").is_trading_day()
 
 
 def is_hk_stock_market_open() -> bool:
@@ -49,21 +23,4 @@ def is_hk_stock_market_open() -> bool:
     Returns:
         bool: True表示今日是交易日，False表示休市
     """
-    try:
-        if ak is None:
-            print("⚠️  akshare 未安装，跳过港股交易日检查")
-            return True
-        # 使用恒生指数判断港股交易日
-        df = ak.stock_hk_index_daily_sina(symbol="HSI")
-        if df is None or df.empty:
-            return True
-
-        last_trade_date = pd.to_datetime(df.iloc[-1]["date"]).date()
-        today = datetime.now().date()
-
-        if last_trade_date != today:
-            return False
-        return True
-    except Exception as e:
-        print(f"⚠️ 港股交易日检查异常: {e}")
-        return True
+    return get_trading_calendar("HK").is_trading_day()
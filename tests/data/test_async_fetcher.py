@@ -0,0 +1,104 @@
+"""
+测试异步K线批量获取
+"""
+
+import asyncio
+import threading
+import time
+
+import pandas as pd
+
+from src.data.fetchers import fetch_kline_many, fetch_kline_many_async
+from src.data.fetchers.async_fetcher import _get_executor
+from src.utils.exceptions import DataFetchError
+
+
+def _fake_fetch(symbol, scale, datalen):
+    """模拟耗时 0.2 秒的单次K线请求"""
+    time.sleep(0.2)
+    return pd.DataFrame({"Close": [float(scale)] * datalen})
+
+
+class TestFetchKlineMany:
+    """批量获取测试类"""
+
+    def test_results_keyed_by_request(self):
+        """结果按 (symbol, scale, datalen) 返回，与单次调用一致"""
+        reqs = [("sh600460", 240, 5), ("sh600460", 30, 3), ("sz300474", 5, 2)]
+        results = fetch_kline_many(reqs, fetch_func=_fake_fetch)
+
+        assert set(results) == set(reqs)
+        for req in reqs:
+            pd.testing.assert_frame_equal(results[req], _fake_fetch(*req))
+
+    def test_requests_in_flight_concurrently(self):
+        """所有请求同时在途：总耗时约等于最慢的单个请求"""
+        reqs = [(f"sh60000{i}", scale, 2) for i in range(3) for scale in (240, 30, 5, 1)]
+        start = time.time()
+        results = fetch_kline_many(reqs, max_concurrency=len(reqs), fetch_func=_fake_fetch)
+        elapsed = time.time() - start
+
+        assert len(results) == 12
+        assert elapsed < 1.0
+
+    def test_duplicate_requests_fetched_once(self):
+        """重复请求只获取一次"""
+        calls = []
+        lock = threading.Lock()
+
+        def counting_fetch(symbol, scale, datalen):
+            with lock:
+                calls.append((symbol, scale, datalen))
+            return pd.DataFrame({"Close": [1.0]})
+
+        fetch_kline_many([("sh600460", 240, 10)] * 3, fetch_func=counting_fetch)
+        assert calls == [("sh600460", 240, 10)]
+
+    def test_shared_executor_and_per_call_limit(self):
+        """各次调用复用同一线程池；max_concurrency 限制单次调用的并发"""
+        threads = set()
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def tracking_fetch(symbol, scale, datalen):
+            with lock:
+                threads.add(threading.current_thread())
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return pd.DataFrame({"Close": [1.0]})
+
+        pool_size = _get_executor()._max_workers
+        reqs = [(f"sh60000{i}", 240, 2) for i in range(4)]
+        for _ in range(pool_size):
+            fetch_kline_many(reqs, max_concurrency=2, fetch_func=tracking_fetch)
+
+        assert max(peak) <= 2
+        # 每次调用新建线程池时会用到 2 * pool_size 个线程；共享线程池不超过其大小
+        assert len(threads) <= pool_size
+        assert all(t.name.startswith("kline-fetch") for t in threads)
+
+    def test_failures(self):
+        """失败请求默认返回 None，return_exceptions=True 时返回异常对象"""
+
+        def failing_fetch(symbol, scale, datalen):
+            raise DataFetchError("boom")
+
+        assert fetch_kline_many([("sh600460", 240, 10)], fetch_func=failing_fetch) == {("sh600460", 240, 10): None}
+        results = fetch_kline_many([("sh600460", 240, 10)], fetch_func=failing_fetch, return_exceptions=True)
+        assert isinstance(results[("sh600460", 240, 10)], DataFetchError)
+
+    def test_async_api_and_running_loop(self):
+        """异步接口可直接 await；事件循环内调用同步入口也可用"""
+
+        async def main():
+            direct = await fetch_kline_many_async([("sh600460", 240, 2)], fetch_func=_fake_fetch)
+            nested = fetch_kline_many([("sh600460", 30, 2)], fetch_func=_fake_fetch)
+            return direct, nested
+
+        direct, nested = asyncio.run(main())
+        assert len(direct[("sh600460", 240, 2)]) == 2
+        assert len(nested[("sh600460", 30, 2)]) == 2
@@ -2,15 +2,49 @@
 测试数据获取函数（使用mock）
 """
 
+import time
+from types import SimpleNamespace
+
 import pandas as pd
+import pytest
 from unittest.mock import patch, MagicMock
-from src.data.fetchers import get_name, fetch_kline_data, normalize_beijing_time, filter_trading_hours
+from src.data.fetchers import (
+    get_name,
+    get_names,
+    get_quotes,
+    fetch_kline_data,
+    normalize_beijing_time,
+    filter_trading_hours,
+)
+from src.data.fetchers import a_share_fetcher
+from src.database.manager import StockDatabase
+
+
+@pytest.fixture(autouse=True)
+def isolated_name_lookup(tmp_path):
+    """名称查询使用临时数据库，并清空进程内名称缓存"""
+    db = StockDatabase(str(tmp_path / "names.db"))
+    a_share_fetcher._name_memo.clear()
+    with patch("src.database.get_stock_db", return_value=db):
+        yield db
+    a_share_fetcher._name_memo.clear()
+    db.close()
+
+
+SINA_BATCH_TEXT = (
+    'var hq_str_sh600460="士兰微,29.80,29.89,30.50,30.98,29.75,30.49,30.50,1000,30000000,'
+    + ",".join(["0"] * 20)
+    + ',2024-01-15,15:00:00,00";\n'
+    'var hq_str_hk00700="TENCENT,腾讯控股,300.0,298.0,305.0,296.0,303.0,5.0,1.68,302.8,303.0,'
+    '9000000000,30000000,0,0,0,0,2024/01/15,16:08";\n'
+    'var hq_str_sz999999="";\n'
+)
 
 
 class TestDataFetchers:
     """数据获取函数测试类"""
 
-    @patch("src.data.fetchers.a_share_fetcher.requests.get")
+    @patch("src.data.fetchers.a_share_fetcher.http_get")
     def test_get_name_success(self, mock_get):
         """测试获取股票名称成功"""
         # 模拟新浪财经API响应
@@ -23,7 +57,7 @@ class TestDataFetchers:
         name = get_name("sh600460")
         assert name == "士兰微"
 
-    @patch("src.data.fetchers.a_share_fetcher.requests.get")
+    @patch("src.data.fetchers.a_share_fetcher.http_get")
     def test_get_name_failure(self, mock_get):
         """测试获取股票名称失败"""
         mock_response = MagicMock()
@@ -34,17 +68,55 @@ class TestDataFetchers:
         # 失败时返回原始代码
         assert name == "sh999999"
 
+    @patch("src.data.fetchers.a_share_fetcher.http_get")
+    def test_get_quotes_batch(self, mock_get):
+        """批量行情：一次请求解析A股与港股"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = SINA_BATCH_TEXT
+        mock_get.return_value = mock_response
+
+        quotes = get_quotes(["sh600460", "HK.00700", "sz999999"])
+
+        assert mock_get.call_count == 1
+        assert "list=sh600460,hk00700,sz999999" in mock_get.call_args[0][0]
+        assert quotes["sh600460"]["name"] == "士兰微"
+        assert quotes["sh600460"]["price"] == 30.50
+        assert quotes["sh600460"]["date"] == "2024-01-15"
+        assert quotes["HK.00700"]["name"] == "腾讯控股"
+        assert quotes["HK.00700"]["price"] == 303.0
+        assert "sz999999" not in quotes
+
+    @patch("src.data.fetchers.a_share_fetcher._fetch_name_single")
+    @patch("src.data.fetchers.a_share_fetcher.http_get")
+    def test_get_names_persisted(self, mock_get, mock_single, isolated_name_lookup):
+        """批量名称写入数据库，再次查询无需网络请求"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.text = SINA_BATCH_TEXT
+        mock_get.return_value = mock_response
+        mock_single.side_effect = lambda symbol: symbol
+
+        names = get_names(["sh600460", "HK.00700", "sz999999"])
+        assert names == {"sh600460": "士兰微", "HK.00700": "腾讯控股", "sz999999": "sz999999"}
+        assert isolated_name_lookup.get_stock_names(["sh600460", "HK.00700"]) == {
+            "sh600460": "士兰微",
+            "HK.00700": "腾讯控股",
+        }
+
+        # 新进程（清空内存缓存）直接从数据库读取
+        a_share_fetcher._name_memo.clear()
+        mock_get.reset_mock()
+        assert get_names(["sh600460", "HK.00700"]) == {"sh600460": "士兰微", "HK.00700": "腾讯控股"}
+        mock_get.assert_not_called()
+
     @patch("src.data.fetchers.a_share_fetcher.fetch_kline_data_from_sina")
-    @patch("src.utils.trading_hours.is_china_stock_market_open")
-    def test_fetch_kline_data_basic(self, mock_market_open, mock_fetch):
+    def test_fetch_kline_data_basic(self, mock_fetch):
         """测试K线数据获取（基础功能）"""
-        # Mock 市场状态为非交易日，避免日期检查
-        mock_market_open.return_value = False
-
-        # 模拟返回数据
+        # 模拟返回数据（截至今天，通过最近交易日检查）
         mock_df = pd.DataFrame(
             {
-                "Date": pd.date_range("2024-01-01", periods=10),
+                "Date": pd.date_range(end=pd.Timestamp.now().normalize(), periods=10),
                 "Open": [100] * 10,
                 "High": [105] * 10,
                 "Low": [95] * 10,
@@ -94,3 +166,146 @@ class TestDataFetchers:
         assert normalize_code("600460") == "sh600460"
         assert normalize_code("300474") == "sz300474"
         assert normalize_code("00700") == "HK.00700"
+
+
+def _make_daily_bars(dates, close=102.0):
+    """构造日线 K 线 DataFrame"""
+    n = len(dates)
+    df = pd.DataFrame(
+        {
+            "Date": dates,
+            "Open": [100.0] * n,
+            "High": [105.0] * n,
+            "Low": [95.0] * n,
+            "Close": [close] * n,
+            "Volume": [1000000.0] * n,
+        }
+    )
+    return df.set_index("Date")
+
+
+class TestKlineReadThrough:
+    """测试数据库读穿（增量获取）"""
+
+    def test_empty_db_full_fetch(self, isolated_name_lookup):
+        """库中无数据时完整拉取并写回数据库"""
+        db = isolated_name_lookup
+        full = _make_daily_bars(pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=30))
+        with patch.object(a_share_fetcher, "_fetch_kline_from_sources", return_value=full) as mock_src:
+            df = a_share_fetcher._fetch_kline_read_through(db, "sh600460", 240, 30)
+
+        mock_src.assert_called_once_with("sh600460", 240, 30)
+        assert len(df) == 30
+        assert len(db.get_kline_data("sh600460", 240)) == 30
+
+    def test_only_delta_requested(self, isolated_name_lookup):
+        """库中已有数据时只请求最新日期之后的 K 线，新数据回写"""
+        db = isolated_name_lookup
+        today = pd.Timestamp.now().normalize()
+        stored_dates = pd.bdate_range(end=today - pd.offsets.BDay(2), periods=100)
+        db.save_kline_data("sh600460", 240, _make_daily_bars(stored_dates))
+        latest = stored_dates[-1]
+        delta = _make_daily_bars(pd.bdate_range(start=latest, end=today), close=110.0)
+
+        with patch.object(a_share_fetcher, "_fetch_kline_from_sources", return_value=delta) as mock_src:
+            df = a_share_fetcher._fetch_kline_read_through(db, "sh600460", 240, 100)
+
+        requested = mock_src.call_args[0][2]
+        assert requested < 10
+        assert len(df) == 100
+        assert df.index.max() == delta.index.max()
+        assert df.loc[latest, "Close"] == 110.0
+        assert db.get_latest_date("sh600460", 240) == delta.index.max()
+
+    def test_network_failure_returns_stored(self, isolated_name_lookup):
+        """增量请求失败时返回库中数据"""
+        db = isolated_name_lookup
+        stored_dates = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=50)
+        db.save_kline_data("sh600460", 240, _make_daily_bars(stored_dates))
+
+        with patch.object(a_share_fetcher, "_fetch_kline_from_sources", return_value=None):
+            df = a_share_fetcher._fetch_kline_read_through(db, "sh600460", 240, 50)
+
+        assert len(df) == 50
+        assert df.index.max() == stored_dates[-1]
+
+    def test_empty_delta_does_not_block_full_fetch(self, isolated_name_lookup, tmp_path):
+        """增量请求无新数据不记入负缓存，随后的完整请求仍可从同一数据源获取"""
+        from src.utils.cache import DataCache
+        from src.utils.negative_cache import NegativeCache
+
+        db = isolated_name_lookup
+        stored_dates = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.offsets.BDay(2), periods=100)
+        db.save_kline_data("sh600460", 240, _make_daily_bars(stored_dates))
+        negative = NegativeCache(DataCache(str(tmp_path / "negative"), memory_max_mb=8), 60, 10)
+        full = _make_daily_bars(pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=100))
+
+        def sina(symbol, scale, datalen):
+            # 增量窗口内数据源尚无新 K 线
+            return full if datalen >= 50 else pd.DataFrame()
+
+        with patch.object(a_share_fetcher, "get_negative_cache", return_value=negative), patch(
+            "src.utils.negative_cache.get_negative_cache", return_value=negative
+        ), patch.object(a_share_fetcher, "fetch_kline_data_from_sina", side_effect=sina), patch.object(
+            a_share_fetcher, "fetch_kline_data_fallback", return_value=pd.DataFrame()
+        ), patch(
+            "src.data.a_share_data_sources.AShareDataSources.candidates", return_value=[]
+        ):
+            df = a_share_fetcher._fetch_kline_read_through(db, "sh600460", 240, 100)
+            assert df.index.max() == stored_dates[-1]
+            assert negative.entries() == []
+
+            df = a_share_fetcher._fetch_kline_from_sources("sh600460", 240, 100)
+            assert df is not None and len(df) == 100
+
+    def test_synthetic_data_not_saved(self, isolated_name_lookup):
+        """替代方法生成的模拟数据不写入数据库"""
+        db = isolated_name_lookup
+        fake = _make_daily_bars(pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=10))
+        fake.attrs["synthetic"] = True
+        with patch.object(a_share_fetcher, "_fetch_kline_from_sources", return_value=fake):
+            df = a_share_fetcher._fetch_kline_read_through(db, "sh600460", 1, 10)
+
+        assert df is fake
+        assert db.get_latest_date("sh600460", 1) is None
+
+
+class TestKlineCacheExpiry:
+    """测试按交易时段计算的K线缓存过期时间"""
+
+    @patch("src.utils.trading_calendar._now")
+    def test_weekend_served_from_cache(self, mock_now, tmp_path):
+        """周五收盘后获取的日线缓存到下周一收盘，周末不再请求数据源"""
+        from datetime import date, datetime
+
+        from src.utils.cache import DataCache
+        from src.utils.trading_calendar import TradingCalendar, to_timestamp
+
+        trading_days = [date(2024, 1, 11), date(2024, 1, 12), date(2024, 1, 15)]
+        calendar = TradingCalendar("A", cache_dir=str(tmp_path / "cal"), loader=lambda: trading_days)
+        cache = DataCache(str(tmp_path / "cache"))
+        bars = _make_daily_bars(pd.bdate_range(end="2024-01-12", periods=20))
+        mock_now.return_value = datetime(2024, 1, 12, 16, 0)
+
+        # 缓存按模拟的北京时间判断过期
+        clock = SimpleNamespace(
+            time=lambda: to_timestamp(mock_now.return_value), ctime=time.ctime, monotonic=time.monotonic
+        )
+
+        with patch("src.utils.cache.get_cache", return_value=cache), patch(
+            "src.utils.trading_calendar.get_trading_calendar", return_value=calendar
+        ), patch("src.utils.cache.time", clock), patch.object(
+            a_share_fetcher, "_fetch_kline_from_sources", return_value=bars
+        ) as mock_src:
+            fetch_kline_data("sh600460", 240, 20, use_db=False)
+            mock_now.return_value = datetime(2024, 1, 14, 10, 0)
+            df = fetch_kline_data("sh600460", 240, 20, use_db=False)
+            assert mock_src.call_count == 1
+            assert len(df) == 20
+            cache_key = cache._get_cache_key("fetch_kline_data", symbol="sh600460", scale=240, datalen=20)
+            assert cache.index.get(cache_key)["expires_at"] == to_timestamp(datetime(2024, 1, 15, 15, 2))
+
+            # 下周一收盘后过期，重新获取
+            mock_now.return_value = datetime(2024, 1, 15, 15, 5)
+            fetch_kline_data("sh600460", 240, 20, use_db=False)
+            assert mock_src.call_count == 2
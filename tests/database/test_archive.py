@@ -0,0 +1,121 @@
+"""K 线冷数据归档（Parquet）单元测试"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.database.archive import KlineArchive  # noqa: E402
+from src.database.manager import StockDatabase  # noqa: E402
+
+
+def _bars(start, periods, close=10.0, freq="B"):
+    return pd.DataFrame(
+        {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": close, "Volume": 100.0},
+        index=pd.date_range(start, periods=periods, freq=freq, name="Date"),
+    )
+
+
+class TestKlineArchive:
+    """归档分区读写测试"""
+
+    def test_write_partitions_and_pushdown_read(self):
+        """按 周期/年份/分桶 分区写入，重复写入以新值为准，读取按代码与时间过滤"""
+        with tempfile.TemporaryDirectory() as d:
+            archive = KlineArchive(os.path.join(d, "archive"), buckets=4)
+            ts = pd.date_range("2022-12-29", periods=4, freq="D").values.astype("datetime64[s]").astype("int64")
+            df = pd.DataFrame({"code": ["sh600460"] * 4, "ts": ts, "open": 1.0, "high": 1.0, "low": 1.0})
+            df["close"] = [1.0, 2.0, 3.0, 4.0]
+            df["volume"] = 1.0
+            assert archive.write(240, df) == 2
+
+            bucket = archive.bucket("sh600460")
+            assert os.path.exists(os.path.join(d, "archive", "scale=240", "year=2023", f"bucket={bucket:02d}"))
+            newer = df.iloc[[3]].assign(close=40.0)
+            archive.write(240, newer)
+
+            out = archive.read(["sh600460"], 240, start_ts=int(ts[1]))
+            assert list(out["close"]) == [2.0, 3.0, 40.0]
+            assert archive.read(["sz300474"], 240).empty
+            assert archive.read(["sh600460"], 1).empty
+            assert archive.stats()["archived_kline_records"] == 4
+
+            # 已有归档以首次写入时的分桶数为准
+            assert KlineArchive(os.path.join(d, "archive"), buckets=32).buckets == 4
+
+    def test_read_ignores_stray_entries(self):
+        """周期目录中的杂项文件与名称不合法的目录被跳过，不影响读取"""
+        with tempfile.TemporaryDirectory() as d:
+            archive = KlineArchive(os.path.join(d, "archive"), buckets=4)
+            ts = pd.date_range("2023-03-01", periods=3, freq="D").values.astype("datetime64[s]").astype("int64")
+            df = pd.DataFrame({"code": "sh600460", "ts": ts, "open": 1.0, "high": 1.0, "low": 1.0})
+            df["close"] = 1.0
+            df["volume"] = 1.0
+            archive.write(240, df)
+
+            scale_dir = os.path.join(d, "archive", "scale=240")
+            for name in (".DS_Store", ".data.parquet.123.tmp", "year=2024.tmp"):
+                open(os.path.join(scale_dir, name), "w").close()
+            for name in ("year=", "year=abcd", "misc"):
+                os.makedirs(os.path.join(scale_dir, name))
+
+            assert len(archive.read(["sh600460"], 240)) == 3
+            assert len(archive.read(["sh600460"], 240, start_ts=int(ts[1]), end_ts=int(ts[2]))) == 2
+
+
+class TestStockDatabaseArchive:
+    """数据库冷热数据合并测试"""
+
+    def test_archive_old_klines_and_merge_reads(self):
+        """早于保留期限的 K 线移入归档，读取接口透明合并冷热数据"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"), archive_path=os.path.join(d, "archive"))
+            recent = pd.Timestamp.now().normalize() - pd.Timedelta(days=10)
+            db.save_kline_data("sh600460", 240, _bars("2021-01-04", 300))
+            db.save_kline_data("sh600460", 240, _bars(recent, 5, close=12.0))
+            db.save_kline_data("sz300474", 240, _bars("2021-06-01", 20, close=8.0))
+
+            summary = db.archive_old_klines(horizon_days=365)
+            assert summary["rows"] == 320
+            assert summary["stocks"] == 2
+            assert db.conn.execute("SELECT COUNT(*) FROM kline_by_scale").fetchone()[0] == 5
+
+            full = db.get_kline_data("sh600460", 240)
+            assert len(full) == 305
+            assert full.index.is_monotonic_increasing
+            assert full.index[0] == pd.Timestamp("2021-01-04")
+            tail = db.get_kline_data("sh600460", 240, limit=8)
+            assert list(tail["Close"]) == [10.0] * 3 + [12.0] * 5
+            window = db.get_kline_data("sh600460", 240, start_date="2021-02-01", end_date="2021-02-05")
+            assert len(window) == 5
+
+            # 归档后的旧 K 线再次写入库中：读取时以库中数据为准
+            db.save_kline_data("sz300474", 240, _bars("2021-06-01", 1, close=9.0))
+            assert list(db.get_kline_data("sz300474", 240)["Close"][:2]) == [9.0, 8.0]
+            assert db.get_latest_date("sz300474", 240) == pd.Timestamp("2021-06-01")
+
+            panel = db.get_kline_panel(["sh600460", "sz300474"], 240, as_arrays=True)
+            assert panel["Close"].shape == (2, 305)
+            assert np.count_nonzero(~np.isnan(panel["Close"][1])) == 20
+
+            stats = db.get_stats()
+            assert stats["archived_stocks"] == 2
+            assert stats["archived_kline_records"] == 320
+            db.close()
+
+    def test_archive_write_failure_keeps_rows(self, monkeypatch):
+        """归档写入失败时不删除库中数据"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"), archive_path=os.path.join(d, "archive"))
+            db.save_kline_data("sh600460", 240, _bars("2021-01-04", 30))
+            monkeypatch.setattr(db.archive, "write", lambda scale, df: (_ for _ in ()).throw(OSError("disk full")))
+
+            with pytest.raises(OSError):
+                db.archive_old_klines(horizon_days=365)
+            assert len(db.get_kline_data("sh600460", 240)) == 30
+            assert db.get_stats()["archived_stocks"] == 0
+            db.close()
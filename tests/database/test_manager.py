@@ -1,9 +1,12 @@
 """StockDatabase 单元测试"""
 
 import os
+import sqlite3
 import tempfile
 
+import numpy as np
 import pandas as pd
+import pytest
 
 from src.database.manager import StockDatabase
 
@@ -80,3 +83,222 @@ class TestStockDatabase:
             assert stats["total_kline_records"] >= 1
             assert "total_stocks" in stats
             db.close()
+
+    def test_stock_names(self):
+        """批量读写名称；写入 K 线时不覆盖已保存的名称"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            assert db.save_stock_names({"sh600460": "士兰微", "HK.00700": "腾讯控股"}) == 2
+            assert db.get_stock_names(["sh600460", "HK.00700", "sz300474"]) == {
+                "sh600460": "士兰微",
+                "HK.00700": "腾讯控股",
+            }
+
+            df = pd.DataFrame(
+                {"Open": [100.0], "High": [105.0], "Low": [95.0], "Close": [102.0], "Volume": [1e6]},
+                index=pd.DatetimeIndex(["2024-01-01"], name="Date"),
+            )
+            db.save_kline_data("sh600460", 240, df)
+            assert db.get_stock_names(["sh600460"]) == {"sh600460": "士兰微"}
+            db.close()
+
+    def test_bulk_upsert_replaces_overlap(self):
+        """批量写入：重叠日期覆盖旧值，元数据与 K 线同一事务写入，每次写入记录一个批次"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            index = pd.date_range("2024-01-01 09:31", periods=240, freq="min", name="Date")
+            df = pd.DataFrame(
+                {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.5, "Volume": 100.0},
+                index=index,
+            )
+            assert db.save_kline_data("sh600460", 1, df) == 240
+
+            newer = df.iloc[-10:].copy()
+            newer["Close"] = 10.8
+            assert db.save_kline_data("sh600460", 1, newer) == 10
+            batches = db.conn.execute("SELECT row_count, first_ts, last_ts FROM write_batches").fetchall()
+            assert [b[0] for b in batches] == [240, 10]
+            assert pd.Timestamp(batches[1][1], unit="s") == index[-10]
+
+            out = db.get_kline_data("sh600460", 1)
+            assert len(out) == 240
+            assert (out["Close"].iloc[-10:] == 10.8).all()
+            assert (out["Close"].iloc[:-10] == 10.5).all()
+            last_update = db.conn.execute("SELECT last_update_date FROM meta_info WHERE code = 'sh600460'").fetchone()
+            assert last_update[0] == str(index[-1])
+            db.close()
+
+    def test_save_market_index_data(self):
+        """指数数据批量写入与读取"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            df = pd.DataFrame(
+                {"Open": [3000.0, 3010.0], "High": [3020.0, 3030.0], "Low": [2990.0, 3000.0]},
+                index=pd.DatetimeIndex(["2024-01-02", "2024-01-03"], name="Date"),
+            )
+            df["Close"] = [3015.0, 3025.0]
+            df["Volume"] = [1e9, 1.1e9]
+            assert db.save_market_index_data("sh000001", "上证指数", 240, df) == 2
+            out = db.get_market_index_data("sh000001", 240)
+            assert list(out["Close"]) == [3015.0, 3025.0]
+            db.close()
+
+    def test_concurrent_readers_and_writer(self):
+        """WAL 模式下多线程同时读写：每个线程独立的只读连接，写入经写线程串行执行"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+            def work(i):
+                df = pd.DataFrame(
+                    {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.0 + i, "Volume": 100.0},
+                    index=pd.date_range("2024-01-01", periods=50, freq="B", name="Date"),
+                )
+                code = f"sh60{i:04d}"
+                assert db.save_kline_data(code, 240, df) == 50
+                out = db.get_kline_data(code, 240)
+                return id(db.conn), float(out["Close"].iloc[-1])
+
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(work, range(32)))
+
+            assert [close for _, close in results] == [10.0 + i for i in range(32)]
+            assert len({conn_id for conn_id, _ in results}) > 1
+            assert db.get_stats()["total_stocks"] == 32
+            with pytest.raises(sqlite3.OperationalError):
+                db.conn.execute("DELETE FROM kline_by_scale")
+            db.close()
+
+    def test_reader_connections_closed_with_threads(self):
+        """短生命周期线程退出后其只读连接被关闭，连接数不随线程数增长"""
+        import threading
+
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            conns = []
+
+            def read():
+                db.get_latest_date("sh600460", 240)
+                conns.append(db.conn)
+
+            for _ in range(20):
+                threads = [threading.Thread(target=read) for _ in range(10)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                assert len(db._readers) <= 10
+
+            assert len(conns) == 200
+            assert not db._readers
+            with pytest.raises(sqlite3.ProgrammingError):
+                conns[0].execute("SELECT 1")
+            db.get_latest_date("sh600460", 240)
+            assert len(db._readers) == 1
+            db.close()
+            assert not db._readers
+
+    def test_write_after_close(self):
+        """close() 后写线程已退出：写入立即失败而不是永久阻塞，get_stock_db 重新创建实例"""
+        from unittest.mock import patch
+
+        import src.database as database
+
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            db.close()
+            db.close()
+            assert db.closed
+            df = pd.DataFrame(
+                {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.0, "Volume": 100.0},
+                index=pd.date_range("2024-01-01", periods=3, freq="B", name="Date"),
+            )
+            assert db.save_kline_data("sh600460", 240, df) == 0
+            with pytest.raises(sqlite3.ProgrammingError):
+                db._write(lambda conn: None)
+
+            cfg = {"database": {"enabled": True, "path": os.path.join(d, "t.db")}}
+            with patch.object(database, "_db", db), patch("src.config.Config.load", return_value=cfg):
+                fresh = database.get_stock_db()
+                assert fresh is not db and not fresh.closed
+                assert fresh.save_kline_data("sh600460", 240, df) == 3
+                fresh.close()
+
+    def test_migrate_legacy_schema(self):
+        """旧版 TEXT 日期表迁移为整数时间戳 + WITHOUT ROWID，冗余索引删除，数据保留"""
+        with tempfile.TemporaryDirectory() as d:
+            db_path = os.path.join(d, "t.db")
+            legacy = sqlite3.connect(db_path)
+            legacy.executescript(
+                """
+                CREATE TABLE kline_by_scale (
+                    code TEXT NOT NULL, scale INTEGER NOT NULL, date TEXT NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL, volume REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (code, scale, date)
+                );
+                CREATE INDEX idx_kline_code_scale ON kline_by_scale(code, scale);
+                CREATE INDEX idx_kline_date ON kline_by_scale(date);
+                INSERT INTO kline_by_scale (code, scale, date, open, high, low, close, volume) VALUES
+                    ('sh600460', 240, '2024-01-02 00:00:00', 10, 11, 9, 10.5, 100),
+                    ('sh600460', 240, '2024-01-03 00:00:00', 10, 11, 9, 10.6, 100),
+                    ('sh600460', 240, '2024-01-03', 10, 11, 9, 10.7, 100),
+                    ('sh600460', 1, '2024-01-03 09:31:00', 10, 11, 9, 10.2, 10);
+                """
+            )
+            legacy.close()
+
+            db = StockDatabase(db_path)
+            assert db.conn.execute("PRAGMA user_version").fetchone()[0] == 1
+            sql = db.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'kline_by_scale'").fetchone()[0]
+            assert "WITHOUT ROWID" in sql
+            indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert not indexes & {"idx_kline_code_scale", "idx_kline_date"}
+
+            out = db.get_kline_data("sh600460", 240)
+            assert list(out.index) == [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-03")]
+            assert list(out["Close"]) == [10.5, 10.7]
+            assert db.get_latest_date("sh600460", 1) == pd.Timestamp("2024-01-03 09:31")
+            assert db.get_kline_data("sh600460", 240, start_date="2024-01-03", end_date="2024-01-03") is not None
+            db.close()
+
+            # 已迁移的库再次打开不重复迁移
+            db = StockDatabase(db_path, audit_batches=False)
+            assert db.get_stats()["total_kline_records"] == 3
+            db.close()
+
+    def test_get_kline_panel(self):
+        """多只股票一次读取：长表（分类代码列）与按 (股票, 时间) 对齐的二维数组"""
+        with tempfile.TemporaryDirectory() as d:
+            db = StockDatabase(os.path.join(d, "t.db"))
+            for i, (code, start) in enumerate([("sh600460", "2024-01-01"), ("sz300474", "2024-01-03")]):
+                df = pd.DataFrame(
+                    {"Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.0 + i, "Volume": 100.0},
+                    index=pd.date_range(start, periods=5, freq="B", name="Date"),
+                )
+                db.save_kline_data(code, 240, df)
+
+            codes = ["sz300474", "sh600460", "sh000000"]
+            long = db.get_kline_panel(codes, 240, start_date="2024-01-02")
+            assert list(long.columns) == ["Symbol", "Date", "Open", "High", "Low", "Close", "Volume"]
+            assert list(long["Symbol"].cat.categories) == codes
+            assert list(long["Symbol"]) == ["sz300474"] * 5 + ["sh600460"] * 4
+            assert long["Date"].iloc[0] == pd.Timestamp("2024-01-03")
+            assert long.groupby("Symbol", observed=False).size().to_dict() == {
+                "sz300474": 5,
+                "sh600460": 4,
+                "sh000000": 0,
+            }
+
+            panel = db.get_kline_panel(codes, 240, end_date="2024-01-05", as_arrays=True)
+            assert panel["symbols"] == codes
+            assert list(panel["dates"]) == list(pd.date_range("2024-01-01", "2024-01-05", freq="B"))
+            assert panel["Close"].shape == (3, 5)
+            np.testing.assert_array_equal(panel["Close"][0], [np.nan, np.nan, 11.0, 11.0, 11.0])
+            np.testing.assert_array_equal(panel["Close"][1], [10.0] * 5)
+            assert np.isnan(panel["Close"][2]).all()
+
+            assert db.get_kline_panel([], 240).empty
+            db.close()
@@ -4,12 +4,15 @@ Mock 网络与数据源，验证「解析参数 → 拉数 → 算指标 → 生
 """
 
 import os
+import sys
 import tempfile
+import types
 from unittest.mock import patch
 
 import pandas as pd
 
 from src.report.generator import process_multiple_stocks, create_zip_archive
+from src.report.warmup import warm_up
 from src.utils.code_normalizer import parse_stock_list
 
 
@@ -38,11 +41,13 @@ def _make_ohlcv_df(rows: int = 60):
 @patch("src.report.generator.load_sector_index_map")
 @patch("src.report.generator.get_sector_indices_data")
 @patch("src.report.generator.get_market_indices_data")
+@patch("src.report.generator.get_names")
 @patch("src.report.generator.get_name")
 @patch("src.report.generator.fetch_kline_data")
 def test_full_workflow_mocked(
     mock_fetch,
     mock_name,
+    mock_names,
     mock_indices,
     mock_sector_indices,
     mock_sector_map,
@@ -85,11 +90,13 @@ def test_parse_stock_list_integration():
 @patch("src.report.generator.load_sector_index_map")
 @patch("src.report.generator.get_sector_indices_data")
 @patch("src.report.generator.get_market_indices_data")
+@patch("src.report.generator.get_names")
 @patch("src.report.generator.get_name")
 @patch("src.report.generator.fetch_kline_data")
 def test_full_workflow_no_data_fails_gracefully(
     mock_fetch,
     mock_name,
+    mock_names,
     mock_indices,
     mock_sector_indices,
     mock_sector_map,
@@ -109,6 +116,86 @@ def test_full_workflow_no_data_fails_gracefully(
         assert "无数据" in reason or "数据" in reason or "失败" in reason
 
 
+@patch("src.report.generator.create_pdf_with_market_analysis")
+@patch("src.report.generator.create_candle_chart")
+@patch("src.report.generator.create_indices_charts")
+@patch("src.report.generator.load_sector_index_map")
+@patch("src.report.generator.get_sector_indices_data")
+@patch("src.report.generator.get_market_indices_data")
+def test_concurrent_sector_reports_do_not_share_indices(
+    mock_indices,
+    mock_sector_indices,
+    mock_sector_map,
+    mock_indices_charts,
+    mock_candle_chart,
+    mock_pdf,
+):
+    """并发生成多个行业报告：共享的市场指数结果不被修改，各报告只包含自己的行业指数"""
+    shared = {"sh000001": {"name": "上证指数", "type": "A"}}
+    # 请求合并与缓存会把同一个 dict 返回给所有并发调用方
+    mock_indices.return_value = shared
+    mock_sector_indices.side_effect = lambda code, count: {code: {"name": code, "type": "SECTOR"}}
+    mock_sector_map.return_value = {
+        "name_to_code": {"光伏设备": "BK1031", "银行": "BK0475"},
+        "code_to_name": {"BK1031": "光伏设备", "BK0475": "银行"},
+    }
+    seen = {}
+    mock_indices_charts.side_effect = lambda indices, temp_dir: seen.setdefault(temp_dir, set(indices))
+    mock_pdf.return_value = True
+
+    day = (
+        _make_ohlcv_df(80)
+        .reset_index()
+        .rename(
+            columns={"Date": "日期", "Open": "开盘", "Close": "收盘", "High": "最高", "Low": "最低", "Volume": "成交量"}
+        )
+    )
+    fake_ak = types.SimpleNamespace(
+        stock_board_industry_hist_em=lambda **kwargs: day.copy(),
+        stock_board_industry_hist_min_em=lambda **kwargs: pd.DataFrame(),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp, patch.dict(sys.modules, {"akshare": fake_ak}):
+        process_multiple_stocks("BK1031 BK0475", tmp)
+
+    assert shared == {"sh000001": {"name": "上证指数", "type": "A"}}
+    by_sector = {("BK1031" if "BK1031" in d else "BK0475"): keys for d, keys in seen.items()}
+    assert by_sector == {"BK1031": {"sh000001", "BK1031"}, "BK0475": {"sh000001", "BK0475"}}
+
+
+@patch("src.report.warmup.get_trading_calendar")
+@patch("src.report.warmup.load_sector_index_map")
+@patch("src.report.warmup.get_sector_indices_data")
+@patch("src.report.warmup.get_market_indices_data")
+@patch("src.report.generator.get_names")
+@patch("src.report.generator.fetch_kline_data")
+def test_warm_up_prefetches_report_data(
+    mock_fetch,
+    mock_names,
+    mock_indices,
+    mock_sector_indices,
+    mock_sector_map,
+    mock_calendar,
+):
+    """盘前预热：批量获取名称与报告所需的全部K线周期，并获取 A股/港股指数与行业指数"""
+    mock_fetch.side_effect = lambda symbol, scale, datalen: None if scale == 1 else _make_ohlcv_df(20)
+    mock_indices.return_value = {"sh000001": {"name": "上证指数"}}
+    mock_sector_indices.return_value = {"BK1031": {"name": "光伏设备"}}
+    mock_sector_map.return_value = {"name_to_code": {"光伏设备": "BK1031"}, "code_to_name": {"BK1031": "光伏设备"}}
+
+    summary = warm_up(["600460", "HK.00700"], sectors=["光伏设备"], refresh_timeout=1)
+
+    mock_names.assert_called_once_with(["sh600460", "HK.00700"])
+    requested = {call.args for call in mock_fetch.call_args_list}
+    assert ("sh600460", 240, 150) in requested and ("HK.00700", 1, 100) in requested
+    assert {call.kwargs["is_hk"] for call in mock_indices.call_args_list} == {False, True}
+    mock_sector_indices.assert_called_once_with("BK1031", count=150)
+    assert mock_calendar.call_count == 2
+    assert summary["stocks"] == 2
+    assert summary["klines"] == 6 and summary["klines_failed"] == 2
+    assert summary["indices"] == 3 and summary["indices_failed"] == 0
+
+
 def test_create_zip_archive_empty_dir():
     """ZIP：空目录返回 None"""
     with tempfile.TemporaryDirectory() as tmp:
@@ -2,8 +2,10 @@
 测试缓存模块
 """
 
+import os
 import pytest
 import pandas as pd
+import pickle
 import time
 from src.utils.cache import DataCache, get_cache
 
@@ -94,3 +96,340 @@ class TestDataCache:
 
         # 应该是同一个实例
         assert cache1 is cache2
+
+
+class TestAbsoluteExpiry:
+    """绝对过期时间测试类"""
+
+    def test_expires_at_overrides_ttl(self, tmp_path):
+        """写入时指定绝对过期时间后，不再按读取方传入的 TTL 判断"""
+        cache = DataCache(str(tmp_path / "c"), memory_max_mb=8)
+        cache.set("closed_bars", 1, expires_at=time.time() + 3600)
+        cache.set("forming_bar", 2, expires_at=time.time() + 1)
+        time.sleep(1.1)
+
+        assert cache.get("closed_bars", ttl_hours=1 / 3600) == 1
+        assert cache.get("forming_bar", ttl_hours=24) is None
+
+        reopened = DataCache(str(cache.cache_dir))
+        assert reopened.get("closed_bars", ttl_hours=1 / 3600) == 1
+
+    def test_expired_absolute_entries_purged(self, tmp_path):
+        """过期清理同样适用于绝对过期时间"""
+        cache = DataCache(str(tmp_path / "c"))
+        cache.set("k", 1, expires_at=time.time() - 1)
+
+        assert cache.purge_expired() == 1
+
+
+class TestCacheIndex:
+    """缓存元数据索引测试类"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return DataCache(str(tmp_path / "indexed_cache"), default_ttl_hours=1)
+
+    def test_clear_by_pattern(self, cache):
+        """按键名通配符清理，只删除匹配的条目与文件"""
+        cache.set("kline_sh600460", 1, scale=240)
+        cache.set("kline_sh600519", 2, scale=240)
+        cache.set("market_indices", 3)
+
+        cache.clear("kline_*")
+
+        assert cache.get("kline_sh600460", scale=240) is None
+        assert cache.get("kline_sh600519", scale=240) is None
+        assert cache.get("market_indices") == 3
+        assert cache.get_stats()["total_files"] == 1
+        assert cache.get_stats()["metadata_entries"] == 1
+
+    def test_purge_expired(self, cache):
+        """按写入时 TTL 清理过期条目"""
+        cache.set("short", 1, ttl_hours=1 / 3600)
+        cache.set("long", 2, ttl_hours=24)
+        time.sleep(1.1)
+
+        assert cache.purge_expired() == 1
+        assert cache.get("short", ttl_hours=24) is None
+        assert cache.get("long") == 2
+
+    def test_index_persists_across_instances(self, cache):
+        """索引持久化，新实例可按原 TTL 判断过期"""
+        cache.set("persisted", {"a": 1}, symbol="x")
+        reopened = DataCache(str(cache.cache_dir), default_ttl_hours=1)
+
+        assert reopened.get("persisted", symbol="x") == {"a": 1}
+        assert reopened.get_stats()["metadata_entries"] == 1
+
+    def test_legacy_json_metadata_migrated(self, tmp_path):
+        """旧版 cache_metadata.json 在首次打开时导入索引并删除"""
+        import json
+        from datetime import datetime, timedelta
+
+        cache_dir = tmp_path / "legacy"
+        cache_dir.mkdir()
+        old = DataCache.__new__(DataCache)
+        fresh_key = old._get_cache_key("fresh")
+        stale_key = old._get_cache_key("stale")
+        for cache_key in (fresh_key, stale_key):
+            (cache_dir / cache_key).write_bytes(pickle.dumps("v"))
+        metadata = {
+            fresh_key: {"key": "fresh", "created_at": datetime.now().isoformat(), "ttl_hours": 1, "params": {}},
+            stale_key: {
+                "key": "stale",
+                "created_at": (datetime.now() - timedelta(hours=2)).isoformat(),
+                "ttl_hours": 1,
+                "params": {},
+            },
+        }
+        (cache_dir / "cache_metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+
+        cache = DataCache(str(cache_dir), default_ttl_hours=1)
+
+        assert not (cache_dir / "cache_metadata.json").exists()
+        assert cache.get_stats()["metadata_entries"] == 2
+        assert cache.get("fresh") == "v"
+        assert cache.get("stale") is None
+
+    def test_concurrent_sets(self, cache):
+        """多线程并发写入，索引条目完整"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: cache.set("item", i, n=i), range(50)))
+
+        assert cache.get_stats()["metadata_entries"] == 50
+        assert all(cache.get("item", n=i) == i for i in range(50))
+
+
+class TestArrowStorage:
+    """DataFrame Arrow 存储测试类"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        return DataCache(str(tmp_path / "arrow_cache"), default_ttl_hours=1)
+
+    def _kline(self, n=100):
+        index = pd.date_range("2024-01-02 09:31", periods=n, freq="min", name="Date")
+        df = pd.DataFrame({col: range(n) for col in ["Open", "High", "Low", "Close", "Volume"]}, index=index)
+        df = df.astype("float64")
+        df.attrs["synthetic"] = True
+        return df
+
+    def test_dataframe_round_trip(self, cache):
+        """DataFrame 以 Arrow 格式保存，索引、数据与 attrs 原样还原"""
+        df = self._kline()
+        cache.set("kline", df, symbol="sh600460", scale=1)
+
+        cache_key = cache._get_cache_key("kline", symbol="sh600460", scale=1)
+        assert cache.index.get(cache_key)["fmt"] == "arrow"
+        assert cache._get_cache_path(cache_key, "arrow").exists()
+        assert not cache._get_cache_path(cache_key).exists()
+
+        result = cache.get("kline", symbol="sh600460", scale=1)
+        pd.testing.assert_frame_equal(result, df, check_freq=False)
+        assert result.attrs == {"synthetic": True}
+
+    def test_non_dataframe_uses_pickle(self, cache):
+        """非 DataFrame（如指数字典）仍用 pickle"""
+        value = {"上证指数": self._kline(5)}
+        cache.set("indices", value)
+
+        assert cache.index.get(cache._get_cache_key("indices"))["fmt"] == "pickle"
+        pd.testing.assert_frame_equal(cache.get("indices")["上证指数"], value["上证指数"], check_freq=False)
+
+    def test_unsupported_frame_falls_back_to_pickle(self, cache):
+        """Arrow 无法表示的 DataFrame（混杂 object 列）退回 pickle"""
+        df = pd.DataFrame({"mixed": [1, "a", object()]})
+        cache.set("mixed", df)
+
+        assert cache.index.get(cache._get_cache_key("mixed"))["fmt"] == "pickle"
+        assert len(cache.get("mixed")) == 3
+
+    def test_format_switch_removes_old_file(self, cache):
+        """同一键改变格式后旧文件被删除，统计只计一份"""
+        cache.set("switch", {"a": 1})
+        cache.set("switch", self._kline(3))
+
+        assert cache.get_stats()["total_files"] == 1
+        assert len(cache.get("switch")) == 3
+        cache.delete("switch")
+        assert cache.get_stats()["total_files"] == 0
+
+    def test_disabled_arrow_uses_pickle(self, tmp_path):
+        """关闭 Arrow 时 DataFrame 同样使用 pickle"""
+        cache = DataCache(str(tmp_path / "pickle_cache"), use_arrow=False)
+        cache.set("kline", self._kline(3))
+
+        assert cache.index.get(cache._get_cache_key("kline"))["fmt"] == "pickle"
+        assert len(cache.get("kline")) == 3
+
+
+class TestCacheLimits:
+    """缓存容量限制与清理测试类"""
+
+    def test_max_entries_lru(self, tmp_path):
+        """超出条目上限时淘汰最近最少使用的条目"""
+        cache = DataCache(str(tmp_path / "c"), max_entries=2)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        cache.set("b", 2)
+        time.sleep(0.01)
+        cache.get("a")  # a 变为最近使用
+        time.sleep(0.01)
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_max_entries_lfu(self, tmp_path):
+        """LFU 淘汰访问次数最少的条目"""
+        cache = DataCache(str(tmp_path / "c"), max_entries=2, eviction="lfu")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        for _ in range(3):
+            cache.get("a")
+        cache.get("b")
+        time.sleep(0.01)
+        cache.set("c", 3)  # 刚写入的条目访问次数为 0，但不参与本次淘汰
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_max_size_bytes(self, tmp_path):
+        """超出字节上限时淘汰，直到总大小满足限制"""
+        payload = b"x" * 100_000
+        cache = DataCache(str(tmp_path / "c"), max_size_mb=0.25)
+        for i in range(5):
+            cache.set(f"blob_{i}", payload)
+            time.sleep(0.01)
+
+        stats = cache.get_stats()
+        assert stats["total_size_mb"] <= 0.25
+        assert stats["metadata_entries"] == 2
+        assert cache.get("blob_4") == payload
+        assert len(list(cache.cache_dir.glob("*.pkl"))) == 2
+
+    def test_sweep_removes_expired_and_orphans(self, tmp_path):
+        """清理过期条目、孤立文件与丢失文件的索引记录"""
+        cache = DataCache(str(tmp_path / "c"))
+        cache.set("expired", 1, ttl_hours=1 / 3600)
+        cache.set("alive", 2)
+        cache.set("lost", 3)
+        cache._get_cache_path(cache._get_cache_key("lost")).unlink()
+
+        orphan = cache.cache_dir / "0123456789abcdef.pkl"
+        orphan.write_bytes(b"stale")
+        fresh_orphan = cache.cache_dir / "fedcba9876543210.pkl"
+        fresh_orphan.write_bytes(b"being written")
+        old = time.time() - 3600
+        os.utime(orphan, (old, old))
+        time.sleep(1.1)
+
+        result = cache.sweep()
+
+        assert result == {"expired": 1, "orphan_files": 1, "missing_files": 1, "evicted": 0}
+        assert not orphan.exists()
+        assert fresh_orphan.exists()  # 最近写入的文件可能尚未登记，保留
+        assert cache.get("alive") == 2
+        assert cache.get_stats()["metadata_entries"] == 1
+
+    def test_janitor_sweeps_on_start(self, tmp_path):
+        """后台清理线程启动时立即清理一次"""
+        cache = DataCache(str(tmp_path / "c"))
+        cache.set("expired", 1, ttl_hours=1 / 3600)
+        time.sleep(1.1)
+
+        cache.start_janitor(0)
+        cache._janitor.join(timeout=5)
+
+        assert cache.get_stats()["metadata_entries"] == 0
+
+    def test_invalid_eviction_policy(self, tmp_path):
+        """不支持的淘汰策略报错"""
+        with pytest.raises(ValueError):
+            DataCache(str(tmp_path / "c"), eviction="fifo")
+
+
+def _hammer_cache(cache_dir, worker_id, rounds):
+    """子进程：反复覆盖写入并读取同一键，返回读到异常数据的次数"""
+    cache = DataCache(cache_dir, shared=True, memory_max_mb=8)
+    bad = 0
+    for i in range(rounds):
+        cache.set("shared", pd.DataFrame({"v": [float(worker_id)] * 2000}), symbol="x")
+        cache.set("blob", b"z" * 50_000, n=i % 3)
+        value = cache.get("shared", symbol="x")
+        if value is None or len(value) != 2000 or value["v"].nunique() != 1:
+            bad += 1
+    return bad
+
+
+class TestSharedCache:
+    """多进程共享缓存测试类"""
+
+    def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        """写入使用临时文件加原子替换，完成后不残留临时文件"""
+        cache = DataCache(str(tmp_path / "c"))
+        cache.set("k", pd.DataFrame({"v": [1.0, 2.0]}))
+        cache.set("k", {"now": "pickle"})
+
+        assert list(cache.cache_dir.glob("*.tmp")) == []
+        assert cache.get("k") == {"now": "pickle"}
+
+    def test_concurrent_processes(self, tmp_path):
+        """多个进程同时读写同一缓存目录，读取方不会看到半写文件"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        cache_dir = str(tmp_path / "c")
+        DataCache(cache_dir)
+        with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("fork")) as pool:
+            results = list(pool.map(_hammer_cache, [cache_dir] * 4, range(4), [30] * 4))
+
+        assert results == [0, 0, 0, 0]
+        cache = DataCache(cache_dir)
+        assert cache.get_stats()["metadata_entries"] == 4
+        assert list(cache.cache_dir.glob("*.tmp")) == []
+
+    def test_shared_memory_tier_sees_other_writers(self, tmp_path):
+        """共享模式下内存层命中前核对索引，能感知其他实例的覆盖与删除"""
+        cache_dir = str(tmp_path / "c")
+        a = DataCache(cache_dir, memory_max_mb=8, shared=True)
+        b = DataCache(cache_dir, memory_max_mb=8, shared=True)
+        a.set("k", 1)
+        assert a.get("k") == 1
+
+        time.sleep(0.01)
+        b.set("k", 2)
+        assert a.get("k") == 2
+
+        b.delete("k")
+        assert a.get("k") is None
+
+    def test_expired_check_does_not_delete_newer_write(self, tmp_path):
+        """按旧条目判断过期时，不会误删其他实例刚写入的新条目"""
+        cache_dir = str(tmp_path / "c")
+        a = DataCache(cache_dir)
+        a.set("k", 1)
+        cache_key = a._get_cache_key("k")
+        stale_created_at = a.index.get(cache_key)["created_at"]
+
+        DataCache(cache_dir).set("k", 2)
+        a._discard(cache_key, stale_created_at)
+
+        assert a.get("k") == 2
+
+    def test_pickled_cache_reopens_in_shared_mode(self, tmp_path):
+        """缓存实例可传给子进程，按原配置以共享模式重新打开"""
+        cache = DataCache(str(tmp_path / "c"), max_entries=10, memory_max_mb=4)
+        cache.set("k", 1)
+
+        clone = pickle.loads(pickle.dumps(cache))
+
+        assert clone.shared is True
+        assert clone.max_entries == 10
+        assert clone.get("k") == 1
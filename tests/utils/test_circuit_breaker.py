@@ -0,0 +1,170 @@
+"""
+测试数据源熔断器
+"""
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import requests
+
+from src.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, get_breaker, guarded_call
+from src.utils.exceptions import CircuitOpenError, NoDataError
+from src.utils.source_stats import SourceStats, fetch_ranked
+
+
+class TestCircuitBreaker:
+    """熔断器测试类"""
+
+    def test_opens_after_threshold(self):
+        """连续失败达到阈值后熔断，冷却期内拒绝请求"""
+        breaker = CircuitBreaker("test", failure_threshold=2, cooldown=60)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_half_open_single_probe(self):
+        """冷却到期后只放行一个试探请求，成功则关闭，失败则重新熔断"""
+        breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+        breaker.record_failure()
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow() and breaker.allow()
+
+    def test_success_resets_failures(self):
+        """成功后清零连续失败计数"""
+        breaker = CircuitBreaker("test", failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_empty_probe_allows_next_probe(self):
+        """试探请求无数据时不重新熔断，也不关闭熔断，下一个请求继续试探"""
+        breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_empty()
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+
+    def test_disabled_always_allows(self):
+        """禁用时始终放行"""
+        breaker = CircuitBreaker("test", failure_threshold=1, enabled=False)
+        breaker.record_failure()
+        assert breaker.allow()
+
+
+class TestGuardedCall:
+    """经熔断器调用测试类"""
+
+    def test_dead_source_skipped(self):
+        """失效数据源熔断后不再被调用"""
+        name = "test_guarded_dead"
+        breaker = get_breaker(name)
+        breaker.reset()
+        calls = []
+
+        def dead():
+            calls.append(1)
+            raise ConnectionError("down")
+
+        for _ in range(breaker.failure_threshold):
+            with pytest.raises(ConnectionError):
+                guarded_call(name, dead)
+        with pytest.raises(CircuitOpenError):
+            guarded_call(name, dead)
+        assert len(calls) == breaker.failure_threshold
+        breaker.reset()
+
+    def test_empty_results_never_open_breaker(self):
+        """停牌/退市等无数据结果（None、空表、NoDataError）不计为数据源失败，正常股票不受影响"""
+        name = "test_guarded_empty"
+        breaker = get_breaker(name)
+        breaker.reset()
+
+        def no_data():
+            raise NoDataError("无数据")
+
+        for _ in range(breaker.failure_threshold + 2):
+            assert guarded_call(name, lambda: None) is None
+            assert guarded_call(name, pd.DataFrame).empty
+            with pytest.raises(NoDataError):
+                guarded_call(name, no_data)
+        assert breaker.state == CLOSED
+
+        healthy = pd.DataFrame({"Close": [1.0]})
+        assert guarded_call(name, lambda: healthy) is healthy
+        breaker.reset()
+
+    def test_fetch_ranked_empty_symbols_keep_source_available(self):
+        """连续多只无数据的股票后，同一数据源仍为正常股票返回数据"""
+        get_breaker("sina").reset()
+        stats = SourceStats()
+        try:
+            for _ in range(get_breaker("sina").failure_threshold + 1):
+                assert fetch_ranked([("sina", pd.DataFrame)], stats=stats, hedge=False) == (None, None)
+            assert get_breaker("sina").state == CLOSED
+            source, df = fetch_ranked([("sina", lambda: pd.DataFrame({"Close": [1.0]}))], stats=stats, hedge=False)
+            assert source == "sina" and not df.empty
+        finally:
+            get_breaker("sina").reset()
+
+    def test_http_errors_reach_breaker(self):
+        """数据源的网络/HTTP 错误不再被吞掉，由熔断器计为失败"""
+        from src.data.a_share_data_sources import AShareDataSources
+
+        with patch("src.data.a_share_data_sources.http_get", side_effect=requests.Timeout("timeout")):
+            with pytest.raises(requests.Timeout):
+                AShareDataSources.fetch_from_eastmoney("sh600460")
+
+    def test_hk_fallback_retries_without_sleep(self):
+        """港股降级链的重试轮次之间不固定等待，节奏交给限速器与熔断器"""
+        from src.data.hk_data_sources import HKDataSources
+
+        for name in ("eastmoney", "sina"):
+            get_breaker(name).reset()
+        try:
+            with patch.object(
+                HKDataSources, "get_kline_from_eastmoney", side_effect=requests.ConnectionError("down")
+            ) as em, patch.object(HKDataSources, "get_kline_from_sina", return_value=None), patch(
+                "src.data.hk_data_sources.AK_AVAILABLE", False
+            ), patch(
+                "src.data.hk_data_sources.get_negative_cache", return_value=None
+            ), patch(
+                "time.sleep"
+            ) as sleep:
+                assert HKDataSources.get_kline_with_fallback("00700") is None
+                assert em.call_count == 3
+                sleep.assert_not_called()
+        finally:
+            for name in ("eastmoney", "sina"):
+                get_breaker(name).reset()
+
+    def test_hk_fallback_skips_open_sources(self):
+        """港股降级链跳过熔断中的数据源，全部熔断时不再重试等待"""
+        from src.data.hk_data_sources import HKDataSources
+
+        for name in ("eastmoney", "sina", "akshare"):
+            get_breaker(name).reset()
+        threshold = get_breaker("eastmoney").failure_threshold
+        try:
+            with patch.object(
+                HKDataSources, "get_kline_from_eastmoney", side_effect=requests.ConnectionError("down")
+            ) as em, patch.object(HKDataSources, "get_kline_from_sina", return_value=pd.DataFrame({"Close": [1.0]})):
+                get_breaker("eastmoney").failure_threshold = 1
+                df = HKDataSources.get_kline_with_fallback("00700")
+                assert not df.empty
+                HKDataSources.get_kline_with_fallback("00700")
+                assert em.call_count == 1
+        finally:
+            get_breaker("eastmoney").failure_threshold = threshold
+            for name in ("eastmoney", "sina", "akshare"):
+                get_breaker(name).reset()
@@ -0,0 +1,44 @@
+"""
+测试共享 HTTP 客户端
+"""
+
+from unittest.mock import patch, MagicMock
+
+from src.utils.http_client import HttpClient, PROFILES, get_http_client
+
+
+class TestHttpClient:
+    """HTTP 客户端测试类"""
+
+    def test_session_reused_per_host(self):
+        """同一 host 复用 Session，不同 host 使用独立连接池"""
+        client = HttpClient(pool_maxsize=4)
+        s1 = client._get_session("https://quotes.sina.cn/cn/api/a")
+        s2 = client._get_session("https://quotes.sina.cn/cn/api/b?x=1")
+        s3 = client._get_session("https://push2his.eastmoney.com/api")
+
+        assert s1 is s2
+        assert s1 is not s3
+        adapter = s1.get_adapter("https://quotes.sina.cn/")
+        assert adapter._pool_maxsize == 4
+        client.close()
+
+    def test_profile_headers_and_timeout(self):
+        """profile 提供默认请求头与超时，调用方参数优先"""
+        client = HttpClient()
+        session = MagicMock()
+        session.get.return_value.status_code = 200
+        with patch.object(client, "_get_session", return_value=session):
+            client.get("https://push2his.eastmoney.com/api", profile="eastmoney")
+            _, kwargs = session.get.call_args
+            assert kwargs["headers"]["Referer"] == PROFILES["eastmoney"]["headers"]["Referer"]
+            assert kwargs["timeout"] == PROFILES["eastmoney"]["timeout"]
+
+            client.get("https://push2his.eastmoney.com/api", headers={"Referer": "x"}, timeout=3, profile="eastmoney")
+            _, kwargs = session.get.call_args
+            assert kwargs["headers"]["Referer"] == "x"
+            assert kwargs["timeout"] == 3
+
+    def test_get_http_client_singleton(self):
+        """测试全局客户端单例"""
+        assert get_http_client() is get_http_client()
@@ -0,0 +1,120 @@
+"""
+测试进程内 LRU 内存缓存
+"""
+
+import time
+
+import pandas as pd
+
+from src.utils.cache import DataCache
+from src.utils.memory_cache import MISS, MemoryLRU, estimate_size
+
+
+def _frame(n=1000):
+    return pd.DataFrame({"Close": [float(i) for i in range(n)]})
+
+
+class TestMemoryLRU:
+    """内存 LRU 测试类"""
+
+    def test_hit_miss_counters(self):
+        """命中与未命中计数"""
+        lru = MemoryLRU(1024 * 1024)
+        lru.put("a", 1, time.time())
+
+        assert lru.get("a", 60) == 1
+        assert lru.get("b", 60) is MISS
+        stats = lru.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl_uses_created_at(self):
+        """按写入时间判断过期，过期条目被移除"""
+        lru = MemoryLRU(1024 * 1024)
+        lru.put("old", 1, time.time() - 120)
+
+        assert lru.get("old", 60) is MISS
+        assert lru.stats()["entries"] == 0
+
+    def test_byte_bound_evicts_least_recently_used(self):
+        """超过字节上限时淘汰最久未使用的条目"""
+        size = estimate_size(_frame())
+        lru = MemoryLRU(int(size * 2.5))
+        now = time.time()
+        lru.put("a", _frame(), now)
+        lru.put("b", _frame(), now)
+        lru.get("a", 60)  # a 变为最近使用
+        lru.put("c", _frame(), now)
+
+        assert lru.get("b", 60) is MISS
+        assert lru.get("a", 60) is not MISS
+        assert lru.get("c", 60) is not MISS
+        assert lru.stats()["evictions"] == 1
+
+    def test_oversized_value_not_cached(self):
+        """单个条目超过容量时不缓存"""
+        lru = MemoryLRU(100)
+        lru.put("big", _frame(), time.time())
+        assert lru.get("big", 60) is MISS
+
+    def test_returns_copies(self):
+        """调用方修改返回值不影响缓存内容"""
+        lru = MemoryLRU(1024 * 1024)
+        lru.put("df", {"idx": _frame(3)}, time.time())
+
+        result = lru.get("df", 60)
+        result["idx"]["Close"] = 0.0
+        result["idx"]["MA5"] = 1.0
+
+        cached = lru.get("df", 60)
+        assert list(cached["idx"].columns) == ["Close"]
+        assert cached["idx"]["Close"].tolist() == [0.0, 1.0, 2.0]
+
+
+class TestDataCacheMemoryTier:
+    """DataCache 内存层测试类"""
+
+    def test_repeat_reads_skip_disk(self, tmp_path):
+        """写入后同一进程内读取不访问磁盘文件"""
+        cache = DataCache(str(tmp_path / "c"), memory_max_mb=16)
+        cache.set("indices", {"上证指数": _frame(5)})
+        for path in cache.cache_dir.glob("*.pkl"):
+            path.unlink()
+
+        assert len(cache.get("indices")["上证指数"]) == 5
+        assert cache.get_stats()["memory"]["hits"] == 1
+
+    def test_disk_hit_promoted_to_memory(self, tmp_path):
+        """磁盘命中后提升到内存层，其后读取命中内存"""
+        DataCache(str(tmp_path / "c")).set("k", 42)
+        cache = DataCache(str(tmp_path / "c"), memory_max_mb=16)
+
+        assert cache.get("k") == 42
+        assert cache.get("k") == 42
+        stats = cache.get_stats()["memory"]
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_same_ttl_semantics(self, tmp_path):
+        """内存层与磁盘缓存按同一 TTL 过期"""
+        cache = DataCache(str(tmp_path / "c"), memory_max_mb=16)
+        cache.set("k", 1, ttl_hours=1 / 3600)
+        time.sleep(1.1)
+
+        assert cache.get("k", ttl_hours=1 / 3600) is None
+        assert cache.get_stats()["metadata_entries"] == 0
+
+    def test_delete_and_clear_invalidate_memory(self, tmp_path):
+        """删除与清理同时作用于内存层"""
+        cache = DataCache(str(tmp_path / "c"), memory_max_mb=16)
+        cache.set("kline_a", 1)
+        cache.set("kline_b", 2)
+        cache.set("other", 3)
+
+        cache.delete("kline_a")
+        cache.clear("kline_*")
+
+        assert cache.get("kline_a") is None
+        assert cache.get("kline_b") is None
+        assert cache.get("other") == 3
@@ -0,0 +1,87 @@
+"""
+测试运行指标（计数器与延迟直方图）
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+from src.utils.cache import DataCache
+from src.utils.metrics import LatencyHistogram, Metrics, get_metrics
+
+
+class TestLatencyHistogram:
+    """延迟直方图测试类"""
+
+    def test_percentiles_and_buckets(self):
+        """分位数取所在桶的上界，最大值不超过实际最大耗时"""
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.observe(0.004)
+        for _ in range(10):
+            histogram.observe(0.8)
+
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == 5
+        assert summary["p90_ms"] == 5
+        assert summary["p99_ms"] == 800
+        assert summary["buckets"] == {"<=5ms": 90, "<=1000ms": 10}
+
+    def test_overflow_bucket(self):
+        """超过最大桶上界的耗时计入溢出桶"""
+        histogram = LatencyHistogram()
+        histogram.observe(45)
+        assert histogram.summary()["buckets"] == {">30000ms": 1}
+        assert histogram.percentile(0.5) == pytest.approx(45000)
+
+
+class TestMetrics:
+    """指标注册表测试类"""
+
+    def test_counters_timers_and_snapshot(self):
+        """按 (范围, 键族) 汇总计数器与计时"""
+        metrics = Metrics()
+        metrics.incr("fetch", "kline:240", "calls")
+        metrics.incr("fetch", "kline:240", "calls")
+        metrics.incr("source", "sina", "ok")
+        with metrics.timer("fetch", "kline:240", "network"):
+            time.sleep(0.01)
+
+        assert metrics.counter("fetch", "kline:240", "calls") == 2
+        snapshot = metrics.snapshot("fetch")
+        assert list(snapshot) == ["fetch"]
+        assert snapshot["fetch"]["kline:240"]["latency"]["network"]["count"] == 1
+
+        report = metrics.format_report()
+        assert "[fetch]" in report and "[source]" in report and "calls=2" in report
+
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_cache_records_family_counters(self, tmp_path):
+        """数据缓存按键名记录命中、未命中、过期与读写字节数"""
+        metrics = get_metrics()
+        metrics.reset()
+        cache = DataCache(str(tmp_path / "metrics"), memory_max_mb=8)
+
+        cache.get("fetch_kline_data", symbol="sh600000")
+        cache.set("fetch_kline_data", pd.DataFrame({"Close": [1.0, 2.0]}), symbol="sh600000")
+        cache.get("fetch_kline_data", symbol="sh600000")
+        cache.memory.clear()
+        cache.get("fetch_kline_data", symbol="sh600000")
+        cache.set("negative:sh600000:240:sina", {"reason": "empty"}, expires_at=time.time() - 1)
+        cache.memory.clear()
+        cache.get("negative:sh600000:240:sina")
+
+        families = cache.get_stats()["families"]
+        kline = families["fetch_kline_data"]
+        assert kline["counters"]["misses"] == 1
+        assert kline["counters"]["hits"] == 2
+        assert kline["counters"]["memory_hits"] == 1
+        assert kline["counters"]["bytes_read"] == kline["counters"]["bytes_written"] > 0
+        assert kline["latency"]["load"]["count"] == 1
+        assert kline["latency"]["store"]["count"] == 1
+        assert families["negative"]["counters"]["expirations"] == 1
+        metrics.reset()
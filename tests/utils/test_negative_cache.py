@@ -0,0 +1,109 @@
+"""
+测试负缓存（数据源无数据/失败的短期记录）
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.utils.cache import DataCache
+from src.utils.negative_cache import EMPTY, FAILED, NegativeCache
+from src.utils.source_stats import SourceStats, fetch_ranked
+
+
+@pytest.fixture
+def negative(tmp_path):
+    return NegativeCache(DataCache(str(tmp_path / "negative"), memory_max_mb=8), 60, 10)
+
+
+class TestNegativeCache:
+    """负缓存测试类"""
+
+    def test_record_and_get(self, negative):
+        """记录后可按 (代码, 周期, 数据源) 查询，其他数据源不受影响"""
+        negative.record("sh600000", 240, "sina", EMPTY)
+        negative.record("sh600000", 240, "eastmoney", FAILED, RuntimeError("timeout"))
+        assert negative.get("sh600000", 240, "sina")["reason"] == EMPTY
+        assert negative.get("sh600000", 240, "eastmoney")["detail"] == "timeout"
+        assert negative.get("sh600000", 240, "tencent") is None
+        assert negative.get("sh600000", 60, "sina") is None
+
+    def test_expires_by_reason(self, negative):
+        """失败记录的有效期短于无数据记录"""
+        negative.record("sz000001", 5, "sina", EMPTY)
+        negative.record("sz000001", 5, "tencent", FAILED)
+        later = time.time() + 30 * 60
+        with patch("src.utils.cache.time.time", return_value=later), patch(
+            "src.utils.memory_cache.time.time", return_value=later
+        ):
+            assert negative.get("sz000001", 5, "sina") is not None
+            assert negative.get("sz000001", 5, "tencent") is None
+
+    def test_entries_and_clear(self, negative):
+        """按通配符列出与清除记录"""
+        negative.record("sh600000", 240, "sina", EMPTY)
+        negative.record("sh600000", 1, "sina", EMPTY)
+        negative.record("HK.00700", 240, "eastmoney", FAILED)
+        assert len(negative.entries()) == 3
+        assert {e["symbol"] for e in negative.entries(symbol="sh*")} == {"sh600000"}
+        assert negative.entries(source="eastmoney")[0]["reason"] == FAILED
+
+        assert negative.clear(symbol="sh600000", scale=1) == 1
+        assert negative.get("sh600000", 1, "sina") is None
+        assert negative.get("sh600000", 240, "sina") is not None
+        assert negative.clear() == 2
+        assert negative.entries() == []
+
+
+class TestFetchRankedNegative:
+    """排序获取与负缓存的配合测试类"""
+
+    def test_skips_and_records_sources(self, negative):
+        """记录无数据的数据源，下次请求同一代码时跳过；请求失败交给熔断器，不按代码记录"""
+
+        def broken():
+            raise RuntimeError("down")
+
+        good = MagicMock(return_value=pd.DataFrame({"Close": [1.0]}))
+        empty = MagicMock(return_value=pd.DataFrame())
+        candidates = [("neg_empty", empty), ("neg_broken", broken), ("neg_ok", good)]
+        stats = SourceStats()
+        stats.record("neg_empty", 0.01, True)
+        stats.record("neg_broken", 0.02, True)
+        stats.record("neg_ok", 0.03, True)
+
+        with patch("src.utils.negative_cache.get_negative_cache", return_value=negative):
+            source, _ = fetch_ranked(candidates, stats=stats, hedge=False, negative_key=("sh600000", 240))
+            assert source == "neg_ok"
+            assert negative.get("sh600000", 240, "neg_empty")["reason"] == EMPTY
+            assert negative.get("sh600000", 240, "neg_broken") is None
+            assert negative.get("sh600000", 240, "neg_ok") is None
+
+            source, _ = fetch_ranked(candidates, stats=stats, hedge=False, negative_key=("sh600000", 240))
+            assert source == "neg_ok"
+            assert empty.call_count == 1
+            # 其他代码不受影响
+            fetch_ranked([("neg_empty", empty)], stats=stats, hedge=False, negative_key=("sz000001", 240))
+            assert empty.call_count == 2
+
+    def test_record_negative_disabled(self, negative):
+        """record_negative=False 时仍按负缓存跳过，但不记录本次无数据的数据源"""
+        empty = MagicMock(return_value=pd.DataFrame())
+        skipped = MagicMock(return_value=pd.DataFrame({"Close": [1.0]}))
+        negative.record("sh600000", 240, "neg_skipped", EMPTY)
+
+        with patch("src.utils.negative_cache.get_negative_cache", return_value=negative):
+            result = fetch_ranked(
+                [("neg_skipped", skipped), ("neg_delta", empty)],
+                stats=SourceStats(),
+                hedge=False,
+                negative_key=("sh600000", 240),
+                record_negative=False,
+            )
+
+        assert result == (None, None)
+        skipped.assert_not_called()
+        assert empty.call_count == 1
+        assert negative.get("sh600000", 240, "neg_delta") is None
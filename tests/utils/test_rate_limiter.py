@@ -0,0 +1,67 @@
+"""
+测试自适应限速器
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+from src.utils.http_client import HttpClient
+from src.utils.rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+
+class TestAdaptiveRateLimiter:
+    """AIMD 令牌桶测试类"""
+
+    def test_burst_then_throttled(self):
+        """令牌桶容量内不等待，超出后按速率等待"""
+        limiter = AdaptiveRateLimiter("test", rate=20, burst=2, max_rate=20)
+        assert limiter.acquire() == 0
+        assert limiter.acquire() == 0
+        start = time.monotonic()
+        waited = limiter.acquire()
+        assert waited > 0
+        assert time.monotonic() - start >= 0.03
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """成功时线性加速，限流时速率减半且并发失败只降一次"""
+        limiter = AdaptiveRateLimiter("test", rate=4, min_rate=1, max_rate=5, increase_step=0.5, decrease_factor=0.5)
+        limiter.on_success()
+        assert limiter.rate == 4.5
+        for _ in range(5):
+            limiter.on_success()
+        assert limiter.rate == 5
+        limiter.on_throttle()
+        limiter.on_throttle()
+        assert limiter.rate == 2.5
+
+    def test_min_rate_floor(self):
+        """速率不低于下限"""
+        limiter = AdaptiveRateLimiter("test", rate=1, min_rate=0.8, decrease_factor=0.1)
+        limiter.on_throttle()
+        assert limiter.rate == 0.8
+
+    def test_disabled(self):
+        """禁用时不等待"""
+        limiter = AdaptiveRateLimiter("test", rate=0.01, burst=1, enabled=False)
+        for _ in range(5):
+            assert limiter.acquire() == 0
+
+
+class TestHttpClientRateLimit:
+    """HTTP 客户端与限速器集成测试类"""
+
+    def test_throttle_status_backs_off(self):
+        """429 响应触发降速，正常响应触发加速"""
+        client = HttpClient()
+        session = MagicMock()
+        limiter = get_rate_limiter("https://rate-limit-test.example")
+        rate = limiter.rate
+        with patch.object(client, "_get_session", return_value=session):
+            session.get.return_value.status_code = 429
+            client.get("https://rate-limit-test.example/api")
+            assert limiter.rate < rate
+
+            rate = limiter.rate
+            session.get.return_value.status_code = 200
+            client.get("https://rate-limit-test.example/api")
+            assert limiter.rate > rate
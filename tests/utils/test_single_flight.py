@@ -0,0 +1,81 @@
+"""
+测试请求合并（single-flight）
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.single_flight import SingleFlight, single_flight
+
+
+class TestSingleFlight:
+    """请求合并测试类"""
+
+    def test_concurrent_calls_share_result(self):
+        """并发的相同调用只执行一次并共享结果"""
+        calls = []
+
+        @single_flight
+        def fetch(symbol, scale=240):
+            calls.append(symbol)
+            time.sleep(0.2)
+            return {"symbol": symbol}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(fetch("sh600460"))) for _ in range(5)]
+        threads.append(threading.Thread(target=lambda: results.append(fetch("sh600460", scale=240))))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == ["sh600460"]
+        assert len(results) == 6
+        assert all(r is results[0] for r in results)
+
+    def test_different_args_not_merged(self):
+        """参数不同的调用分别执行"""
+        calls = []
+
+        @single_flight
+        def fetch(symbol, scale=240):
+            calls.append((symbol, scale))
+            return symbol
+
+        fetch("sh600460", 240)
+        fetch("sh600460", 30)
+        fetch("sh600460", 240)
+        assert len(calls) == 3
+
+    def test_error_shared_with_followers(self):
+        """在途调用的异常传递给所有等待者"""
+        group = SingleFlight()
+        started = threading.Event()
+        errors = []
+
+        def boom():
+            started.set()
+            time.sleep(0.2)
+            raise RuntimeError("down")
+
+        def follower():
+            started.wait()
+            try:
+                group.do("k", lambda: "unused")
+            except RuntimeError as e:
+                errors.append(e)
+
+        t = threading.Thread(target=follower)
+        t.start()
+        with pytest.raises(RuntimeError):
+            group.do("k", boom)
+        t.join()
+        assert len(errors) == 1
+        assert group.in_flight() == 0
+
+    def test_reentrant_call_same_thread(self):
+        """同一线程内的重入调用不会死锁"""
+        group = SingleFlight()
+        assert group.do("k", lambda: group.do("k", lambda: 1) + 1) == 2
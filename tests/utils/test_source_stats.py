@@ -0,0 +1,76 @@
+"""
+测试数据源延迟统计与对冲请求
+"""
+
+import time
+
+import pandas as pd
+
+from src.utils.source_stats import SourceStats, fetch_ranked
+
+
+def _frame():
+    return pd.DataFrame({"Close": [1.0, 2.0]})
+
+
+class TestSourceStats:
+    """数据源统计表测试类"""
+
+    def test_rank_by_latency_and_success(self):
+        """按延迟与成功率排序，无样本的数据源保持原有顺序"""
+        stats = SourceStats(min_samples=1)
+        for _ in range(5):
+            stats.record("slow", 2.0, True)
+            stats.record("fast", 0.2, True)
+            stats.record("flaky", 0.1, False)
+        stats.record("flaky", 0.1, True)
+
+        assert stats.rank(["slow", "flaky", "fast"]) == ["fast", "flaky", "slow"]
+        assert stats.rank(["a", "b"]) == ["a", "b"]
+        assert abs(stats.success_rate("flaky") - 1 / 6) < 1e-9
+
+    def test_hedge_delay_uses_p90(self):
+        """对冲等待时间为 p90 延迟，样本不足时使用默认值"""
+        stats = SourceStats(min_samples=3, default_delay=5.0, min_delay=0.1)
+        assert stats.hedge_delay("sina") == 5.0
+        for latency in [0.1 * i for i in range(1, 11)]:
+            stats.record("sina", latency, True)
+        assert abs(stats.hedge_delay("sina") - 0.9) < 1e-9
+
+
+class TestFetchRanked:
+    """排序/对冲获取测试类"""
+
+    def test_hedge_fires_when_primary_slow(self):
+        """首选数据源超时未返回时对冲请求下一个，取先返回的结果"""
+        stats = SourceStats(default_delay=0.05)
+
+        def slow():
+            time.sleep(1.0)
+            return _frame()
+
+        start = time.monotonic()
+        source, df = fetch_ranked([("slow", slow), ("fast", _frame)], stats=stats, hedge=True)
+        assert source == "fast"
+        assert not df.empty
+        assert time.monotonic() - start < 0.8
+
+    def test_failure_falls_through(self):
+        """失败或空结果的数据源立即由下一个补上"""
+        stats = SourceStats(default_delay=5.0)
+
+        def broken():
+            raise RuntimeError("down")
+
+        candidates = [("broken", broken), ("empty", lambda: pd.DataFrame()), ("ok", _frame)]
+        start = time.monotonic()
+        source, _ = fetch_ranked(candidates, stats=stats, hedge=True)
+        assert source == "ok"
+        assert time.monotonic() - start < 1.0
+        assert stats.success_rate("broken") == 0.0
+
+    def test_all_fail_sequential(self):
+        """全部失败时返回 (None, None)"""
+        stats = SourceStats()
+        assert fetch_ranked([("a", lambda: None), ("b", lambda: None)], stats=stats, hedge=False) == (None, None)
+        assert stats.success_rate("a") == 0.0
@@ -0,0 +1,102 @@
+"""
+测试后台刷新（stale-while-revalidate）
+"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utils.cache import DataCache
+from src.utils.stale_while_revalidate import get_or_revalidate, refreshes_in_flight, wait_for_refreshes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DataCache(str(tmp_path / "swr"), memory_max_mb=8)
+
+
+def _age(cache, key, seconds, **kwargs):
+    """将条目的写入时间提前 seconds 秒"""
+    cache_key = cache._get_cache_key(key, **kwargs)
+    entry = cache.index.get(cache_key)
+    cache.index.put(
+        cache_key, key, entry["ttl_hours"], params=kwargs, size=entry["size"], created_at=entry["created_at"] - seconds
+    )
+    cache.memory.clear()
+
+
+class TestStaleWhileRevalidate:
+    """后台刷新测试类"""
+
+    def test_fresh_value_served_without_loader(self, cache):
+        """新鲜期内直接返回缓存"""
+        loader = MagicMock(return_value={"v": 1})
+        assert get_or_revalidate("idx", loader, ttl_hours=1, max_stale_hours=1, cache=cache) == {"v": 1}
+        assert get_or_revalidate("idx", loader, ttl_hours=1, max_stale_hours=1, cache=cache) == {"v": 1}
+        assert loader.call_count == 1
+
+    def test_stale_value_returned_and_refreshed_in_background(self, cache):
+        """过期但未超过最大陈旧时间：立即返回旧值，后台刷新后返回新值"""
+        get_or_revalidate("idx", lambda: {"v": "old"}, ttl_hours=1, max_stale_hours=2, cache=cache)
+        _age(cache, "idx", 2 * 3600)
+
+        release = threading.Event()
+
+        def slow_loader():
+            release.wait(5)
+            return {"v": "new"}
+
+        started = time.time()
+        assert get_or_revalidate("idx", slow_loader, ttl_hours=1, max_stale_hours=2, cache=cache) == {"v": "old"}
+        assert time.time() - started < 1
+        # 刷新进行中的重复读取不重复提交
+        assert get_or_revalidate("idx", slow_loader, ttl_hours=1, max_stale_hours=2, cache=cache) == {"v": "old"}
+        assert refreshes_in_flight() == 1
+
+        assert not wait_for_refreshes(timeout=0.1)
+        release.set()
+        assert wait_for_refreshes(timeout=5)
+        assert get_or_revalidate("idx", slow_loader, ttl_hours=1, max_stale_hours=2, cache=cache) == {"v": "new"}
+
+    def test_beyond_max_staleness_fetches_synchronously(self, cache):
+        """超过最大陈旧时间时同步获取"""
+        get_or_revalidate("idx", lambda: {"v": "old"}, ttl_hours=1, max_stale_hours=2, cache=cache)
+        _age(cache, "idx", 4 * 3600)
+
+        assert get_or_revalidate("idx", lambda: {"v": "new"}, ttl_hours=1, max_stale_hours=2, cache=cache) == {
+            "v": "new"
+        }
+
+    def test_failed_refresh_keeps_stale_value(self, cache):
+        """后台刷新失败或返回空数据时保留旧值"""
+        get_or_revalidate("idx", lambda: {"v": "old"}, ttl_hours=1, max_stale_hours=2, cache=cache)
+        _age(cache, "idx", 2 * 3600)
+
+        get_or_revalidate("idx", MagicMock(side_effect=ConnectionError), ttl_hours=1, max_stale_hours=2, cache=cache)
+        wait_for_refreshes(timeout=5)
+        get_or_revalidate("idx", lambda: {}, ttl_hours=1, max_stale_hours=2, cache=cache)
+        wait_for_refreshes(timeout=5)
+
+        assert cache.get("idx", ttl_hours=3) == {"v": "old"}
+
+    def test_empty_result_not_cached(self, cache):
+        """获取结果为空时不写入缓存"""
+        loader = MagicMock(return_value={})
+        get_or_revalidate("idx", loader, ttl_hours=1, max_stale_hours=1, cache=cache)
+        get_or_revalidate("idx", loader, ttl_hours=1, max_stale_hours=1, cache=cache)
+        assert loader.call_count == 2
+
+    def test_market_indices_use_revalidation(self, cache):
+        """市场指数经后台刷新缓存获取"""
+        from src.data.fetchers import market_indices_fetcher
+
+        with patch("src.utils.stale_while_revalidate.get_cache", return_value=cache), patch.object(
+            market_indices_fetcher, "_load_market_indices", return_value={"HSI": {"name": "恒生指数"}}
+        ) as mock_load:
+            market_indices_fetcher.get_market_indices_data(is_hk=True)
+            result = market_indices_fetcher.get_market_indices_data(is_hk=True)
+
+        assert result == {"HSI": {"name": "恒生指数"}}
+        mock_load.assert_called_once_with(True)
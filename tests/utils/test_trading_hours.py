@@ -1,72 +1,160 @@
 """
-测试交易时间判断函数
+测试交易时间判断函数与交易日历
 """
 
-from datetime import datetime
-from unittest.mock import patch
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
 import pandas as pd
+
+from src.utils.trading_calendar import TradingCalendar
 from src.utils.trading_hours import is_china_stock_market_open, is_hk_stock_market_open
 
+# 2024-01-12 周五，2024-01-15 周一；2024-02-09 至 2024-02-17 为春节休市
+TRADING_DAYS = [date(2024, 1, 11), date(2024, 1, 12), date(2024, 1, 15), date(2024, 2, 8), date(2024, 2, 19)]
+
+
+def _calendar(tmp_path, loader=None, market="A"):
+    return TradingCalendar(market, cache_dir=str(tmp_path), loader=loader or (lambda: list(TRADING_DAYS)))
+
 
 class TestTradingHours:
     """交易时间判断测试类"""
 
-    @patch("src.utils.trading_hours.ak")
-    @patch("src.utils.trading_hours.datetime")
-    def test_china_market_open_weekday(self, mock_datetime, mock_ak):
+    @patch("src.utils.trading_calendar._now")
+    def test_china_market_open_weekday(self, mock_now, tmp_path):
         """测试A股市场工作日开盘"""
-        # 模拟akshare返回数据（最后交易日是今天）
-        mock_df = pd.DataFrame({"date": [datetime(2024, 1, 15).date()]})
-        mock_ak.stock_zh_index_daily.return_value = mock_df
+        mock_now.return_value = datetime(2024, 1, 15, 10, 0)
+        with patch("src.utils.trading_hours.get_trading_calendar", return_value=_calendar(tmp_path)):
+            assert is_china_stock_market_open() is True
 
-        # 模拟当前日期
-        mock_datetime.now.return_value = datetime(2024, 1, 15, 10, 0)
-        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+    @patch("src.utils.trading_calendar._now")
+    def test_china_market_closed_weekend(self, mock_now, tmp_path):
+        """测试A股市场周末休市"""
+        mock_now.return_value = datetime(2024, 1, 13, 10, 0)
+        with patch("src.utils.trading_hours.get_trading_calendar", return_value=_calendar(tmp_path)):
+            assert is_china_stock_market_open() is False
 
-        result = is_china_stock_market_open()
-        assert result is True
+    @patch("src.utils.trading_calendar._now")
+    def test_hk_market_open_weekday(self, mock_now, tmp_path):
+        """测试港股市场工作日开盘"""
+        mock_now.return_value = datetime(2024, 1, 15, 10, 0)
+        with patch("src.utils.trading_hours.get_trading_calendar", return_value=_calendar(tmp_path, market="HK")):
+            assert is_hk_stock_market_open() is True
 
-    @patch("src.utils.trading_hours.ak")
-    @patch("src.utils.trading_hours.datetime")
-    def test_china_market_closed_weekend(self, mock_datetime, mock_ak):
-        """测试A股市场周末休市"""
-        # 模拟akshare返回数据（最后交易日是周五）
-        mock_df = pd.DataFrame({"date": [datetime(2024, 1, 12).date()]})  # 周五
-        mock_ak.stock_zh_index_daily.return_value = mock_df
+    @patch("src.utils.trading_calendar._now")
+    def test_hk_market_closed_weekend(self, mock_now, tmp_path):
+        """测试港股市场周末休市"""
+        mock_now.return_value = datetime(2024, 1, 13, 10, 0)
+        with patch("src.utils.trading_hours.get_trading_calendar", return_value=_calendar(tmp_path, market="HK")):
+            assert is_hk_stock_market_open() is False
 
-        # 模拟当前日期（周六）
-        mock_datetime.now.return_value = datetime(2024, 1, 13, 10, 0)
-        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
-        result = is_china_stock_market_open()
-        assert result is False
+class TestTradingCalendar:
+    """交易日历测试类"""
 
-    @patch("src.utils.trading_hours.ak")
-    @patch("src.utils.trading_hours.datetime")
-    def test_hk_market_open_weekday(self, mock_datetime, mock_ak):
-        """测试港股市场工作日开盘"""
-        # 模拟akshare返回数据
-        mock_df = pd.DataFrame({"date": [datetime(2024, 1, 15).date()]})
-        mock_ak.stock_hk_index_daily_sina.return_value = mock_df
+    @patch("src.utils.trading_calendar._now")
+    def test_holiday_and_sessions(self, mock_now, tmp_path):
+        """节假日判断、开盘与收盘时间"""
+        mock_now.return_value = datetime(2024, 2, 8, 16, 0)
+        cal = _calendar(tmp_path)
 
-        # 模拟当前日期
-        mock_datetime.now.return_value = datetime(2024, 1, 15, 10, 0)
-        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+        assert cal.is_trading_day(date(2024, 2, 8))
+        assert not cal.is_trading_day(date(2024, 2, 14))  # 春节工作日休市
+        assert cal.session_close(date(2024, 2, 8)) == datetime(2024, 2, 8, 15, 0)
+        assert cal.session_close(date(2024, 2, 14)) is None
+        assert cal.next_session_open() == datetime(2024, 2, 19, 9, 30)
+        assert cal.next_session_open(datetime(2024, 2, 8, 9, 0)) == datetime(2024, 2, 8, 9, 30)
+        assert cal.previous_trading_day(date(2024, 2, 19)) == date(2024, 2, 8)
+        assert cal.is_trading_time(datetime(2024, 2, 8, 10, 0))
+        assert not cal.is_trading_time(datetime(2024, 2, 8, 12, 0))
 
-        result = is_hk_stock_market_open()
-        assert result is True
+    @patch("src.utils.trading_calendar._now")
+    def test_refreshed_at_most_once_a_day(self, mock_now, tmp_path):
+        """日历持久化到磁盘，同一天内只下载一次"""
+        mock_now.return_value = datetime(2024, 1, 15, 10, 0)
+        loader = MagicMock(return_value=list(TRADING_DAYS))
 
-    @patch("src.utils.trading_hours.ak")
-    @patch("src.utils.trading_hours.datetime")
-    def test_hk_market_closed_weekend(self, mock_datetime, mock_ak):
-        """测试港股市场周末休市"""
-        # 模拟akshare返回数据（最后交易日是周五）
-        mock_df = pd.DataFrame({"date": [datetime(2024, 1, 12).date()]})  # 周五
-        mock_ak.stock_hk_index_daily_sina.return_value = mock_df
+        cal = _calendar(tmp_path, loader)
+        for _ in range(5):
+            cal.is_trading_day()
+        assert loader.call_count == 1
+        assert (tmp_path / "A.json").exists()
+
+        # 新进程（新实例）同一天读取磁盘文件，不再下载
+        _calendar(tmp_path, loader).is_trading_day()
+        assert loader.call_count == 1
+
+        # 次日重新下载
+        mock_now.return_value = datetime(2024, 1, 16, 10, 0)
+        cal.is_trading_day()
+        assert loader.call_count == 2
+
+    @patch("src.utils.trading_calendar._now")
+    def test_loader_failure_falls_back(self, mock_now, tmp_path):
+        """下载失败时按工作日估计，当天不重复尝试"""
+        mock_now.return_value = datetime(2024, 1, 13, 10, 0)
+        loader = MagicMock(side_effect=ConnectionError("down"))
+        cal = _calendar(tmp_path, loader)
+
+        assert cal.is_trading_day() is False
+        assert cal.is_trading_day(date(2024, 1, 15)) is True
+        assert loader.call_count == 1
+
+    @patch("src.utils.trading_calendar.ak")
+    def test_a_share_loader_uses_sina_calendar(self, mock_ak):
+        """A股日历来自新浪交易日历"""
+        from src.utils.trading_calendar import _load_a_share_dates
+
+        mock_ak.tool_trade_date_hist_sina.return_value = pd.DataFrame({"trade_date": ["2024-01-12", "2024-01-15"]})
+        assert _load_a_share_dates() == [date(2024, 1, 12), date(2024, 1, 15)]
+        mock_ak.stock_zh_index_daily.assert_not_called()
+
+    @patch("src.utils.trading_calendar._now")
+    def test_next_bar_close(self, mock_now, tmp_path):
+        """下一根 K 线收盘时间：盘中、午休、收盘后、节假日"""
+        mock_now.return_value = datetime(2024, 1, 12, 10, 0)
+        cal = _calendar(tmp_path)
+        settle = timedelta(minutes=2)
+
+        closes = cal.bar_closes(date(2024, 1, 12), 30)
+        assert closes[0] == datetime(2024, 1, 12, 10, 0)
+        assert closes[3] == datetime(2024, 1, 12, 11, 30)
+        assert closes[4] == datetime(2024, 1, 12, 13, 30)
+        assert closes[-1] == datetime(2024, 1, 12, 15, 0)
+        assert len(cal.bar_closes(date(2024, 1, 12), 1)) == 240
+        assert cal.bar_closes(date(2024, 1, 13), 30) == []
+
+        # 盘中：当前正在形成的 K 线收盘时；刚收盘的 K 线在 settle 内仍视为未完成
+        assert cal.next_bar_close(30, datetime(2024, 1, 12, 10, 15)) == datetime(2024, 1, 12, 10, 30)
+        assert cal.next_bar_close(30, datetime(2024, 1, 12, 10, 31), settle) == datetime(2024, 1, 12, 10, 30)
+        assert cal.next_bar_close(30, datetime(2024, 1, 12, 10, 33), settle) == datetime(2024, 1, 12, 11, 0)
+        # 午休：下午第一根
+        assert cal.next_bar_close(5, datetime(2024, 1, 12, 12, 0)) == datetime(2024, 1, 12, 13, 5)
+        # 日线盘中：当日收盘
+        assert cal.next_bar_close(240, datetime(2024, 1, 12, 10, 0)) == datetime(2024, 1, 12, 15, 0)
+        # 周五收盘后：下周一第一根 K 线
+        assert cal.next_bar_close(240, datetime(2024, 1, 12, 16, 0)) == datetime(2024, 1, 15, 15, 0)
+        assert cal.next_bar_close(1, datetime(2024, 1, 13, 10, 0)) == datetime(2024, 1, 15, 9, 31)
+        # 春节前最后一个交易日收盘后：节后第一个交易日
+        assert cal.next_bar_close(240, datetime(2024, 2, 8, 16, 0)) == datetime(2024, 2, 19, 15, 0)
+
+        # 最近已开盘交易日：开盘前为上一交易日
+        assert cal.last_session_day(datetime(2024, 1, 15, 8, 45)) == date(2024, 1, 12)
+        assert cal.last_session_day(datetime(2024, 1, 15, 9, 30)) == date(2024, 1, 15)
+        assert cal.last_session_day(datetime(2024, 1, 14, 10, 0)) == date(2024, 1, 12)
 
-        # 模拟当前日期（周六）
-        mock_datetime.now.return_value = datetime(2024, 1, 13, 10, 0)
-        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+    @patch("src.utils.trading_calendar._now")
+    def test_hk_bar_closes(self, mock_now, tmp_path):
+        """港股按港股交易时段计算"""
+        mock_now.return_value = datetime(2024, 1, 12, 10, 0)
+        cal = _calendar(tmp_path, market="HK")
 
-        result = is_hk_stock_market_open()
-        assert result is False
+        assert cal.bar_closes(date(2024, 1, 12), 60) == [
+            datetime(2024, 1, 12, 10, 30),
+            datetime(2024, 1, 12, 11, 30),
+            datetime(2024, 1, 12, 12, 0),
+            datetime(2024, 1, 12, 14, 0),
+            datetime(2024, 1, 12, 15, 0),
+            datetime(2024, 1, 12, 16, 0),
+        ]